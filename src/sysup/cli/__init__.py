@@ -1,5 +1,21 @@
-"""sysup CLIモジュール."""
+"""sysup CLIモジュール.
 
-from sysup.cli.cli import main
+シェル起動時に呼ばれる軽量エントリーポイント(sysup.cli.entry)から
+CLI本体の重いimportを避けるため、mainは初回アクセス時に読み込みます。
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sysup.cli.cli import main
 
 __all__ = ["main"]
+
+
+def __getattr__(name: str) -> Any:
+    """CLI本体の属性を遅延読み込みする."""
+    if name == "main":
+        from sysup.cli.cli import main
+
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
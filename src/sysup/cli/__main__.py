@@ -4,7 +4,7 @@
 python -m sysup.cli で実行できます。
 """
 
-from sysup.cli.cli import main
+from sysup.cli.entry import main
 
 if __name__ == "__main__":
     main()
@@ -6,40 +6,84 @@ Clickライブラリを使用して、各種オプションとサブコマンド
 """
 
 import atexit
+import sqlite3
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 import click
 from rich.console import Console
+from rich.table import Table
 
 from sysup import __version__
 from sysup.cli.init import init_command
 from sysup.core.backup import BackupManager
+from sysup.core.budget import (
+    DEFERRED_FILE,
+    BudgetCandidate,
+    BudgetPlan,
+    load_deferred,
+    parse_duration,
+    save_deferred,
+    select_within_budget,
+)
 from sysup.core.checks import SystemChecker
+from sysup.core.command import terminate_running_commands
 from sysup.core.config import SysupConfig
+from sysup.core.history import HISTORY_FILE, HistoryStore, percentile
 from sysup.core.logging import SysupLogger
 from sysup.core.notification import Notifier
+from sysup.core.plan import PLAN_CACHE_FILE, PlanCache, PlanEntry
 from sysup.core.platform import is_windows
+from sysup.core.priority import lower_process_priority
+from sysup.core.probe import PROBE_CACHE_FILE, ProbeCache
+from sysup.core.scheduler import ResourceClass, Task, TaskResult, TaskScheduler
 from sysup.core.self_update import SelfUpdater
 from sysup.core.stats import StatsManager
+from sysup.core.timeouts import CommandTimeouts
+from sysup.core.timing import span
 from sysup.core.wsl import WSLIntegration
-from sysup.updaters.apt import AptUpdater
 from sysup.updaters.base import BaseUpdater
-from sysup.updaters.brew import BrewUpdater
-from sysup.updaters.cargo import CargoUpdater
-from sysup.updaters.firmware import FirmwareUpdater
-from sysup.updaters.flatpak import FlatpakUpdater
-from sysup.updaters.gem import GemUpdater
-from sysup.updaters.npm import NpmUpdater
-from sysup.updaters.nvm import NvmUpdater
-from sysup.updaters.pipx import PipxUpdater
-from sysup.updaters.pnpm import PnpmUpdater
-from sysup.updaters.rustup import RustupUpdater
-from sysup.updaters.scoop import ScoopUpdater
-from sysup.updaters.snap import SnapUpdater
-from sysup.updaters.uv import UvUpdater
+from sysup.updaters.registry import UpdaterSpec, get_updater_specs
+
+# refreshフェーズのタスク名に付与する接尾辞
+_REFRESH_SUFFIX = ":refresh"
+
+# 予想所要時間の算出に使用する直近の実行数
+_HISTORY_WINDOW = 20
+
+# コマンドのタイムアウトの算出に使用する直近の実行数
+_TIMEOUT_HISTORY_WINDOW = 50
+
+# 実行履歴も静的な見積もりもないupdaterの予想所要時間(秒)
+_DEFAULT_ESTIMATED_SECONDS = 60.0
+
+
+def _parse_budget(_ctx: click.Context, _param: click.Parameter, value: str | None) -> float | None:
+    """`--budget` の時間の指定("10m"、"1h30m"、"90s"など)を秒数に変換する.
+
+    Args:
+        _ctx: clickのコンテキスト.
+        _param: パラメータ.
+        value: 時間の指定. 指定されていない場合None.
+
+    Returns:
+        秒数. 指定されていない場合None.
+
+    Raises:
+        click.BadParameter: 形式が不正な場合.
+
+    """
+    if value is None:
+        return None
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
 
 
 @click.group()
@@ -71,6 +115,11 @@ def init_cmd() -> None:
 @click.option("--list", "list_updaters", is_flag=True, help="利用可能なupdaterを一覧表示")
 @click.option("--setup-wsl", is_flag=True, help="WSL自動実行をセットアップ")
 @click.option("--no-self-update", is_flag=True, help="sysup自身の更新をスキップ")
+@click.option(
+    "--budget",
+    callback=_parse_budget,
+    help="所要時間の上限（例: 10m, 1h30m）。収まらない更新は次回に延期",
+)
 @click.option("--verbose", "-v", is_flag=True, help="詳細な出力を表示")
 def update(
     config: Path | None,
@@ -80,6 +129,7 @@ def update(
     list_updaters: bool,
     setup_wsl: bool,
     no_self_update: bool,
+    budget: float | None,
     verbose: bool,
 ) -> None:
     """システムを更新する.
@@ -94,6 +144,7 @@ def update(
         list_updaters: updater一覧を表示.
         setup_wsl: WSL統合セットアップモード.
         no_self_update: sysup自身の更新をスキップ.
+        budget: 所要時間の上限(秒). Noneの場合は制限しない.
         verbose: 詳細出力モード.
 
     """
@@ -113,9 +164,13 @@ def update(
     logger = SysupLogger(sysup_config.get_log_dir(), log_level, sysup_config.logging.retention_days)
 
     # セルフアップデート（--list, --setup-wsl以外）
+    # 更新チェックはバックグラウンドで実行し、updaterの実行前に完了を待つ
+    self_updater: SelfUpdater | None = None
     if not list_updaters and not setup_wsl and not no_self_update:
-        self_updater = SelfUpdater(logger, sysup_config.get_cache_dir())
-        self_updater.check_and_update()
+        self_updater = SelfUpdater(
+            logger, sysup_config.get_cache_dir(), sysup_config.general.self_update_interval_hours
+        )
+        self_updater.start_background_check()
 
     # システムチェッカー初期化
     checker = SystemChecker(logger, sysup_config.get_cache_dir())
@@ -139,7 +194,7 @@ def update(
 
     # メイン処理
     try:
-        run_updates(logger, sysup_config, checker, auto_run, force)
+        run_updates(logger, sysup_config, checker, auto_run, force, self_updater, budget)
     except KeyboardInterrupt:
         logger.warning("ユーザーによって中断されました")
         sys.exit(1)
@@ -148,6 +203,101 @@ def update(
         sys.exit(1)
 
 
+@main.command(name="plan")
+@click.option("--config", "-c", type=click.Path(exists=True, path_type=Path), help="設定ファイルのパス")
+@click.option("--verbose", "-v", is_flag=True, help="詳細な出力を表示")
+def plan_cmd(config: Path | None, verbose: bool) -> None:
+    """更新計画を表示する.
+
+    有効なupdaterの更新可能なパッケージを並行して確認し、更新数・ダウンロードサイズ・予想所要時間を表示します。
+    パッケージは更新せず、メタデータの更新も行いません。
+    結果はキャッシュされ、`general.plan_cache_ttl_minutes` の間は `sysup update` で再利用されます。
+
+    Args:
+        config: 設定ファイルのパス.
+        verbose: 詳細出力モード.
+
+    """
+    try:
+        sysup_config = SysupConfig.load_config(config)
+    except Exception as e:
+        click.echo(f"設定ファイル読み込みエラー: {e}", err=True)
+        sys.exit(1)
+
+    log_level = "DEBUG" if verbose else sysup_config.logging.level
+    logger = SysupLogger(sysup_config.get_log_dir(), log_level, sysup_config.logging.retention_days)
+    show_update_plan(logger, sysup_config)
+
+
+@main.command(name="prefetch")
+@click.option("--config", "-c", type=click.Path(exists=True, path_type=Path), help="設定ファイルのパス")
+@click.option("--verbose", "-v", is_flag=True, help="詳細な出力を表示")
+def prefetch_cmd(config: Path | None, verbose: bool) -> None:
+    """更新を事前にダウンロードする.
+
+    低いCPU・I/O優先度で、有効なupdaterのメタデータを更新し、更新するパッケージをダウンロードします。
+    パッケージのインストールは行わないため、後の `sysup update` はダウンロード済みのパッケージを使用できます。
+    systemdのユーザータイマーやWindowsのタスクスケジューラからの定期実行を想定しています。
+
+    Args:
+        config: 設定ファイルのパス.
+        verbose: 詳細出力モード.
+
+    """
+    try:
+        sysup_config = SysupConfig.load_config(config)
+    except Exception as e:
+        click.echo(f"設定ファイル読み込みエラー: {e}", err=True)
+        sys.exit(1)
+
+    log_level = "DEBUG" if verbose else sysup_config.logging.level
+    logger = SysupLogger(sysup_config.get_log_dir(), log_level, sysup_config.logging.retention_days)
+
+    # 優先度は子プロセス・スレッドに引き継がれるため、updaterの実行前に下げる
+    if not lower_process_priority():
+        logger.warning("プロセスの優先度を下げられませんでした")
+
+    # sysup updateと同時に実行しないよう、プロセスロックを取得する
+    checker = SystemChecker(logger, sysup_config.get_cache_dir())
+    if not checker.check_process_lock():
+        sys.exit(1)
+    atexit.register(checker.cleanup_lock)
+
+    try:
+        if not run_prefetch(logger, sysup_config):
+            sys.exit(1)
+    except KeyboardInterrupt:
+        logger.warning("ユーザーによって中断されました")
+        sys.exit(1)
+
+
+@main.command(name="history")
+@click.option("--config", "-c", type=click.Path(exists=True, path_type=Path), help="設定ファイルのパス")
+@click.option("--limit", "-n", type=click.IntRange(min=1), default=20, show_default=True, help="集計する直近の実行数")
+def history_cmd(config: Path | None, limit: int) -> None:
+    """実行履歴を集計して表示する.
+
+    直近の `sysup update` の実行について、updaterごとの処理時間(p50/p95)・失敗率・傾向を表示します。
+
+    Args:
+        config: 設定ファイルのパス.
+        limit: 集計する直近の実行数.
+
+    """
+    try:
+        sysup_config = SysupConfig.load_config(config)
+    except Exception as e:
+        click.echo(f"設定ファイル読み込みエラー: {e}", err=True)
+        sys.exit(1)
+
+    store = HistoryStore(sysup_config.get_cache_dir() / HISTORY_FILE, sysup_config.history.keep_runs)
+    try:
+        show_history(store, limit)
+    except sqlite3.Error as e:
+        click.echo(f"実行履歴の読み込みエラー: {e}", err=True)
+        sys.exit(1)
+
+
 def setup_wsl_integration(logger: SysupLogger, _config: SysupConfig) -> None:
     """WSL統合をセットアップする.
 
@@ -220,38 +370,512 @@ def show_available_updaters(logger: SysupLogger, config: SysupConfig) -> None:
     """
     logger.section("利用可能なUpdater")
 
-    updaters = [
-        ("apt", AptUpdater(logger, config.general.dry_run)),
-        ("snap", SnapUpdater(logger, config.general.dry_run)),
-        ("brew", BrewUpdater(logger, config.general.dry_run)),
-        ("scoop", ScoopUpdater(logger, config.general.dry_run)),
-        ("npm", NpmUpdater(logger, config.general.dry_run)),
-        ("pnpm", PnpmUpdater(logger, config.general.dry_run)),
-        ("pipx", PipxUpdater(logger, config.general.dry_run)),
-        ("uv", UvUpdater(logger, config.general.dry_run)),
-        ("rustup", RustupUpdater(logger, config.general.dry_run)),
-        ("cargo", CargoUpdater(logger, config.general.dry_run)),
-        ("flatpak", FlatpakUpdater(logger, config.general.dry_run)),
-        ("gem", GemUpdater(logger, config.general.dry_run)),
-        ("nvm", NvmUpdater(logger, config.general.dry_run)),
-        ("firmware", FirmwareUpdater(logger, config.general.dry_run)),
-    ]
-
-    for name, updater in updaters:
-        enabled = config.is_updater_enabled(name)
-        available = updater.is_available()
+    probe_cache = ProbeCache.load(config.get_cache_dir() / PROBE_CACHE_FILE)
+    for spec in _updater_specs(logger):
+        enabled = config.is_updater_enabled(spec.name)
+        # 未対応プラットフォームのupdaterはimportせずに利用不可とする
+        available = spec.is_supported() and spec.create(logger, config.general.dry_run, probe_cache).is_available()
 
         status = "✓" if enabled and available else "✗" if not available else "-"
         status_text = "有効" if enabled and available else "利用不可" if not available else "無効"
 
-        logger.info(f"  {status} {updater.get_name()}: {status_text}")
+        logger.info(f"  {status} {spec.display_name}: {status_text}")
+
+    probe_cache.save()
+
+
+def show_update_plan(logger: SysupLogger, config: SysupConfig) -> None:
+    """更新計画を表示する.
+
+    有効なupdaterのplanを並行して実行し、結果を表形式で表示してキャッシュに保存します。
+    確認コマンドは読み取りのみのため、ドライランモードでも実行します。
+
+    Args:
+        logger: ロガーインスタンス.
+        config: 設定オブジェクト.
+
+    """
+    logger.section("更新計画")
+
+    probe_cache = ProbeCache.load(config.get_cache_dir() / PROBE_CACHE_FILE)
+    plan_cache = PlanCache.load(config.get_cache_dir() / PLAN_CACHE_FILE, config.general.plan_cache_ttl_minutes)
+
+    updaters: list[tuple[UpdaterSpec, BaseUpdater]] = []
+    for spec in _updater_specs(logger):
+        if not config.is_updater_enabled(spec.name) or not spec.is_supported():
+            continue
+        try:
+            updaters.append((spec, spec.create(logger, False, probe_cache)))
+        except Exception as e:
+            logger.error(f"{spec.display_name} の読み込みに失敗しました: {e}")
+
+    with ThreadPoolExecutor(max_workers=config.general.max_workers) as executor:
+        futures = [(spec, executor.submit(_plan_updater, spec, updater)) for spec, updater in updaters]
+        try:
+            wait([future for _spec, future in futures])
+        except KeyboardInterrupt:
+            # executorを抜ける際に実行中のコマンドの完了を待つため、先に終了させる
+            executor.shutdown(wait=False, cancel_futures=True)
+            terminate_running_commands()
+            raise
+
+    table = Table(title="更新計画")
+    table.add_column("Updater", style="yellow")
+    table.add_column("更新数", justify="right")
+    table.add_column("ダウンロード", justify="right")
+    table.add_column("予想時間", justify="right")
+
+    total_download = 0
+    total_seconds = 0.0
+    for spec, future in futures:
+        try:
+            plan = future.result()
+        except Exception as e:
+            logger.error(f"{spec.display_name} の更新確認に失敗しました: {e}")
+            continue
+        if plan is None:
+            continue
+
+        plan_cache.put(spec.name, plan)
+        total_download += plan.download_bytes or 0
+        total_seconds += plan.estimated_seconds or 0
+        table.add_row(
+            spec.display_name,
+            "不明" if plan.pending is None else str(plan.pending),
+            "-" if plan.download_bytes is None else _format_bytes(plan.download_bytes),
+            "-" if plan.estimated_seconds is None else _format_seconds(plan.estimated_seconds),
+        )
+
+    table.add_section()
+    table.add_row("合計", "", _format_bytes(total_download), _format_seconds(total_seconds))
+    Console().print(table)
+
+    probe_cache.save()
+    plan_cache.save()
+
+
+def run_prefetch(logger: SysupLogger, config: SysupConfig) -> bool:
+    """更新の事前ダウンロードを実行する.
+
+    有効なupdaterごとに、メタデータの更新(`general.metadata_max_age` の間はスキップ)、
+    更新数の確認、パッケージのダウンロードを順に行います。
+    確認した更新数は更新計画としてキャッシュに保存されます。
+
+    Args:
+        logger: ロガーインスタンス.
+        config: 設定オブジェクト.
+
+    Returns:
+        失敗したupdaterがない場合True.
+
+    """
+    logger.section("更新の事前ダウンロード")
+
+    probe_cache = ProbeCache.load(config.get_cache_dir() / PROBE_CACHE_FILE)
+    plan_cache = PlanCache.load(config.get_cache_dir() / PLAN_CACHE_FILE, config.general.plan_cache_ttl_minutes)
+    metadata_max_age = config.general.metadata_max_age.model_dump()
+
+    updaters: list[tuple[UpdaterSpec, BaseUpdater]] = []
+    for spec in _updater_specs(logger):
+        if not config.is_updater_enabled(spec.name) or not spec.is_supported():
+            continue
+        try:
+            updaters.append((spec, spec.create(logger, config.general.dry_run, probe_cache)))
+        except Exception as e:
+            logger.error(f"{spec.display_name} の読み込みに失敗しました: {e}")
+
+    _set_command_timeouts(config, updaters)
+
+    def prefetch_package(spec: UpdaterSpec, updater: BaseUpdater) -> tuple[str, str | None]:
+        if not updater.is_available():
+            return ("skip", "利用不可")
+        if _metadata_is_fresh(updater, metadata_max_age.get(spec.name, 0)):
+            logger.info(f"{updater.get_name()} のメタデータは最新のため、更新をスキップします")
+        elif not updater.refresh():
+            return ("failure", "メタデータ更新失敗")
+        # ドライランではコマンドを実行しないため、更新数を判定できない
+        if not config.general.dry_run:
+            plan = _plan_updater(spec, updater, with_download_size=False)
+            if plan is not None:
+                plan_cache.put(spec.name, plan)
+            if plan is not None and plan.pending == 0:
+                return ("skip", "更新なし")
+        if updater.prefetch():
+            return ("success", None)
+        return ("failure", "ダウンロード失敗")
+
+    # ダウンロードのみでパッケージの状態は変わらないため、updater間の依存関係は考慮しない
+    resource_limits = config.general.resource_limits.model_dump()
+    scheduler: TaskScheduler[tuple[str, str | None]] = TaskScheduler(config.general.max_workers, resource_limits)
+    for spec, updater in updaters:
+        scheduler.add_task(Task(spec.name, partial(prefetch_package, spec, updater), resources=tuple(spec.resources)))
+
+    counts = {"success": 0, "skip": 0, "failure": 0}
+
+    def on_complete(result: TaskResult[tuple[str, str | None]]) -> None:
+        if result.error is not None:
+            logger.error(f"{result.name} の事前ダウンロードに失敗しました: {result.error}")
+            counts["failure"] += 1
+            return
+        status, reason = result.value or ("failure", None)
+        if status == "failure":
+            logger.error(f"{result.name} の事前ダウンロードに失敗しました: {reason or '不明'}")
+        counts[status] += 1
+
+    scheduler.run(on_complete=on_complete, on_interrupt=terminate_running_commands)
+    probe_cache.save()
+    plan_cache.save()
+
+    logger.info(
+        f"事前ダウンロード完了: 成功 {counts['success']}件, スキップ {counts['skip']}件, 失敗 {counts['failure']}件"
+    )
+    return counts["failure"] == 0
+
+
+def show_history(store: HistoryStore, limit: int) -> None:
+    """実行履歴の集計を表示する.
+
+    Args:
+        store: 実行履歴ストア.
+        limit: 集計する直近の実行数.
+
+    Raises:
+        sqlite3.Error: 実行履歴の読み込みに失敗した場合.
+
+    """
+    console = Console()
+    runs = store.recent_runs(limit)
+    if not runs:
+        console.print("実行履歴がありません")
+        return
+
+    durations = [run.duration for run in runs]
+    latest = datetime.fromtimestamp(runs[0].started_at).strftime("%Y-%m-%d %H:%M")
+    console.print(f"直近{len(runs)}回の実行 (最終実行: {latest})")
+    p50 = _format_seconds(percentile(durations, 50) or 0)
+    p95 = _format_seconds(percentile(durations, 95) or 0)
+    console.print(f"処理時間: p50 {p50} / p95 {p95}")
+
+    table = Table(title="updaterごとの実行履歴")
+    table.add_column("Updater", style="yellow")
+    table.add_column("実行回数", justify="right")
+    table.add_column("失敗率", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("傾向", justify="right")
+    for summary in store.updater_summaries(limit):
+        table.add_row(
+            summary.name,
+            str(summary.runs),
+            f"{summary.failure_rate:.0%}",
+            "-" if summary.p50 is None else _format_seconds(summary.p50),
+            "-" if summary.p95 is None else _format_seconds(summary.p95),
+            "-" if summary.trend is None else f"{summary.trend:+.0%}",
+        )
+    console.print(table)
+
+
+def _plan_updater(spec: UpdaterSpec, updater: BaseUpdater, with_download_size: bool = True) -> PlanEntry | None:
+    """updaterの更新計画を求める.
+
+    Args:
+        spec: updaterのメタデータ.
+        updater: updaterインスタンス.
+        with_download_size: ダウンロードサイズも求めるかどうか.
+
+    Returns:
+        更新計画. updaterが利用できない場合None.
+
+    """
+    if not updater.is_available():
+        return None
+
+    pending = updater.plan()
+    if pending == 0:
+        return PlanEntry(pending=0, download_bytes=0, estimated_seconds=0.0)
+    download_bytes = updater.download_size() if with_download_size else None
+    return PlanEntry(pending, download_bytes, spec.estimated_seconds)
+
+
+def _expected_phase_seconds(config: SysupConfig, phase: str) -> dict[str, float]:
+    """実行履歴から、updaterごとのフェーズの予想所要時間を求める.
+
+    Args:
+        config: 設定オブジェクト.
+        phase: フェーズ名("refresh", "apply"など).
+
+    Returns:
+        updater名をキーとした、直近の実行の処理時間の中央値(秒). 実行履歴がない・読み込めない場合は空の辞書.
+
+    """
+    if not config.history.enabled:
+        return {}
+    store = HistoryStore(config.get_cache_dir() / HISTORY_FILE, config.history.keep_runs)
+    try:
+        durations = store.phase_durations(phase, _HISTORY_WINDOW)
+    except (sqlite3.Error, OSError):
+        return {}
+    return {name: percentile(values, 50) or 0.0 for name, values in durations.items()}
+
+
+def _set_command_timeouts(config: SysupConfig, updaters: list[tuple[UpdaterSpec, BaseUpdater]]) -> None:
+    """updaterにコマンドのタイムアウトを設定する.
+
+    `timeouts.adaptive` が有効な場合は、実行履歴に記録した直近50回の実行におけるコマンドごとの処理時間から
+    タイムアウトを決定します。`timeouts.updaters` で指定したupdaterには固定のタイムアウトを設定します。
+
+    Args:
+        config: 設定オブジェクト.
+        updaters: updaterの仕様とインスタンスのリスト.
+
+    """
+    timeouts = config.timeouts
+    durations: dict[str, list[float]] = {}
+    if timeouts.adaptive and config.history.enabled:
+        store = HistoryStore(config.get_cache_dir() / HISTORY_FILE, config.history.keep_runs)
+        try:
+            durations = store.command_durations(_TIMEOUT_HISTORY_WINDOW)
+        except (sqlite3.Error, OSError):
+            durations = {}
+
+    for spec, updater in updaters:
+        updater.command_timeouts = CommandTimeouts(
+            durations,
+            default_seconds=timeouts.default_seconds,
+            factor=timeouts.factor,
+            min_seconds=timeouts.min_seconds,
+            max_seconds=timeouts.max_seconds,
+            fixed=timeouts.updaters.get(spec.name),
+        )
+
 
+def _budget_priority(spec: UpdaterSpec) -> int:
+    """時間予算による選択での優先度を返す.
+
+    Args:
+        spec: updaterのメタデータ.
+
+    Returns:
+        OSのパッケージ(セキュリティ更新を含む)は0、コンパイルを伴う更新は2、それ以外は1.
+
+    """
+    if spec.system_updates:
+        return 0
+    if ResourceClass.CPU in spec.resources:
+        return 2
+    return 1
+
+
+def _expected_updater_seconds(
+    config: SysupConfig, updaters: list[tuple[UpdaterSpec, BaseUpdater]], plan_cache: PlanCache
+) -> dict[str, float]:
+    """updaterごとの予想所要時間を求める.
+
+    実行履歴に記録されたrefresh・plan・apply・post_updateフェーズの処理時間の中央値(直近20回)を合計します。
+    メタデータが新しいupdaterのrefresh、有効期間内の更新計画があり、メタデータを更新しないupdaterのplan、
+    更新がないことが分かっているupdaterのapplyは含めません。
+    applyの実行履歴がないupdaterは静的な見積もりを使用します。
+
+    Args:
+        config: 設定オブジェクト.
+        updaters: updaterの仕様とインスタンスのリスト.
+        plan_cache: 更新計画のキャッシュ.
+
+    Returns:
+        updater名をキーとした予想所要時間(秒).
+
+    """
+    phase_seconds = {
+        phase: _expected_phase_seconds(config, phase) for phase in ("refresh", "plan", "apply", "post_update")
+    }
+    metadata_max_age = config.general.metadata_max_age.model_dump()
+
+    expected: dict[str, float] = {}
+    for spec, updater in updaters:
+        if not updater.is_available():
+            expected[spec.name] = 0.0
+            continue
+        seconds = 0.0
+        needs_refresh = not _metadata_is_fresh(updater, metadata_max_age.get(spec.name, 0))
+        if needs_refresh:
+            seconds += phase_seconds["refresh"].get(spec.name, 0.0)
+        plan = _cached_plan(plan_cache, spec.name, updater, needs_refresh and _refreshes_metadata(updater))
+        if plan is None:
+            seconds += phase_seconds["plan"].get(spec.name, 0.0)
+        if plan is None or plan.pending != 0:
+            default = spec.estimated_seconds or _DEFAULT_ESTIMATED_SECONDS
+            seconds += phase_seconds["apply"].get(spec.name, default)
+        # 後処理は更新がない場合も実行する
+        seconds += phase_seconds["post_update"].get(spec.name, 0.0)
+        expected[spec.name] = seconds
+    return expected
+
+
+def _select_within_budget(
+    logger: SysupLogger,
+    config: SysupConfig,
+    updaters: list[tuple[UpdaterSpec, BaseUpdater]],
+    expected_seconds: dict[str, float],
+    budget_seconds: float,
+) -> BudgetPlan:
+    """時間予算に収まる更新を選択し、延期する更新を表示する.
+
+    前回延期した更新、OSのパッケージ、その他の更新、コンパイルを伴う更新の順に選択します。
+
+    Args:
+        logger: ロガーインスタンス.
+        config: 設定オブジェクト.
+        updaters: updaterの仕様とインスタンスのリスト.
+        expected_seconds: updater名をキーとした予想所要時間(秒).
+        budget_seconds: 時間予算(秒).
+
+    Returns:
+        選択の結果.
+
+    """
+    candidates = [
+        BudgetCandidate(spec.name, expected_seconds[spec.name], _budget_priority(spec), spec.dependencies)
+        for spec, _updater in updaters
+    ]
+    preferred = load_deferred(config.get_cache_dir() / DEFERRED_FILE)
+    plan = select_within_budget(candidates, budget_seconds, preferred)
+
+    budget = _format_seconds(budget_seconds)
+    expected = _format_seconds(plan.expected_seconds)
+    logger.info(f"時間予算 {budget}: {len(plan.selected)}件の更新を実行します (予想 {expected})")
+    display_names = {spec.name: updater.get_name() for spec, updater in updaters}
+    for name in plan.deferred:
+        seconds = _format_seconds(expected_seconds[name])
+        logger.warning(f"{display_names[name]} は時間予算に収まらないため次回に延期します (予想 {seconds})")
+    return plan
+
+
+def _metadata_is_fresh(updater: BaseUpdater, max_age_minutes: float) -> bool:
+    """updaterのパッケージメタデータが最大経過時間内に更新されているか判定する.
+
+    Args:
+        updater: updaterインスタンス.
+        max_age_minutes: メタデータの最大経過時間(分). 0の場合は常にFalse.
+
+    Returns:
+        最終更新からの経過時間が最大経過時間未満の場合True. 最終更新時刻が不明・未来の場合はFalse.
+
+    """
+    if max_age_minutes <= 0:
+        return False
+    updated_at = updater.metadata_updated_at()
+    if updated_at is None:
+        return False
+    return 0 <= time.time() - updated_at < max_age_minutes * 60
+
+
+def _refreshes_metadata(updater: BaseUpdater) -> bool:
+    """updaterがrefresh()でパッケージメタデータを更新するか判定する.
+
+    Args:
+        updater: updaterインスタンス.
+
+    Returns:
+        refresh()をオーバーライドしている場合True.
+
+    """
+    return getattr(type(updater), "refresh", None) is not BaseUpdater.refresh
+
+
+def _cached_plan(plan_cache: PlanCache, name: str, updater: BaseUpdater, refreshed: bool) -> PlanEntry | None:
+    """キャッシュした後にメタデータが更新されていない場合に限り、キャッシュした更新計画を返す.
+
+    Args:
+        plan_cache: 更新計画のキャッシュ.
+        name: updater名.
+        updater: updaterインスタンス.
+        refreshed: この実行でメタデータを更新したかどうか.
+
+    Returns:
+        有効期間内の更新計画. メタデータがキャッシュ後に更新された場合はNone.
+
+    """
+    if refreshed:
+        return None
+    return plan_cache.get(name, not_before=updater.metadata_updated_at())
+
+
+def _format_bytes(size: int) -> str:
+    """バイト数を表示用の文字列に変換する.
+
+    Args:
+        size: バイト数.
 
-def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker, auto_run: bool, force: bool) -> None:
+    Returns:
+        "1.5 MB"のような形式の文字列.
+
+    """
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def _format_seconds(seconds: float) -> str:
+    """秒数を表示用の文字列に変換する.
+
+    Args:
+        seconds: 秒数.
+
+    Returns:
+        "N分M秒"または"M秒"の形式の文字列.
+
+    """
+    minutes, rest = divmod(int(seconds), 60)
+    return f"{minutes}分{rest}秒" if minutes > 0 else f"{rest}秒"
+
+
+def _updater_specs(logger: SysupLogger) -> list[UpdaterSpec]:
+    """組み込み・サードパーティのupdaterのメタデータを返す.
+
+    Args:
+        logger: ロガーインスタンス. プラグインの読み込みエラーの報告に使用する.
+
+    Returns:
+        UpdaterSpecのリスト.
+
+    """
+
+    def on_error(name: str, error: Exception) -> None:
+        logger.warning(f"updaterプラグインの読み込みに失敗しました: {name}: {error}")
+
+    return get_updater_specs(on_error)
+
+
+def _refresh_task_name(name: str) -> str:
+    """updaterのrefreshフェーズのタスク名を返す.
+
+    Args:
+        name: updater名.
+
+    Returns:
+        refreshフェーズのタスク名.
+
+    """
+    return f"{name}{_REFRESH_SUFFIX}"
+
+
+def run_updates(
+    logger: SysupLogger,
+    config: SysupConfig,
+    checker: SystemChecker,
+    auto_run: bool,
+    force: bool,
+    self_updater: SelfUpdater | None = None,
+    budget_seconds: float | None = None,
+) -> None:
     """更新処理を実行する.
 
     システムチェック、バックアップ作成、各種updaterの実行、
     統計情報の表示、通知送信を行います。
+    バックアップはバックグラウンドで作成し、各updaterは自身のパッケージリストの取得完了後に更新を適用します。
 
     Args:
         logger: ロガーインスタンス.
@@ -259,6 +883,10 @@ def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker
         checker: システムチェッカーインスタンス.
         auto_run: 自動実行モード. 対話なしで実行.
         force: 強制実行. 日次チェックを無視.
+        self_updater: バックグラウンドで更新チェック中のSelfUpdater. sysupが更新された場合は
+            updaterの実行前に再実行する.
+        budget_seconds: 所要時間の上限(秒). 指定した場合は予想所要時間が収まる更新のみを実行し、
+            残りを次回に延期する. Noneの場合は制限しない.
 
     """
     # ヘッダー表示
@@ -275,82 +903,89 @@ def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker
     # 統計管理初期化
     stats = StatsManager(logger)
 
+    def save_aborted_metrics() -> None:
+        # 更新を行わずに終了した場合も記録し、前回の実行結果が最新のものとして残らないようにする
+        if config.metrics.enabled and not config.general.dry_run:
+            stats.save_to_metrics(config.get_metrics_file(), reboot_required=None, completed=False)
+
     # 日次実行チェック
     if not force and not checker.check_daily_run():
         logger.info("今日は既にシステム更新が実行済みです")
         if not auto_run:
             if not click.confirm("強制実行しますか？"):
+                save_aborted_metrics()
                 return
 
-    # バックアップ作成
-    if config.backup.enabled:
-        backup_manager = BackupManager(config.get_backup_dir(), config.backup.enabled)
-        backup_file = backup_manager.create_backup()
-        if backup_file:
-            logger.info(f"バックアップ作成: {backup_file.name}")
-            # 古いバックアップを削除
-            deleted = backup_manager.cleanup_old_backups(keep_count=10)
-            if deleted > 0:
-                logger.info(f"古いバックアップを{deleted}件削除しました")
-
     # 事前チェック
     logger.section("システムチェック")
 
-    if not checker.check_disk_space():
+    with stats.span("ディスク容量確認"):
+        disk_ok = checker.check_disk_space()
+    if not disk_ok:
         if not auto_run and not click.confirm("ディスク容量が不足していますが続行しますか？"):
+            save_aborted_metrics()
             return
 
-    if not checker.check_network():
+    with stats.span("ネットワーク確認"):
+        network_ok = checker.check_network()
+    if not network_ok:
         if not auto_run and not click.confirm("ネットワーク接続に問題がありますが続行しますか？"):
+            save_aborted_metrics()
             return
 
-    if not checker.check_sudo_available():
+    with stats.span("sudo確認"):
+        sudo_ok = checker.check_sudo_available()
+    if not sudo_ok:
         logger.warning("sudo権限が必要です")
         if auto_run:
             logger.error("自動実行モードではsudo権限が必要です")
+            save_aborted_metrics()
             return
 
+    # sysup自身が更新された場合は、updaterモジュールを読み込む前に新しいバージョンで再実行する
+    if self_updater is not None:
+        with stats.span("セルフアップデート確認"):
+            self_updater.restart_if_updated(before_restart=checker.cleanup_lock)
+
     # 更新実行
     logger.section("パッケージ更新")
 
-    # 有効なupdaterを収集
-    updaters: list[tuple[str, BaseUpdater]] = []
-    if config.is_updater_enabled("apt"):
-        updaters.append(("apt", AptUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("snap"):
-        updaters.append(("snap", SnapUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("brew"):
-        updaters.append(("brew", BrewUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("scoop"):
-        updaters.append(("scoop", ScoopUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("npm"):
-        updaters.append(("npm", NpmUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("pnpm"):
-        updaters.append(("pnpm", PnpmUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("pipx"):
-        updaters.append(("pipx", PipxUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("uv"):
-        updaters.append(("uv", UvUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("rustup"):
-        updaters.append(("rustup", RustupUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("cargo"):
-        updaters.append(("cargo", CargoUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("flatpak"):
-        updaters.append(("flatpak", FlatpakUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("gem"):
-        updaters.append(("gem", GemUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("nvm"):
-        updaters.append(("nvm", NvmUpdater(logger, config.general.dry_run)))
-    if config.is_updater_enabled("firmware"):
-        updaters.append(("firmware", FirmwareUpdater(logger, config.general.dry_run)))
+    # 有効なupdaterを収集(updaterモジュールは有効なもののみimportする)
+    probe_cache = ProbeCache.load(config.get_cache_dir() / PROBE_CACHE_FILE)
+    updaters: list[tuple[UpdaterSpec, BaseUpdater]] = []
+    for spec in _updater_specs(logger):
+        if not config.is_updater_enabled(spec.name):
+            continue
+        if not spec.is_supported():
+            stats.record_skip(spec.name, "利用不可")
+            continue
+        try:
+            updaters.append((spec, spec.create(logger, config.general.dry_run, probe_cache)))
+        except Exception as e:
+            logger.error(f"{spec.display_name} の読み込みに失敗しました: {e}")
+            stats.record_failure(spec.name, "読み込み失敗")
 
     if not updaters:
         logger.warning("有効なupdaterがありません")
+        save_aborted_metrics()
         return
 
-    sudo_required = {"apt", "snap", "firmware"}
+    _set_command_timeouts(config, updaters)
+
+    plan_cache = PlanCache.load(config.get_cache_dir() / PLAN_CACHE_FILE, config.general.plan_cache_ttl_minutes)
+
+    # 時間予算が指定された場合は、予算内に収まる更新のみを実行し、残りを次回に延期する
+    budget_plan: BudgetPlan | None = None
+    expected_seconds: dict[str, float] = {}
+    if budget_seconds is not None:
+        expected_seconds = _expected_updater_seconds(config, updaters, plan_cache)
+        budget_plan = _select_within_budget(logger, config, updaters, expected_seconds, budget_seconds)
+        updaters = [(spec, updater) for spec, updater in updaters if spec.name in budget_plan.selected]
+        for name in budget_plan.deferred:
+            stats.record_skip(name, "時間予算のため延期")
+
     if config.general.parallel_updates:
-        updaters.sort(key=lambda item: item[0] not in sudo_required)
+        updaters.sort(key=lambda item: not item[0].requires_sudo)
 
     total_updaters = len(updaters)
 
@@ -358,7 +993,7 @@ def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker
         config.general.parallel_updates
         and not is_windows()
         and not config.general.dry_run
-        and any(name in sudo_required and updater.is_available() for name, updater in updaters)
+        and any(spec.requires_sudo and updater.is_available() for spec, updater in updaters)
     ):
         logger.info("並列更新のため、sudo認証を事前に実行します")
         try:
@@ -367,65 +1002,186 @@ def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker
             logger.warning("sudoコマンドが見つかりません。sudoが必要な更新は失敗する可能性があります")
             if auto_run:
                 logger.error("自動実行モードではsudoが必要な更新を続行できません")
+                save_aborted_metrics()
                 return
         except subprocess.CalledProcessError:
             logger.warning("sudo認証に失敗しました。sudoが必要な更新は失敗する可能性があります")
             if auto_run:
                 logger.error("自動実行モードではsudo認証に失敗すると継続できません")
+                save_aborted_metrics()
                 return
 
-    if config.general.parallel_updates:
-        # 並列更新
-        logger.info("並列更新モードで実行中...")
+    # バックアップ開始
+    # パッケージリストの取得はバックグラウンドで行い、各updaterはapplyの前に自身のバックアップの完了を待つ
+    # セルフアップデートによる再実行や途中での終了で書き込み中のバックアップが残らないよう、
+    # 以降に中断する経路がない位置で開始する
+    backup_manager = BackupManager(config.get_backup_dir(), config.backup.enabled, config.backup.collect_timeout)
+    backup_job = backup_manager.start_backup()
 
-        def update_package(item: tuple[str, BaseUpdater]) -> tuple[str, str, str | None]:
-            name, updater = item
-            if not updater.is_available():
-                return (name, "skip", "利用不可")
-            try:
-                if updater.perform_update():
-                    return (name, "success", None)
-                else:
-                    return (name, "failure", "更新失敗")
-            except Exception as e:
-                return (name, "failure", str(e))
+    # refreshフェーズ(メタデータ更新)で失敗したupdater
+    refresh_failed: set[str] = set()
+    # この実行でメタデータを更新したupdater
+    refreshed: set[str] = set()
 
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {executor.submit(update_package, item): item for item in updaters}
+    metadata_max_age = config.general.metadata_max_age.model_dump()
 
-            for i, future in enumerate(as_completed(futures), 1):
-                name, status, error = future.result()
-                logger.progress_step(i, total_updaters, f"{name}完了")
+    # applyの前に確認した更新可能なパッケージ数(成功時に更新したパッケージ数として記録する)
+    pending_counts: dict[str, int] = {}
 
-                if status == "success":
-                    stats.record_success(name)
-                elif status == "skip":
-                    stats.record_skip(name, error or "不明")
-                else:
-                    stats.record_failure(name, error or "不明")
-    else:
-        # 逐次更新
-        for i, (name, updater) in enumerate(updaters, 1):
-            logger.progress_step(i, total_updaters, f"{updater.get_name()}を更新中")
+    # updaterごとのスパン. 別々のタスクで実行するフェーズ(refresh・plan・backup・apply・post_update)をまとめる
+    updater_spans = {spec.name: stats.updater_span(spec.name) for spec, _updater in updaters}
 
+    def refresh_package(spec: UpdaterSpec, updater: BaseUpdater) -> tuple[str, str | None]:
+        with span("refresh", "phase", parent=updater_spans[spec.name]):
             if not updater.is_available():
-                stats.record_skip(name, "利用不可")
-                continue
+                return ("skip", "利用不可")
+            if _metadata_is_fresh(updater, metadata_max_age.get(spec.name, 0)):
+                logger.info(f"{updater.get_name()} のメタデータは最新のため、更新をスキップします")
+                return ("success", None)
+            if _refreshes_metadata(updater):
+                refreshed.add(spec.name)
+            if updater.refresh():
+                return ("success", None)
+            return ("failure", "メタデータ更新失敗")
+
+    def update_package(spec: UpdaterSpec, updater: BaseUpdater) -> tuple[str, str | None]:
+        if not updater.is_available():
+            return ("skip", "利用不可")
+        if spec.name in refresh_failed:
+            return ("failure", "メタデータ更新失敗")
+        # ドライランではコマンドを実行しないため、更新数を判定できない
+        if not config.general.dry_run:
+            # 有効期間内の更新計画(sysup planの結果など)があれば再利用する
+            # メタデータを更新した場合は、キャッシュした時点から更新可能なパッケージが変わりうるため再確認する
+            plan = _cached_plan(plan_cache, spec.name, updater, spec.name in refreshed)
+            if plan is None:
+                with span("plan", "phase", parent=updater_spans[spec.name]):
+                    plan = _plan_updater(spec, updater, with_download_size=False)
+                if plan is not None:
+                    plan_cache.put(spec.name, plan)
+            if plan is not None and plan.pending == 0:
+                logger.info(f"{updater.get_name()} は最新です - スキップ")
+                # 不要パッケージの削除などの後処理は、更新がない場合も行う
+                if not post_update_package(spec, updater):
+                    return ("failure", "後処理失敗")
+                return ("skip", "更新なし")
+            if plan is not None and plan.pending is not None:
+                logger.info(f"{updater.get_name()} 更新可能パッケージ数: {plan.pending}")
+                pending_counts[spec.name] = plan.pending
+        # 更新の適用後はパッケージの状態が変わるため、更新計画を破棄する
+        plan_cache.discard(spec.name)
+        # 自身のパッケージリストのバックアップの完了を待ってから更新を適用する
+        # 待機用のタスクを分けるとワーカーを占有するため、applyのタスク内で待つ
+        if backup_job is not None and spec.name in backup_job.names:
+            with span("backup", "phase", parent=updater_spans[spec.name]):
+                backup_job.wait(spec.name)
+        with span("apply", "phase", parent=updater_spans[spec.name]):
+            applied = updater.apply()
+        if not applied:
+            return ("failure", "更新失敗")
+        if not post_update_package(spec, updater):
+            return ("failure", "後処理失敗")
+        return ("success", None)
+
+    def post_update_package(spec: UpdaterSpec, updater: BaseUpdater) -> bool:
+        with span("post_update", "phase", parent=updater_spans[spec.name]):
+            return updater.post_update()
+
+    # 全updaterのrefreshを先に登録し、ネットワーク待ちを並行させる
+    # applyは自身のrefreshと依存先(例: rustup→cargo, nvm→npm/pnpm)の完了後に開始し、自身のバックアップの完了を待って適用する
+    # 逐次更新はワーカー1つのスケジューラとして扱う
+    max_workers = config.general.max_workers if config.general.parallel_updates else 1
+    resource_limits = config.general.resource_limits.model_dump()
+    scheduler: TaskScheduler[tuple[str, str | None]] = TaskScheduler(max_workers, resource_limits)
+    display_names: dict[str, str] = {}
+
+    # 並列更新では、過去の実行の処理時間から予想所要時間の長いupdaterを先に開始する
+    # 逐次更新では所要時間の合計は変わらないため、登録順に実行する
+    refresh_seconds: dict[str, float] = {}
+    apply_seconds: dict[str, float] = {}
+    if config.general.parallel_updates:
+        refresh_seconds = _expected_phase_seconds(config, "refresh")
+        apply_seconds = _expected_phase_seconds(config, "apply")
+        for spec, _updater in updaters:
+            apply_seconds.setdefault(spec.name, spec.estimated_seconds or _DEFAULT_ESTIMATED_SECONDS)
+
+    for spec, updater in updaters:
+        scheduler.add_task(
+            Task(
+                _refresh_task_name(spec.name),
+                partial(refresh_package, spec, updater),
+                cost=refresh_seconds.get(spec.name, 0.0),
+            )
+        )
+    for spec, updater in updaters:
+        display_names[spec.name] = updater.get_name()
+        scheduler.add_task(
+            Task(
+                spec.name,
+                partial(update_package, spec, updater),
+                dependencies=(_refresh_task_name(spec.name), *spec.dependencies),
+                resources=tuple(spec.resources),
+                cost=apply_seconds.get(spec.name, 0.0),
+            )
+        )
+
+    started = 0
+    completed = 0
+
+    def on_start(task: Task[tuple[str, str | None]]) -> None:
+        nonlocal started
+        if task.name not in display_names:
+            return
+        started += 1
+        if not config.general.parallel_updates:
+            logger.progress_step(started, total_updaters, f"{display_names[task.name]}を更新中")
+
+    def on_complete(result: TaskResult[tuple[str, str | None]]) -> None:
+        nonlocal completed
+        if result.name not in display_names:
+            # refreshフェーズの結果はapplyフェーズで反映する
+            if result.error is not None or (result.value and result.value[0] == "failure"):
+                refresh_failed.add(result.name.removesuffix(_REFRESH_SUFFIX))
+            return
 
-            try:
-                if updater.perform_update():
-                    stats.record_success(name)
-                else:
-                    stats.record_failure(name, "更新失敗")
-            except Exception as e:
-                stats.record_failure(name, str(e))
+        completed += 1
+        if config.general.parallel_updates:
+            logger.progress_step(completed, total_updaters, f"{result.name}完了")
+
+        if result.error is not None:
+            stats.record_failure(result.name, str(result.error))
+            return
+
+        status, reason = result.value or ("failure", None)
+        if status == "success":
+            stats.record_success(result.name)
+            if result.name in pending_counts:
+                stats.record_packages(result.name, pending_counts[result.name])
+        elif status == "skip":
+            stats.record_skip(result.name, reason or "不明")
+        else:
+            stats.record_failure(result.name, reason or "不明")
+
+    if config.general.parallel_updates:
+        logger.info(f"並列更新モードで実行中... (最大{max_workers}並列)")
+    scheduler.run(on_start=on_start, on_complete=on_complete, on_interrupt=terminate_running_commands)
+    probe_cache.save()
+    plan_cache.save()
+
+    if backup_job is not None:
+        backup_file = backup_job.result()
+        if backup_file:
+            logger.info(f"バックアップ作成: {backup_file.name}")
+            # 古いバックアップを削除
+            deleted = backup_manager.cleanup_old_backups(keep_count=config.backup.keep_count)
+            if deleted > 0:
+                logger.info(f"古いバックアップを{deleted}件削除しました")
 
     # 再起動チェック
-    if checker.check_reboot_required():
+    reboot_required = checker.check_reboot_required()
+    if reboot_required:
         if not auto_run and click.confirm("今すぐ再起動しますか？"):
             logger.info("5秒後に再起動します...")
-            import time
-
             time.sleep(5)
             subprocess.run(["sudo", "reboot"])
         else:
@@ -434,6 +1190,21 @@ def run_updates(logger: SysupLogger, config: SysupConfig, checker: SystemChecker
     # サマリー表示
     stats.show_summary()
     stats.save_to_log(config.get_log_dir())
+    # ドライランの処理時間は実際の更新と異なるため、履歴には記録しない
+    if config.history.enabled and not config.general.dry_run:
+        stats.save_to_history(HistoryStore(config.get_cache_dir() / HISTORY_FILE, config.history.keep_runs))
+    if config.metrics.enabled and not config.general.dry_run:
+        backup_duration = backup_job.duration if backup_job is not None else None
+        stats.save_to_metrics(config.get_metrics_file(), backup_duration, reboot_required)
+
+    # 延期した更新を記録し、次回の実行で優先する
+    if not config.general.dry_run:
+        deferred = budget_plan.deferred if budget_plan is not None else []
+        save_deferred(config.get_cache_dir() / DEFERRED_FILE, deferred)
+        # 次の予算に収まる更新が残っている場合は、同じ日の次回の自動実行を許可する
+        if budget_seconds is not None and any(expected_seconds[name] <= budget_seconds for name in deferred):
+            checker.clear_daily_run()
+            logger.info("延期した更新は次回の実行で優先して実行します")
 
     logger.success("🎉 システム更新が完了しました！")
 
@@ -0,0 +1,130 @@
+"""sysupの軽量エントリーポイント.
+
+WSLのシェル起動時フックなどから `sysup update --auto-run` が頻繁に呼ばれるため、
+今日の更新が既に完了している場合は、rich・pydantic・各updaterのimportや
+セルフアップデートを行う前に終了します。
+このモジュールは標準ライブラリと `sysup.core.paths` 以外をimportしません。
+"""
+
+import sys
+import tomllib
+from datetime import date
+from pathlib import Path
+
+from sysup.core.paths import DAILY_RUN_FILE, DEFAULT_CACHE_DIR, default_config_paths
+
+# 指定された場合に日次チェックの高速パスを使用しないオプション
+_SLOW_PATH_OPTIONS = frozenset({"--force", "--list", "--setup-wsl", "--help"})
+
+
+def normalize_args(args: list[str]) -> list[str]:
+    """引数を正規化する.
+
+    旧形式の `sysup --auto-run` を `sysup update --auto-run` として扱います。
+
+    Args:
+        args: コマンドライン引数(プログラム名を除く).
+
+    Returns:
+        正規化した引数.
+
+    """
+    if "--auto-run" in args and args[0].startswith("-"):
+        return ["update", *args]
+    return args
+
+
+def _config_path_from_args(args: list[str]) -> Path | None:
+    """引数から設定ファイルのパスを取り出す.
+
+    Args:
+        args: `update` サブコマンドの引数.
+
+    Returns:
+        設定ファイルのパス. 指定されていない場合None.
+
+    """
+    for i, arg in enumerate(args):
+        if arg in ("--config", "-c") and i + 1 < len(args):
+            return Path(args[i + 1])
+        if arg.startswith("--config="):
+            return Path(arg.removeprefix("--config="))
+        if arg.startswith("-c") and len(arg) > 2:
+            return Path(arg[2:])
+    return None
+
+
+def _cache_dir(config_path: Path | None) -> Path:
+    """設定ファイルからキャッシュディレクトリを読み取る.
+
+    pydanticによる検証は行わず、`[general].cache_dir` のみを参照します。
+
+    Args:
+        config_path: 設定ファイルのパス. Noneの場合は既定の検索パスから探す.
+
+    Returns:
+        キャッシュディレクトリのパス.
+
+    Raises:
+        OSError: 指定された設定ファイルを読み込めない場合.
+        tomllib.TOMLDecodeError: 設定ファイルの形式が不正な場合.
+        ValueError: cache_dirが文字列でない場合.
+
+    """
+    if config_path is None:
+        config_path = next((path for path in default_config_paths() if path.exists()), None)
+
+    cache_dir = DEFAULT_CACHE_DIR
+    if config_path is not None:
+        with open(config_path, "rb") as f:
+            general = tomllib.load(f).get("general", {})
+        cache_dir = general.get("cache_dir", DEFAULT_CACHE_DIR)
+        if not isinstance(cache_dir, str):
+            raise ValueError(f"cache_dirが不正です: {cache_dir!r}")
+
+    return Path(cache_dir).expanduser()
+
+
+def already_ran_today(args: list[str]) -> bool:
+    """自動実行で、今日の更新が既に完了しているか判定する.
+
+    `update --auto-run` で、日次チェックを無視・回避するオプションが指定されていない場合のみ
+    キャッシュディレクトリの実行記録を確認します。
+    設定ファイルの読み込みに失敗した場合は、通常の処理でエラーを報告させるためFalseを返します。
+
+    Args:
+        args: 正規化済みのコマンドライン引数.
+
+    Returns:
+        今日の更新が既に完了している場合True.
+
+    """
+    if not args or args[0] != "update":
+        return False
+
+    options = args[1:]
+    if "--auto-run" not in options or _SLOW_PATH_OPTIONS.intersection(options):
+        return False
+
+    try:
+        stamp = _cache_dir(_config_path_from_args(options)) / DAILY_RUN_FILE
+        return stamp.read_text().strip() == date.today().isoformat()
+    except (OSError, ValueError):
+        return False
+
+
+def main() -> None:
+    """sysupを実行する.
+
+    今日の自動実行が既に完了している場合は即座に終了し、
+    それ以外の場合はCLI本体(sysup.cli.cli.main)を実行します。
+    """
+    args = normalize_args(sys.argv[1:])
+
+    if already_ran_today(args):
+        sys.stdout.write(f"今日は既に実行済みです: {date.today().isoformat()}\n")
+        return
+
+    from sysup.cli.cli import main as cli_main
+
+    cli_main(args=args, prog_name="sysup")
@@ -3,12 +3,369 @@
 このモジュールはパッケージリストのバックアップ機能を提供します。
 各種パッケージマネージャのインストール済みパッケージリストを取得し、
 JSON形式でバックアップファイルに保存します。
+
+パッケージリストは内容のSHA-256をキーとするblobとして `blobs/` にgzip圧縮して保存し、
+バックアップファイル(スナップショットのマニフェスト)からはblobのハッシュで参照します。
+前回から変化していないパッケージリストは再書き込みされず、同じblobが共有されます。
+
+各バックアップのタイムスタンプ・パッケージ数・参照するblobはインデックスファイル(`index.json`)にも記録され、
+一覧表示や古いバックアップの削除ではバックアップファイルを個別に読み込みません。
 """
 
+import contextlib
+import gzip
+import hashlib
 import json
+import os
+import signal
 import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Any
+
+from .dpkg import selected_packages
+from .platform import is_windows
+
+# パッケージリスト取得全体の既定の制限時間(秒)
+DEFAULT_COLLECT_TIMEOUT = 60.0
+
+# パッケージリスト取得用の各コマンドのタイムアウト(秒)
+COLLECTOR_COMMAND_TIMEOUT = 30.0
+
+# パッケージリストの取得結果(パッケージリスト、状態、所要時間(秒))
+CollectorResult = tuple[list[str] | None, str, float]
+
+# バックアップファイル(マニフェスト)の形式のバージョン
+MANIFEST_VERSION = 2
+
+# バックアップディレクトリ内のblobの保存先
+BLOBS_DIR = "blobs"
+
+# バックアップディレクトリ内のインデックスファイル名
+INDEX_FILE = "index.json"
+
+# インデックスファイルの形式のバージョン
+INDEX_VERSION = 1
+
+# gzipファイルの先頭のマジックナンバー
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# パッケージリストのJSONエンコーダ(blobの内容が同じになるよう区切り文字を固定する)
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """ファイルを一時ファイル経由で書き込む.
+
+    Args:
+        path: 書き込み先のパス.
+        text: 書き込む内容.
+
+    Raises:
+        OSError: 書き込みに失敗した場合.
+
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    finally:
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+
+
+def _kill_process_group(process: subprocess.Popen[str]) -> None:
+    """プロセスを、起動した子プロセスも含めて強制終了させる.
+
+    Args:
+        process: 対象プロセス. POSIXでは独立したプロセスグループで起動されている必要がある.
+
+    """
+    if process.poll() is not None:
+        return
+
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        if is_windows():
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+class BlobStore:
+    """内容のハッシュをキーとしてデータを保存するストア.
+
+    データは圧縮前の内容のSHA-256の16進表現をキーとして、`<root>/<先頭2文字>/<ハッシュ>` に
+    gzip圧縮して保存されます。同じ内容のデータは1度だけ書き込まれます。
+
+    Attributes:
+        root: blobの保存ディレクトリ.
+
+    """
+
+    def __init__(self, root: Path):
+        """BlobStoreを初期化する.
+
+        Args:
+            root: blobの保存ディレクトリ.
+
+        """
+        self.root: Path = root
+
+    def path(self, digest: str) -> Path:
+        """blobの保存先のパスを返す.
+
+        Args:
+            digest: blobのハッシュ.
+
+        Returns:
+            blobのパス.
+
+        """
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """データを保存する.
+
+        Args:
+            data: 保存するデータ.
+
+        Returns:
+            blobのハッシュ.
+
+        Raises:
+            OSError: 書き込みに失敗した場合.
+
+        """
+        return self.put_stream((data,))
+
+    def put_stream(self, chunks: Iterable[bytes]) -> str:
+        """データを分割して受け取り、圧縮しながら保存する.
+
+        データ全体をメモリ上に保持せずに、一時ファイルへ圧縮しながら書き込み、
+        ハッシュが確定した時点で保存先に移動します。
+        同じ内容のblobが既に存在する場合は一時ファイルを破棄します。
+
+        Args:
+            chunks: 保存するデータの断片.
+
+        Returns:
+            blobのハッシュ.
+
+        Raises:
+            OSError: 書き込みに失敗した場合.
+
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    compressed.write(chunk)
+
+            digest = hasher.hexdigest()
+            path = self.path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, path)
+            return digest
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+
+    def get(self, digest: str) -> bytes:
+        """データを読み込む.
+
+        圧縮されていないblobにも対応します。
+
+        Args:
+            digest: blobのハッシュ.
+
+        Returns:
+            保存されたデータ.
+
+        Raises:
+            OSError: blobが存在しない場合.
+
+        """
+        data = self.path(digest).read_bytes()
+        if data.startswith(_GZIP_MAGIC):
+            return gzip.decompress(data)
+        return data
+
+    def digests(self) -> set[str]:
+        """保存されているblobのハッシュを返す.
+
+        Returns:
+            blobのハッシュの集合.
+
+        """
+        if not self.root.exists():
+            return set()
+        return {path.name for path in self.root.glob("*/*") if not path.name.endswith(".tmp")}
+
+    def remove(self, digest: str) -> None:
+        """blobを削除する.
+
+        Args:
+            digest: blobのハッシュ.
+
+        """
+        self.path(digest).unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class BackupSnapshot:
+    """インデックスに記録されたバックアップ.
+
+    Attributes:
+        path: バックアップファイルのパス.
+        timestamp: バックアップのタイムスタンプ(YYYYmmdd_HHMMSS).
+        package_counts: パッケージマネージャ名をキーとするパッケージ数.
+
+    """
+
+    path: Path
+    timestamp: str
+    package_counts: dict[str, int]
+
+
+def _timed(collector: Callable[[], list[str] | None]) -> CollectorResult:
+    """パッケージリストを取得し、所要時間を計測する.
+
+    Args:
+        collector: パッケージリスト取得関数.
+
+    Returns:
+        パッケージリスト(取得失敗時はNone)、状態("ok"または"unavailable")、所要時間(秒)の組.
+
+    """
+    start = time.perf_counter()
+    try:
+        result = collector()
+    except Exception:
+        result = None
+    return result, "unavailable" if result is None else "ok", time.perf_counter() - start
+
+
+class BackupJob:
+    """バックグラウンドで実行中のバックアップ.
+
+    BackupManager.start_backup()で生成します。
+    各パッケージマネージャのパッケージリストの取得完了は wait() で個別に待つことができるため、
+    パッケージマネージャごとに、自身のバックアップが完了した時点で更新を開始できます。
+
+    制限時間(collect_timeout)を超えた取得処理は待たずに打ち切り、実行中のコマンドを終了させます。
+
+    Attributes:
+        collect_timeout: パッケージリスト取得全体の制限時間(秒).
+
+    """
+
+    def __init__(
+        self,
+        futures: Mapping[str, Future[CollectorResult]],
+        collect_timeout: float,
+        write: Callable[[Mapping[str, CollectorResult]], Path | None],
+        executor: ThreadPoolExecutor,
+        cancel: Callable[[], None] | None = None,
+    ):
+        """BackupJobを初期化し、バックアップファイルの書き出しを予約する.
+
+        Args:
+            futures: パッケージマネージャ名をキーとする、パッケージリスト取得処理.
+            collect_timeout: パッケージリスト取得全体の制限時間(秒).
+            write: 取得結果をバックアップファイルに書き出す関数.
+            executor: バックアップファイルの書き出しに使用するエグゼキュータ.
+            cancel: 制限時間を超えた取得処理を終了させる関数.
+
+        """
+        self.collect_timeout: float = collect_timeout
+        self._futures: dict[str, Future[CollectorResult]] = dict(futures)
+        self._started_at: float = time.monotonic()
+        self._finished_at: float | None = None
+        self._deadline: float = self._started_at + collect_timeout
+        self._cancel: Callable[[], None] | None = cancel
+        self._file: Future[Path | None] = executor.submit(self._write, write)
+
+    def _write(self, write: Callable[[Mapping[str, CollectorResult]], Path | None]) -> Path | None:
+        """すべての取得完了を待ってバックアップファイルを書き出し、完了時刻を記録する.
+
+        制限時間を超えた取得処理がある場合は、そのコマンドを終了させます。
+        終了させないと、取得処理のスレッドがコマンドのタイムアウトまで残り、sysupの終了を遅らせます。
+
+        Args:
+            write: 取得結果をバックアップファイルに書き出す関数.
+
+        Returns:
+            バックアップファイルのパス. 失敗時はNone.
+
+        """
+        try:
+            results = self.results()
+            if self._cancel and any(status == "timeout" for _result, status, _seconds in results.values()):
+                self._cancel()
+            return write(results)
+        finally:
+            self._finished_at = time.monotonic()
+
+    @property
+    def duration(self) -> float | None:
+        """バックアップ(パッケージリストの取得とファイルの書き出し)の所要時間(秒). 完了していない場合None."""
+        if self._finished_at is None:
+            return None
+        return self._finished_at - self._started_at
+
+    @property
+    def names(self) -> frozenset[str]:
+        """バックアップ対象のパッケージマネージャ名."""
+        return frozenset(self._futures)
+
+    def wait(self, name: str) -> CollectorResult:
+        """パッケージマネージャのパッケージリストの取得完了を待つ.
+
+        Args:
+            name: パッケージマネージャ名.
+
+        Returns:
+            パッケージリスト(取得失敗・打ち切り時はNone)、状態("ok"、"unavailable"、"timeout")、
+            所要時間(秒)の組. バックアップ対象外の場合は状態が"unavailable"となる.
+
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return None, "unavailable", 0.0
+
+        try:
+            return future.result(timeout=max(0.0, self._deadline - time.monotonic()))
+        except TimeoutError:
+            return None, "timeout", self.collect_timeout
+
+    def results(self) -> dict[str, CollectorResult]:
+        """すべてのパッケージリストの取得完了を待つ.
+
+        Returns:
+            パッケージマネージャ名をキーとする取得結果の辞書.
+
+        """
+        return {name: self.wait(name) for name in self._futures}
+
+    def result(self) -> Path | None:
+        """バックアップファイルの書き出し完了を待つ.
+
+        Returns:
+            バックアップファイルのパス. 失敗時はNone.
+
+        """
+        return self._file.result()
 
 
 class BackupManager:
@@ -20,19 +377,30 @@ class BackupManager:
     Attributes:
         backup_dir: バックアップファイルの保存ディレクトリ.
         enabled: バックアップ機能の有効/無効フラグ.
+        collect_timeout: パッケージリスト取得全体の制限時間(秒).
+        blob_store: パッケージリストのblobストア.
+        index_file: バックアップのインデックスファイルのパス.
 
     """
 
-    def __init__(self, backup_dir: Path, enabled: bool = True):
+    def __init__(self, backup_dir: Path, enabled: bool = True, collect_timeout: float = DEFAULT_COLLECT_TIMEOUT):
         """BackupManagerを初期化する.
 
         Args:
             backup_dir: バックアップファイルの保存ディレクトリ.
             enabled: バックアップを有効にするかどうか. デフォルトはTrue.
+            collect_timeout: パッケージリスト取得全体の制限時間(秒). デフォルトは60秒.
 
         """
         self.backup_dir: Path = backup_dir
         self.enabled: bool = enabled
+        self.collect_timeout: float = collect_timeout
+        self.blob_store: BlobStore = BlobStore(backup_dir / BLOBS_DIR)
+        self.index_file: Path = backup_dir / INDEX_FILE
+        self._index_lock: threading.Lock = threading.Lock()
+        # 実行中のパッケージリスト取得コマンド
+        self._processes: set[subprocess.Popen[str]] = set()
+        self._processes_lock: threading.Lock = threading.Lock()
 
         if self.enabled:
             self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -40,8 +408,10 @@ class BackupManager:
     def create_backup(self) -> Path | None:
         """現在のパッケージリストをバックアップする.
 
-        各種パッケージマネージャから現在インストールされているパッケージリストを取得し、
+        各種パッケージマネージャから現在インストールされているパッケージリストを並行して取得し、
         タイムスタンプ付きのJSONファイルとして保存します。
+        制限時間内に取得できなかったパッケージマネージャはバックアップに含めません。
+        各パッケージマネージャの取得結果と所要時間は `collectors` に記録されます。
 
         Returns:
             バックアップファイルのパス. 失敗時またはバックアップ無効時はNone.
@@ -52,88 +422,182 @@ class BackupManager:
             >>> print(backup_file)
             ~/.local/share/sysup/backups/packages_20250101_120000.json
 
+        """
+        job = self.start_backup()
+        if job is None:
+            return None
+        return job.result()
+
+    def start_backup(self) -> "BackupJob | None":
+        """バックアップをバックグラウンドで開始する.
+
+        パッケージリストの取得を並行して開始し、すぐに戻ります。
+        すべての取得が完了する(または制限時間に達する)と、バックアップファイルが書き出されます。
+
+        Returns:
+            実行中のバックアップ. バックアップ無効時はNone.
+
+        Examples:
+            >>> job = manager.start_backup()
+            >>> job.wait("apt")  # APTのパッケージリストの取得完了を待つ
+            >>> backup_file = job.result()
+
         """
         if not self.enabled:
             return None
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        collectors = self._collectors()
+        # パッケージリストの取得とバックアップファイルの書き出しのワーカー
+        executor = ThreadPoolExecutor(max_workers=len(collectors) + 1, thread_name_prefix="sysup-backup")
+        futures = {name: executor.submit(_timed, collector) for name, collector in collectors.items()}
+        job = BackupJob(
+            futures, self.collect_timeout, partial(self._write_backup, timestamp), executor, self._kill_collectors
+        )
+        executor.shutdown(wait=False)
+        return job
+
+    def _write_backup(self, timestamp: str, results: Mapping[str, CollectorResult]) -> Path | None:
+        """パッケージリストの取得結果をバックアップファイルに書き出す.
+
+        Args:
+            timestamp: バックアップのタイムスタンプ.
+            results: パッケージマネージャ名をキーとする取得結果.
+
+        Returns:
+            バックアップファイルのパス. 失敗時はNone.
+
+        """
         backup_file = self.backup_dir / f"packages_{timestamp}.json"
 
-        backup_data: dict[str, object] = {"timestamp": timestamp, "packages": {}}
-        packages: dict[str, list[str]] = {}
+        try:
+            blobs: dict[str, str] = {}
+            counts: dict[str, int] = {}
+            collectors: dict[str, dict[str, object]] = {}
+            for name, (result, status, seconds) in results.items():
+                if result:
+                    chunks = (chunk.encode("utf-8") for chunk in _JSON_ENCODER.iterencode(result))
+                    blobs[name] = self.blob_store.put_stream(chunks)
+                    counts[name] = len(result)
+                collectors[name] = {"status": status, "seconds": round(seconds, 3)}
+
+            manifest: dict[str, object] = {
+                "version": MANIFEST_VERSION,
+                "timestamp": timestamp,
+                "blobs": blobs,
+                "collectors": collectors,
+            }
+            with open(backup_file, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+        except Exception:
+            return None
+
+        entry = {"file": backup_file.name, "timestamp": timestamp, "packages": counts, "blobs": blobs}
+        with self._index_lock:
+            # インデックスを再構築した場合は書き込んだバックアップファイルが既に含まれている
+            entries = [e for e in self._load_index() if e["file"] != backup_file.name]
+            entries.append(entry)
+            self._save_index(entries)
+        return backup_file
 
-        # APT
-        apt_packages = self._get_apt_packages()
-        if apt_packages:
-            packages["apt"] = apt_packages
+    def load_backup(self, backup_file: Path) -> dict[str, list[str]]:
+        """バックアップファイルからパッケージリストを読み込む.
 
-        # Snap
-        snap_packages = self._get_snap_packages()
-        if snap_packages:
-            packages["snap"] = snap_packages
+        パッケージリストを直接含む旧形式のバックアップファイルにも対応します。
 
-        # Homebrew
-        brew_packages = self._get_brew_packages()
-        if brew_packages:
-            packages["brew"] = brew_packages
+        Args:
+            backup_file: バックアップファイルのパス.
+
+        Returns:
+            パッケージマネージャ名をキーとするパッケージリストの辞書.
 
-        # npm
-        npm_packages = self._get_npm_packages()
-        if npm_packages:
-            packages["npm"] = npm_packages
+        Raises:
+            OSError: バックアップファイルまたは参照先のblobを読み込めない場合.
+            ValueError: バックアップファイルの形式が不正な場合.
 
-        # pnpm
-        pnpm_packages = self._get_pnpm_packages()
-        if pnpm_packages:
-            packages["pnpm"] = pnpm_packages
+        """
+        manifest = json.loads(backup_file.read_text(encoding="utf-8"))
+        if "blobs" not in manifest:
+            return manifest.get("packages", {})
 
-        # pipx
-        pipx_packages = self._get_pipx_packages()
-        if pipx_packages:
-            packages["pipx"] = pipx_packages
+        blobs: dict[str, str] = manifest["blobs"]
+        return {name: json.loads(self.blob_store.get(digest)) for name, digest in blobs.items()}
 
-        # Cargo
-        cargo_packages = self._get_cargo_packages()
-        if cargo_packages:
-            packages["cargo"] = cargo_packages
+    def _run(self, command: list[str]) -> subprocess.CompletedProcess[str]:
+        """パッケージリスト取得用のコマンドを実行する.
 
-        # Flatpak
-        flatpak_packages = self._get_flatpak_packages()
-        if flatpak_packages:
-            packages["flatpak"] = flatpak_packages
+        実行中のプロセスを記録し、制限時間を超えた場合に _kill_collectors() で終了させられるようにします。
+        POSIXではコマンドが起動した子プロセスもまとめて終了させるため、独立したプロセスグループで起動します。
 
-        # Gem
-        gem_packages = self._get_gem_packages()
-        if gem_packages:
-            packages["gem"] = gem_packages
+        Args:
+            command: 実行するコマンド.
+
+        Returns:
+            コマンドの実行結果.
 
-        backup_data["packages"] = packages
+        Raises:
+            OSError: コマンドを起動できない場合.
+            subprocess.TimeoutExpired: コマンドがタイムアウトした場合.
 
+        """
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=not is_windows(),
+        )
+        with self._processes_lock:
+            self._processes.add(process)
         try:
-            with open(backup_file, "w", encoding="utf-8") as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
-            return backup_file
-        except Exception:
-            return None
+            stdout, stderr = process.communicate(timeout=COLLECTOR_COMMAND_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            process.communicate()
+            raise
+        finally:
+            with self._processes_lock:
+                self._processes.discard(process)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    def _kill_collectors(self) -> None:
+        """実行中のパッケージリスト取得コマンドをすべて終了させる."""
+        with self._processes_lock:
+            processes = list(self._processes)
+        for process in processes:
+            _kill_process_group(process)
+
+    def _collectors(self) -> dict[str, Callable[[], list[str] | None]]:
+        """パッケージマネージャ名とパッケージリスト取得関数の対応を返す.
+
+        Returns:
+            パッケージマネージャ名をキーとする取得関数の辞書.
+
+        """
+        return {
+            "apt": self._get_apt_packages,
+            "snap": self._get_snap_packages,
+            "brew": self._get_brew_packages,
+            "npm": self._get_npm_packages,
+            "pnpm": self._get_pnpm_packages,
+            "pipx": self._get_pipx_packages,
+            "cargo": self._get_cargo_packages,
+            "flatpak": self._get_flatpak_packages,
+            "gem": self._get_gem_packages,
+        }
 
     def _get_apt_packages(self) -> list[str] | None:
         """APTパッケージリストを取得する.
 
+        `dpkg --get-selections` を実行せず、dpkgのステータスファイルを直接読み込みます。
+
         Returns:
             インストール済みAPTパッケージ名のリスト. 取得失敗時はNone.
 
         """
         try:
-            result = subprocess.run(["dpkg", "--get-selections"], capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                packages: list[str] = []
-                for line in result.stdout.splitlines():
-                    parts = line.split()
-                    if len(parts) >= 2 and parts[1] == "install":
-                        packages.append(parts[0])
-                return packages
-            return None
-        except Exception:
+            return selected_packages()
+        except (OSError, ValueError):
             return None
 
     def _get_snap_packages(self) -> list[str] | None:
@@ -144,7 +608,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(["snap", "list"], capture_output=True, text=True, timeout=30)
+            result = self._run(["snap", "list"])
             if result.returncode == 0:
                 packages: list[str] = []
                 for line in result.stdout.splitlines()[1:]:  # ヘッダーをスキップ
@@ -164,7 +628,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(["brew", "list", "--formula"], capture_output=True, text=True, timeout=30)
+            result = self._run(["brew", "list", "--formula"])
             if result.returncode == 0:
                 return result.stdout.splitlines()
             return None
@@ -179,9 +643,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(
-                ["npm", "list", "-g", "--depth=0", "--json"], capture_output=True, text=True, timeout=30
-            )
+            result = self._run(["npm", "list", "-g", "--depth=0", "--json"])
             if result.returncode == 0:
                 data: dict[str, dict[str, str]] = json.loads(result.stdout)  # type: ignore
                 return list(data.get("dependencies", {}).keys())
@@ -197,9 +659,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(
-                ["pnpm", "list", "-g", "--depth=0", "--json"], capture_output=True, text=True, timeout=30
-            )
+            result = self._run(["pnpm", "list", "-g", "--depth=0", "--json"])
             if result.returncode == 0:
                 data_list: list[dict[str, dict[str, str]]] = json.loads(result.stdout)  # type: ignore
                 # pnpm returns an array with a single object
@@ -217,7 +677,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(["pipx", "list", "--short"], capture_output=True, text=True, timeout=30)
+            result = self._run(["pipx", "list", "--short"])
             if result.returncode == 0:
                 return result.stdout.splitlines()
             return None
@@ -232,7 +692,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(["cargo", "install", "--list"], capture_output=True, text=True, timeout=30)
+            result = self._run(["cargo", "install", "--list"])
             if result.returncode == 0:
                 packages: list[str] = []
                 for line in result.stdout.splitlines():
@@ -252,9 +712,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(
-                ["flatpak", "list", "--app", "--columns=application"], capture_output=True, text=True, timeout=30
-            )
+            result = self._run(["flatpak", "list", "--app", "--columns=application"])
             if result.returncode == 0:
                 return result.stdout.splitlines()
             return None
@@ -269,7 +727,7 @@ class BackupManager:
 
         """
         try:
-            result = subprocess.run(["gem", "list", "--no-versions"], capture_output=True, text=True, timeout=30)
+            result = self._run(["gem", "list", "--no-versions"])
             if result.returncode == 0:
                 return result.stdout.splitlines()
             return None
@@ -282,15 +740,42 @@ class BackupManager:
         Returns:
             バックアップファイルのパスリスト(新しい順). ディレクトリが存在しない場合は空リスト.
 
+        """
+        return [snapshot.path for snapshot in self.list_snapshots()]
+
+    def list_snapshots(self) -> list[BackupSnapshot]:
+        """インデックスに記録されたバックアップのリストを取得する.
+
+        Returns:
+            バックアップのリスト(新しい順). ディレクトリが存在しない場合は空リスト.
+
         """
         if not self.backup_dir.exists():
             return []
 
-        return sorted(self.backup_dir.glob("packages_*.json"), reverse=True)
+        with self._index_lock:
+            entries = self._load_index()
+        return [
+            BackupSnapshot(self.backup_dir / entry["file"], entry["timestamp"], entry["packages"])
+            for entry in reversed(entries)
+        ]
+
+    def latest_backup(self) -> BackupSnapshot | None:
+        """最新のバックアップを取得する.
+
+        Returns:
+            最新のバックアップ. バックアップがない場合はNone.
+
+        """
+        snapshots = self.list_snapshots()
+        return snapshots[0] if snapshots else None
 
     def cleanup_old_backups(self, keep_count: int = 10) -> int:
         """古いバックアップを削除.
 
+        古いバックアップファイルを削除した後、どのバックアップファイルからも
+        参照されなくなったblobを削除します。
+
         Args:
             keep_count: 保持するバックアップ数
 
@@ -298,16 +783,109 @@ class BackupManager:
             削除したファイル数
 
         """
-        backups = self.list_backups()
-        if len(backups) <= keep_count:
+        if not self.backup_dir.exists():
             return 0
 
+        with self._index_lock:
+            entries = self._load_index()
+            if len(entries) <= keep_count:
+                return 0
+
+            deleted = 0
+            failed: list[dict[str, Any]] = []
+            for entry in entries[:-keep_count]:
+                try:
+                    (self.backup_dir / entry["file"]).unlink(missing_ok=True)
+                    deleted += 1
+                except OSError:
+                    failed.append(entry)
+            self._save_index(failed + entries[-keep_count:])
+
+        self.collect_garbage()
+        return deleted
+
+    def collect_garbage(self) -> int:
+        """どのバックアップファイルからも参照されていないblobを削除する.
+
+        参照先はインデックスから判断します。
+        読み込めないバックアップファイルがある場合は、参照先を判断できないため何も削除しません。
+
+        Returns:
+            削除したblob数.
+
+        """
+        with self._index_lock:
+            entries = self._load_index()
+
+        referenced: set[str] = set()
+        for entry in entries:
+            if entry["blobs"] is None:
+                return 0
+            referenced.update(entry["blobs"].values())
+
         deleted = 0
-        for backup_file in backups[keep_count:]:
+        for digest in self.blob_store.digests() - referenced:
             try:
-                backup_file.unlink()
+                self.blob_store.remove(digest)
                 deleted += 1
-            except Exception:
+            except OSError:
                 continue
-
         return deleted
+
+    def _load_index(self) -> list[dict[str, Any]]:
+        """インデックスを読み込む.
+
+        インデックスファイルが存在しない・壊れている場合は、バックアップファイルから再構築します。
+        呼び出し側で_index_lockを取得している必要があります。
+
+        Returns:
+            インデックスのエントリのリスト(古い順).
+
+        """
+        try:
+            index: dict[str, Any] = json.loads(self.index_file.read_text(encoding="utf-8"))
+            if index.get("version") == INDEX_VERSION and isinstance(index.get("snapshots"), list):
+                return index["snapshots"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        entries = [self._index_entry(backup_file) for backup_file in sorted(self.backup_dir.glob("packages_*.json"))]
+        self._save_index(entries)
+        return entries
+
+    def _index_entry(self, backup_file: Path) -> dict[str, Any]:
+        """バックアップファイルからインデックスのエントリを作成する.
+
+        読み込めないバックアップファイルは、参照するblobが不明(None)のエントリとします。
+
+        Args:
+            backup_file: バックアップファイルのパス.
+
+        Returns:
+            インデックスのエントリ.
+
+        """
+        timestamp = backup_file.stem.removeprefix("packages_")
+        try:
+            manifest: dict[str, Any] = json.loads(backup_file.read_text(encoding="utf-8"))
+            blobs: dict[str, str] = manifest.get("blobs", {})
+            counts = {name: len(packages) for name, packages in self.load_backup(backup_file).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            return {"file": backup_file.name, "timestamp": timestamp, "packages": {}, "blobs": None}
+        return {"file": backup_file.name, "timestamp": timestamp, "packages": counts, "blobs": blobs}
+
+    def _save_index(self, entries: list[dict[str, Any]]) -> None:
+        """インデックスを書き込む.
+
+        書き込みに失敗した場合は、次回に再構築されるよう古いインデックスを削除します。
+        呼び出し側で_index_lockを取得している必要があります。
+
+        Args:
+            entries: インデックスのエントリのリスト(古い順).
+
+        """
+        try:
+            _atomic_write_text(self.index_file, json.dumps({"version": INDEX_VERSION, "snapshots": entries}))
+        except OSError:
+            with contextlib.suppress(OSError):
+                self.index_file.unlink()
@@ -0,0 +1,178 @@
+"""時間予算による更新の選択.
+
+このモジュールは、`sysup update --budget 10m` のように所要時間の上限を指定した実行で、
+updaterごとの予想所要時間から予算内に収まる更新を選択する機能を提供します。
+
+予算に収まらなかった更新は延期され、延期したupdater名はキャッシュディレクトリに記録されます。
+次回の実行では、延期した更新を優先して選択します。
+"""
+
+import contextlib
+import json
+import os
+import re
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+# 延期したupdater名を記録するファイル名(キャッシュディレクトリ内)
+DEFERRED_FILE = "deferred_updaters.json"
+
+_DURATION_PATTERN = re.compile(r"(?:(?P<h>\d+(?:\.\d+)?)h)?(?:(?P<m>\d+(?:\.\d+)?)m)?(?:(?P<s>\d+(?:\.\d+)?)s)?")
+
+
+def parse_duration(text: str) -> float:
+    """時間の指定("10m"、"1h30m"、"90s"など)を秒数に変換する.
+
+    単位のない数値は分として扱います。
+
+    Args:
+        text: 時間の指定.
+
+    Returns:
+        秒数.
+
+    Raises:
+        ValueError: 形式が不正な場合、または0以下の場合.
+
+    """
+    value = text.strip().lower()
+    try:
+        seconds = float(value) * 60
+    except ValueError:
+        match = _DURATION_PATTERN.fullmatch(value)
+        if not value or match is None:
+            raise ValueError(f"時間の形式が不正です: {text!r}") from None
+        hours, minutes, secs = (float(match.group(unit) or 0) for unit in ("h", "m", "s"))
+        seconds = hours * 3600 + minutes * 60 + secs
+    if seconds <= 0:
+        raise ValueError(f"時間は0より大きい値を指定してください: {text!r}")
+    return seconds
+
+
+@dataclass(frozen=True)
+class BudgetCandidate:
+    """時間予算による選択の対象となる更新.
+
+    Attributes:
+        name: updater名.
+        seconds: 予想所要時間(秒).
+        priority: 優先度. 小さいほど先に選択される.
+        dependencies: 先に更新を完了している必要があるupdater名.
+
+    """
+
+    name: str
+    seconds: float
+    priority: int = 0
+    dependencies: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class BudgetPlan:
+    """時間予算による選択の結果.
+
+    Attributes:
+        selected: 実行するupdater名のリスト. 候補の順.
+        deferred: 延期するupdater名のリスト. 候補の順.
+        expected_seconds: 実行する更新の予想所要時間の合計(秒).
+
+    """
+
+    selected: list[str]
+    deferred: list[str]
+    expected_seconds: float
+
+
+def select_within_budget(
+    candidates: Sequence[BudgetCandidate], budget_seconds: float, preferred: Collection[str] = ()
+) -> BudgetPlan:
+    """予想所要時間の合計が予算内に収まる更新を選択する.
+
+    前回延期した更新(preferred)、優先度、候補の順に、予算の残りに収まる更新を選択します。
+    延期した更新に依存する更新も延期します。
+
+    Args:
+        candidates: 選択の対象となる更新.
+        budget_seconds: 時間予算(秒).
+        preferred: 優先して選択するupdater名(前回延期した更新など).
+
+    Returns:
+        選択の結果.
+
+    """
+    order = sorted(
+        range(len(candidates)),
+        key=lambda i: (candidates[i].name not in preferred, candidates[i].priority, i),
+    )
+    selected: set[str] = set()
+    total = 0.0
+    for i in order:
+        candidate = candidates[i]
+        if total + candidate.seconds <= budget_seconds:
+            selected.add(candidate.name)
+            total += candidate.seconds
+
+    # 依存先が延期された更新は、依存先の完了を待てないため延期する
+    names = {candidate.name for candidate in candidates}
+    changed = True
+    while changed:
+        changed = False
+        for candidate in candidates:
+            if candidate.name in selected and any(
+                dependency in names and dependency not in selected for dependency in candidate.dependencies
+            ):
+                selected.discard(candidate.name)
+                total -= candidate.seconds
+                changed = True
+
+    return BudgetPlan(
+        selected=[candidate.name for candidate in candidates if candidate.name in selected],
+        deferred=[candidate.name for candidate in candidates if candidate.name not in selected],
+        expected_seconds=total,
+    )
+
+
+def load_deferred(deferred_file: Path) -> list[str]:
+    """前回延期したupdater名を読み込む.
+
+    Args:
+        deferred_file: 記録ファイルのパス.
+
+    Returns:
+        updater名のリスト. ファイルが存在しない・壊れている場合は空のリスト.
+
+    """
+    try:
+        data = json.loads(deferred_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, list):
+        return []
+    return [name for name in data if isinstance(name, str)]  # pyright: ignore[reportUnknownVariableType]
+
+
+def save_deferred(deferred_file: Path, names: Sequence[str]) -> None:
+    """延期したupdater名を記録する.
+
+    延期した更新がない場合は記録ファイルを削除します。
+    書き込みに失敗しても記録は必須ではないため例外は送出しません。
+
+    Args:
+        deferred_file: 記録ファイルのパス.
+        names: 延期したupdater名のリスト.
+
+    """
+    if not names:
+        with contextlib.suppress(OSError):
+            deferred_file.unlink(missing_ok=True)
+        return
+
+    tmp_file = deferred_file.with_suffix(".tmp")
+    try:
+        deferred_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(json.dumps(list(names)), encoding="utf-8")
+        os.replace(tmp_file, deferred_file)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp_file.unlink()
@@ -12,6 +12,7 @@ from datetime import date
 from pathlib import Path
 
 from .logging import SysupLogger
+from .paths import DAILY_RUN_FILE
 from .platform import is_windows
 
 
@@ -101,7 +102,7 @@ class SystemChecker:
             今日まだ実行されていない場合True、既に実行済みの場合False.
 
         """
-        lock_file = self.cache_dir / "daily_run"
+        lock_file = self.cache_dir / DAILY_RUN_FILE
         today = date.today().isoformat()
 
         if lock_file.exists():
@@ -117,6 +118,16 @@ class SystemChecker:
         lock_file.write_text(today)
         return True
 
+    def clear_daily_run(self) -> None:
+        """今日の実行記録を削除する.
+
+        時間予算のために延期した更新がある場合に、同じ日の次回の自動実行を許可するために使用します。
+        """
+        try:
+            (self.cache_dir / DAILY_RUN_FILE).unlink(missing_ok=True)
+        except OSError as exc:
+            self.logger.warning(f"日次実行状態の削除に失敗しました: {exc}")
+
     def check_reboot_required(self) -> bool:
         """再起動が必要かチェックする.
 
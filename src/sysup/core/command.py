@@ -3,15 +3,109 @@
 Windows では `.cmd`/`.bat`/`.ps1` のラッパーが PATH 上に存在することがあり、
 `subprocess.run(["tool", ...])` だと直接起動できず失敗するケースがあるため、
 実行可能な形に解決したコマンド列を返します。
+
+また、`asyncio.create_subprocess_exec` を用いたコマンド実行エンジンを提供します。
+1つのイベントループで多数のコマンドを並行して実行でき、タイムアウト・キャンセル時には
+プロセスグループごと終了させます。同期APIはこのエンジンの上に実装されています。
+出力は行単位でストリーミングされ、保持する出力量は末尾の一定サイズに制限できます。
+
+独立したプロセスグループで起動したコマンドには端末のCtrl+C(SIGINT)が届かないため、
+中断時は terminate_running_commands() で実行中のコマンドを終了させます。
 """
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import contextlib
+import locale
+import os
 import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
 from pathlib import Path
 
 from .platform import is_windows
 
+# ストリームから一度に読み込むバイト数
+_READ_CHUNK_SIZE = 64 * 1024
+
+# 終了要求(SIGTERM)から強制終了(SIGKILL)までの猶予秒数
+_TERMINATE_GRACE_SECONDS = 5.0
+
+# 出力の保持量を制限する場合のデフォルト(末尾64KiB相当)
+DEFAULT_OUTPUT_LIMIT = 64 * 1024
+
+LineCallback = Callable[[str], None]
+
+# 実行中のプロセスと、プロセスグループ全体を終了させるかどうか(中断時に終了させる)
+_running_processes: dict[asyncio.subprocess.Process, bool] = {}
+_running_lock = threading.Lock()
+
+
+class OutputBuffer:
+    """コマンド出力を保持するバッファ.
+
+    上限が設定されている場合、末尾のおよそlimit文字のみを保持するリングバッファとして動作し、
+    古い行から破棄します。上限がNoneの場合はすべての出力を保持します。
+
+    Attributes:
+        limit: 保持する最大文字数. Noneの場合は無制限.
+        truncated: 出力の一部を破棄したかどうか.
+
+    """
+
+    def __init__(self, limit: int | None = None):
+        """OutputBufferを初期化する.
+
+        Args:
+            limit: 保持する最大文字数. Noneの場合は無制限.
+
+        Raises:
+            ValueError: limitが1未満の場合.
+
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limitは1以上である必要があります: {limit}")
+
+        self.limit: int | None = limit
+        self.truncated: bool = False
+        self._lines: deque[str] = deque()
+        self._size: int = 0
+
+    def append(self, line: str) -> None:
+        """行を追加する.
+
+        Args:
+            line: 追加する行(改行付き).
+
+        """
+        if self.limit is not None and len(line) > self.limit:
+            line = line[-self.limit :]
+            self.truncated = True
+
+        self._lines.append(line)
+        self._size += len(line)
+
+        if self.limit is None:
+            return
+        while self._size > self.limit:
+            self._size -= len(self._lines.popleft())
+            self.truncated = True
+
+    def getvalue(self) -> str:
+        """保持している出力を返す.
+
+        Returns:
+            保持している出力を連結した文字列.
+
+        """
+        return "".join(self._lines)
+
 
 def resolve_command(command: list[str]) -> list[str]:
     """実行可能な形にコマンド列を解決して返す.
@@ -47,3 +141,246 @@ def resolve_command(command: list[str]) -> list[str]:
             *command[1:],
         ]
     return [resolved, *command[1:]]
+
+
+def _isolates_process_group(command: list[str]) -> bool:
+    """コマンドを独立したプロセスグループで起動するか判定する.
+
+    sudoはパスワード入力のために端末のフォアグラウンドである必要があるため、
+    同じプロセスグループで起動します。sudoは受け取ったシグナルを子プロセスへ中継するため、
+    終了時はsudoプロセスへのシグナル送信で十分です。
+
+    Args:
+        command: 実行するコマンドのリスト.
+
+    Returns:
+        独立したプロセスグループで起動する場合True.
+
+    """
+    return Path(command[0]).name != "sudo"
+
+
+def _terminate(process: asyncio.subprocess.Process, signum: int, process_group: bool) -> None:
+    """プロセス(またはプロセスグループ)にシグナルを送る.
+
+    Args:
+        process: 対象プロセス.
+        signum: 送信するシグナル.
+        process_group: プロセスグループ全体に送信するかどうか.
+
+    """
+    if process.returncode is not None:
+        return
+
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        if is_windows():
+            process.kill()
+        elif process_group:
+            os.killpg(process.pid, signum)
+        else:
+            process.send_signal(signum)
+
+
+async def _kill(process: asyncio.subprocess.Process, process_group: bool) -> None:
+    """プロセスを終了させ、終了を待つ.
+
+    まずSIGTERMを送り、猶予時間内に終了しない場合はSIGKILLで強制終了します。
+
+    Args:
+        process: 対象プロセス.
+        process_group: プロセスグループ全体を終了させるかどうか.
+
+    """
+    _terminate(process, signal.SIGTERM, process_group)
+    try:
+        await asyncio.wait_for(process.wait(), _TERMINATE_GRACE_SECONDS)
+    except TimeoutError:
+        _terminate(process, getattr(signal, "SIGKILL", signal.SIGTERM), process_group)
+        await process.wait()
+
+
+def terminate_running_commands() -> None:
+    """実行中のすべてのコマンドを終了させる.
+
+    Ctrl+Cで中断した場合に、メインスレッドから呼び出します。
+    まずSIGTERMを送り、猶予時間内に終了しないコマンドはSIGKILLで強制終了します。
+    各コマンドを実行中のスレッドでは、終了したコマンドの結果が返ります。
+    """
+    with _running_lock:
+        running = list(_running_processes.items())
+    if not running:
+        return
+
+    for process, process_group in running:
+        _terminate(process, signal.SIGTERM, process_group)
+    deadline = time.monotonic() + _TERMINATE_GRACE_SECONDS
+    while time.monotonic() < deadline and any(process.returncode is None for process, _group in running):
+        time.sleep(0.05)
+    for process, process_group in running:
+        _terminate(process, getattr(signal, "SIGKILL", signal.SIGTERM), process_group)
+
+
+async def _read_stream(stream: asyncio.StreamReader | None, sink: OutputBuffer, on_line: LineCallback | None) -> None:
+    """ストリームを行単位で読み込む.
+
+    Args:
+        stream: 読み込むストリーム.
+        sink: 読み込んだ行(改行付き)を追加するバッファ.
+        on_line: 1行読み込むごとに呼ばれるコールバック. 改行は除去して渡される.
+
+    """
+    if stream is None:
+        return
+
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+    buffer = ""
+
+    def emit(line: str) -> None:
+        sink.append(line)
+        if on_line:
+            on_line(line.rstrip("\r\n"))
+
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            emit(line + "\n")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        emit(buffer)
+
+
+async def execute_command_async(
+    command: list[str],
+    *,
+    timeout: float | None = None,
+    check: bool = False,
+    cwd: Path | None = None,
+    on_stdout: LineCallback | None = None,
+    on_stderr: LineCallback | None = None,
+    output_limit: int | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """コマンドを非同期に実行する.
+
+    標準出力・標準エラーは行単位でストリーミングされ、コールバックに渡されます。
+    タイムアウトまたはキャンセル時は、コマンドをプロセスグループごと終了させます。
+
+    Args:
+        command: 実行するコマンドのリスト.
+        timeout: タイムアウト秒数. Noneの場合は無制限.
+        check: 非ゼロステータスで終了した場合に例外を発生させるかどうか.
+        cwd: 作業ディレクトリ.
+        on_stdout: 標準出力を1行読み込むごとに呼ばれるコールバック.
+        on_stderr: 標準エラーを1行読み込むごとに呼ばれるコールバック.
+        output_limit: 結果として保持する出力の最大文字数(標準出力・標準エラーそれぞれ).
+            超過分は古い行から破棄される. Noneの場合はすべて保持する.
+
+    Returns:
+        コマンド実行結果のCompletedProcessオブジェクト.
+
+    Raises:
+        subprocess.CalledProcessError: コマンドが非ゼロステータスで終了した場合(checkがTrueのとき).
+        subprocess.TimeoutExpired: コマンドがタイムアウトした場合.
+        FileNotFoundError: コマンドが見つからない場合.
+
+    Examples:
+        >>> results = await asyncio.gather(
+        ...     execute_command_async(["npm", "outdated", "-g"]),
+        ...     execute_command_async(["brew", "outdated"]),
+        ... )
+
+    """
+    process_group = _isolates_process_group(command)
+    if is_windows():
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,  # type: ignore[attr-defined]
+        )
+    else:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL if process_group else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            process_group=0 if process_group else None,
+        )
+
+    stdout = OutputBuffer(output_limit)
+    stderr = OutputBuffer(output_limit)
+    communicate = asyncio.gather(
+        _read_stream(process.stdout, stdout, on_stdout),
+        _read_stream(process.stderr, stderr, on_stderr),
+        process.wait(),
+    )
+
+    with _running_lock:
+        _running_processes[process] = process_group
+    try:
+        await asyncio.wait_for(communicate, timeout)
+    except TimeoutError:
+        await _kill(process, process_group)
+        raise subprocess.TimeoutExpired(command, timeout or 0, stdout.getvalue(), stderr.getvalue()) from None
+    except asyncio.CancelledError:
+        await _kill(process, process_group)
+        raise
+    finally:
+        with _running_lock:
+            _running_processes.pop(process, None)
+
+    returncode = process.returncode if process.returncode is not None else -1
+    result = subprocess.CompletedProcess(command, returncode, stdout.getvalue(), stderr.getvalue())
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, result.stdout, result.stderr)
+    return result
+
+
+def execute_command(
+    command: list[str],
+    *,
+    timeout: float | None = None,
+    check: bool = False,
+    cwd: Path | None = None,
+    on_stdout: LineCallback | None = None,
+    on_stderr: LineCallback | None = None,
+    output_limit: int | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """コマンドを同期的に実行する.
+
+    execute_command_async()を新しいイベントループで実行します。
+    イベントループが動作していないスレッドから呼び出してください。
+
+    Args:
+        command: 実行するコマンドのリスト.
+        timeout: タイムアウト秒数. Noneの場合は無制限.
+        check: 非ゼロステータスで終了した場合に例外を発生させるかどうか.
+        cwd: 作業ディレクトリ.
+        on_stdout: 標準出力を1行読み込むごとに呼ばれるコールバック.
+        on_stderr: 標準エラーを1行読み込むごとに呼ばれるコールバック.
+        output_limit: 結果として保持する出力の最大文字数(標準出力・標準エラーそれぞれ).
+            超過分は古い行から破棄される. Noneの場合はすべて保持する.
+
+    Returns:
+        コマンド実行結果のCompletedProcessオブジェクト.
+
+    Raises:
+        subprocess.CalledProcessError: コマンドが非ゼロステータスで終了した場合(checkがTrueのとき).
+        subprocess.TimeoutExpired: コマンドがタイムアウトした場合.
+        FileNotFoundError: コマンドが見つからない場合.
+
+    """
+    return asyncio.run(
+        execute_command_async(
+            command,
+            timeout=timeout,
+            check=check,
+            cwd=cwd,
+            on_stdout=on_stdout,
+            on_stderr=on_stderr,
+            output_limit=output_limit,
+        )
+    )
@@ -7,10 +7,13 @@ TOMLフォーマットの設定ファイルをサポートし、各種updaterの
 
 import tomllib
 from pathlib import Path
+from typing import ClassVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat
 from pydantic_settings import BaseSettings
 
+from .paths import DEFAULT_CACHE_DIR, default_config_paths
+
 
 class UpdaterConfig(BaseModel):
     """各updaterの有効/無効設定.
@@ -33,8 +36,14 @@ class UpdaterConfig(BaseModel):
         scoop: Scoopパッケージマネージャ(Windows)を有効にする.
         firmware: ファームウェア更新を有効にする.
 
+    上記以外のキーは、エントリーポイントで追加されたサードパーティupdaterの設定として扱います。
+    サードパーティupdaterは明示的に有効にした場合のみ実行されます。
+
     """
 
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="allow")
+    __pydantic_extra__: dict[str, bool] = Field(init=False)  # pyright: ignore[reportIncompatibleVariableOverride]
+
     apt: bool = True
     snap: bool = True
     flatpak: bool = True
@@ -89,11 +98,15 @@ class BackupConfig(BaseModel):
     Attributes:
         dir: バックアップディレクトリのパス. デフォルトは'~/.local/share/sysup/backups'.
         enabled: バックアップを有効にするかどうか. デフォルトはTrue.
+        collect_timeout: パッケージリスト取得全体の制限時間(秒). デフォルトは60秒.
+        keep_count: 保持するバックアップ数. デフォルトは30.
 
     """
 
     dir: str = "~/.local/share/sysup/backups"
     enabled: bool = True
+    collect_timeout: float = Field(default=60, gt=0)
+    keep_count: int = Field(default=30, ge=1)
 
 
 class NotificationConfig(BaseModel):
@@ -115,6 +128,106 @@ class NotificationConfig(BaseModel):
     on_warning: bool = False
 
 
+class HistoryConfig(BaseModel):
+    """実行履歴設定.
+
+    `sysup update` の実行結果をキャッシュディレクトリのデータベースに記録し、
+    `sysup history` で集計できるようにします。
+
+    Attributes:
+        enabled: 実行履歴を記録するかどうか. デフォルトはTrue.
+        keep_runs: 保持する実行数. デフォルトは1000.
+
+    """
+
+    enabled: bool = True
+    keep_runs: int = Field(default=1000, ge=1)
+
+
+class MetricsConfig(BaseModel):
+    """メトリクス出力設定.
+
+    `sysup update` の実行結果を、node_exporterのtextfileコレクタが読み込む
+    Prometheusのテキスト形式のファイルに書き出します。
+
+    Attributes:
+        enabled: メトリクスを出力するかどうか. デフォルトはFalse.
+        textfile: 出力するファイルのパス(拡張子は.prom). デフォルトは'~/.local/share/sysup/sysup.prom'.
+
+    """
+
+    enabled: bool = False
+    textfile: str = "~/.local/share/sysup/sysup.prom"
+
+
+class TimeoutConfig(BaseModel):
+    """コマンドのタイムアウト設定.
+
+    updaterが実行するコマンドのタイムアウトを、実行履歴に記録したコマンドごとの処理時間から決定します。
+    記録が5件以上あるコマンドは、処理時間の99パーセンタイル × factorを
+    min_seconds〜max_secondsの範囲に収めた値をタイムアウトにします。
+    タイムアウトした実行は、打ち切りまでの時間を処理時間として記録に含めます。
+
+    Attributes:
+        adaptive: 実行履歴からタイムアウトを決定するかどうか. Falseの場合は常にdefault_secondsを使用する.
+            デフォルトはTrue.
+        factor: 処理時間に掛ける係数. デフォルトは3.
+        min_seconds: タイムアウトの下限(秒). デフォルトは300.
+            パッケージのインストール中に打ち切らないよう、default_secondsより短くしないことを推奨する.
+        max_seconds: タイムアウトの上限(秒). デフォルトは7200.
+        default_seconds: 実行履歴がないコマンドのタイムアウト(秒). デフォルトは300.
+        updaters: updater名をキーとした固定のタイムアウト(秒). 指定したupdaterのコマンドは実行履歴によらずこの値を使用する.
+
+    """
+
+    adaptive: bool = True
+    factor: float = Field(default=3, ge=1)
+    min_seconds: float = Field(default=300, gt=0)
+    max_seconds: float = Field(default=7200, gt=0)
+    default_seconds: float = Field(default=300, gt=0)
+    updaters: dict[str, PositiveFloat] = Field(default_factory=dict)
+
+
+class ResourceLimitsConfig(BaseModel):
+    """リソースクラスごとの同時実行数設定.
+
+    並列更新時に、同じリソースを奪い合うupdaterの同時実行数を制限します。
+
+    Attributes:
+        system_lock: システムパッケージロックを使用するupdater(APT、Snap、ファームウェア)の同時実行数.
+        network: ダウンロード量の多いupdaterの同時実行数.
+        cpu: コンパイルを伴うupdater(Cargo等)の同時実行数.
+        disk: ディスク書き込みの多いupdaterの同時実行数.
+
+    """
+
+    system_lock: int = Field(default=1, ge=1)
+    network: int = Field(default=4, ge=1)
+    cpu: int = Field(default=1, ge=1)
+    disk: int = Field(default=2, ge=1)
+
+
+class MetadataMaxAgeConfig(BaseModel):
+    """パッケージメタデータの鮮度設定.
+
+    refreshフェーズで、メタデータの最終更新からの経過時間がこの値未満の場合は更新をスキップします。
+    他のツールや直前の実行で更新済みのメタデータを再取得しないために使用します。
+    0の場合は常に更新します。
+
+    Attributes:
+        apt: APTのパッケージリスト(`apt update`)の最大経過時間(分). デフォルトは60.
+        brew: Homebrew(`brew update`)の最大経過時間(分). デフォルトは60.
+        scoop: Scoop(`scoop update`)の最大経過時間(分). デフォルトは60.
+        firmware: ファームウェアメタデータ(`fwupdmgr refresh`)の最大経過時間(分). デフォルトは1440.
+
+    """
+
+    apt: float = Field(default=60, ge=0)
+    brew: float = Field(default=60, ge=0)
+    scoop: float = Field(default=60, ge=0)
+    firmware: float = Field(default=1440, ge=0)
+
+
 class GeneralConfig(BaseModel):
     """一般設定.
 
@@ -122,14 +235,24 @@ class GeneralConfig(BaseModel):
 
     Attributes:
         parallel_updates: 並列更新を有効にするかどうか. デフォルトはFalse.
+        max_workers: 並列更新時に同時実行するupdaterの最大数. デフォルトは4.
+        resource_limits: リソースクラスごとの同時実行数の上限.
+        metadata_max_age: updaterごとのパッケージメタデータの最大経過時間.
         dry_run: ドライランモード(実際には実行しない). デフォルトはFalse.
         cache_dir: キャッシュディレクトリのパス. デフォルトは'~/.cache/sysup'.
+        self_update_interval_hours: sysup自身の更新チェックの間隔(時間). 0の場合は毎回チェックする. デフォルトは24.
+        plan_cache_ttl_minutes: 更新計画のキャッシュの有効期間(分). 0の場合は再利用しない. デフォルトは30.
 
     """
 
     parallel_updates: bool = False
+    max_workers: int = Field(default=4, ge=1)
+    resource_limits: ResourceLimitsConfig = Field(default_factory=ResourceLimitsConfig)
+    metadata_max_age: MetadataMaxAgeConfig = Field(default_factory=MetadataMaxAgeConfig)
     dry_run: bool = False
-    cache_dir: str = "~/.cache/sysup"
+    cache_dir: str = DEFAULT_CACHE_DIR
+    self_update_interval_hours: float = Field(default=24, ge=0)
+    plan_cache_ttl_minutes: float = Field(default=30, ge=0)
 
 
 class SysupConfig(BaseSettings):
@@ -144,6 +267,9 @@ class SysupConfig(BaseSettings):
         logging: ログ出力の設定.
         backup: バックアップの設定.
         notification: デスクトップ通知の設定.
+        history: 実行履歴の設定.
+        timeouts: コマンドのタイムアウトの設定.
+        metrics: メトリクス出力の設定.
         general: 一般的な動作設定.
 
     Examples:
@@ -160,6 +286,9 @@ class SysupConfig(BaseSettings):
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     backup: BackupConfig = Field(default_factory=BackupConfig)
     notification: NotificationConfig = Field(default_factory=NotificationConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    timeouts: TimeoutConfig = Field(default_factory=TimeoutConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     general: GeneralConfig = Field(default_factory=GeneralConfig)
 
     @classmethod
@@ -182,14 +311,7 @@ class SysupConfig(BaseSettings):
 
         """
         if config_path is None:
-            # 設定ファイルの検索パス
-            config_paths = [
-                Path.home() / ".config" / "sysup" / "sysup.toml",
-                Path.home() / ".sysup.toml",
-                Path("/etc/sysup/sysup.toml"),
-            ]
-
-            for path in config_paths:
+            for path in default_config_paths():
                 if path.exists():
                     config_path = path
                     break
@@ -222,6 +344,15 @@ class SysupConfig(BaseSettings):
         """
         return Path(self.backup.dir).expanduser()
 
+    def get_metrics_file(self) -> Path:
+        """メトリクスファイルのPathオブジェクトを返す.
+
+        Returns:
+            メトリクスファイルの絶対パス. チルダ(~)は展開される.
+
+        """
+        return Path(self.metrics.textfile).expanduser()
+
     def get_cache_dir(self) -> Path:
         """キャッシュディレクトリのPathオブジェクトを返す.
 
@@ -0,0 +1,417 @@
+"""dpkgステータスファイルとAPTパッケージリストの読み込み.
+
+このモジュールは `/var/lib/dpkg/status` と `/var/lib/apt/lists/` のパッケージリストを
+プロセス内で読み込み、インストール済みパッケージと更新可能なパッケージを求める機能を提供します。
+`dpkg --get-selections` や `apt list --upgradable` をforkせずに同等の情報を取得できます。
+
+ファイルはメモリマップして読み込み、パッケージごとの段落から必要なフィールドのみを取り出します。
+
+更新候補のバージョンは、各リポジトリのRelease/InReleaseファイルの
+NotAutomatic/ButAutomaticUpgradesから求めた優先度(500、100、1)と、
+インストール済みバージョンの優先度(100以上)から、aptと同じ規則で選択します。
+`/etc/apt/preferences` によるピン留めは考慮しません。
+"""
+
+import gzip
+import lzma
+import mmap
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+# dpkgのステータスファイル
+DPKG_STATUS = Path("/var/lib/dpkg/status")
+
+# APTのパッケージリストのディレクトリ
+APT_LISTS_DIR = Path("/var/lib/apt/lists")
+
+# リポジトリの既定の優先度
+DEFAULT_PRIORITY = 500
+
+# インストール済みバージョンの優先度
+INSTALLED_PRIORITY = 100
+
+# 圧縮されたパッケージリストの拡張子と展開関数
+_DECOMPRESSORS = {".gz": gzip.decompress, ".xz": lzma.decompress}
+
+_NOT_AUTOMATIC = re.compile(rb"^NotAutomatic:\s*yes\s*$", re.MULTILINE | re.IGNORECASE)
+_BUT_AUTOMATIC_UPGRADES = re.compile(rb"^ButAutomaticUpgrades:\s*yes\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class InstalledPackage:
+    """dpkgステータスファイルに記録されたパッケージ.
+
+    Attributes:
+        name: パッケージ名.
+        version: バージョン.
+        architecture: アーキテクチャ.
+        want: 選択状態(install、hold、deinstall、purge等).
+        status: パッケージの状態(installed、config-files等).
+
+    """
+
+    name: str
+    version: str
+    architecture: str
+    want: str
+    status: str
+
+    @property
+    def installed(self) -> bool:
+        """パッケージがインストールされているか."""
+        return self.status == "installed"
+
+
+@dataclass(frozen=True)
+class UpgradablePackage:
+    """更新可能なパッケージ.
+
+    Attributes:
+        name: パッケージ名.
+        architecture: アーキテクチャ.
+        installed_version: インストール済みのバージョン.
+        candidate_version: 更新候補のバージョン.
+        size: 更新候補のパッケージファイルのサイズ(バイト). パッケージリストに記載がない場合None.
+
+    """
+
+    name: str
+    architecture: str
+    installed_version: str
+    candidate_version: str
+    size: int | None = None
+
+
+def _order(char: str) -> int:
+    """バージョン比較における非数字文字の順序を返す.
+
+    Args:
+        char: 比較する文字. 文字列の終端は空文字列.
+
+    Returns:
+        順序. `~` は終端よりも前、英字は記号よりも前に並ぶ.
+
+    """
+    if not char or char.isdigit():
+        return 0
+    if char.isascii() and char.isalpha():
+        return ord(char)
+    if char == "~":
+        return -1
+    return ord(char) + 256
+
+
+def _compare_fragment(a: str, b: str) -> int:
+    """バージョンの上流部分またはDebianリビジョンを比較する.
+
+    Args:
+        a: 比較する文字列.
+        b: 比較する文字列.
+
+    Returns:
+        aがbより小さい場合は負、等しい場合は0、大きい場合は正の値.
+
+    """
+    i = j = 0
+    while i < len(a) or j < len(b):
+        # 非数字部分を1文字ずつ比較する
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _order(a[i] if i < len(a) else "")
+            bc = _order(b[j] if j < len(b) else "")
+            if ac != bc:
+                return ac - bc
+            i += 1
+            j += 1
+
+        # 数字部分を数値として比較する
+        start_i, start_j = i, j
+        while i < len(a) and a[i].isdigit():
+            i += 1
+        while j < len(b) and b[j].isdigit():
+            j += 1
+        diff = int(a[start_i:i] or "0") - int(b[start_j:j] or "0")
+        if diff:
+            return diff
+    return 0
+
+
+def compare_versions(a: str, b: str) -> int:
+    """Debianのバージョン番号を比較する.
+
+    `[エポック:]上流バージョン[-Debianリビジョン]` の形式を、dpkgと同じ規則で比較します。
+
+    Args:
+        a: 比較するバージョン.
+        b: 比較するバージョン.
+
+    Returns:
+        aがbより小さい場合は負、等しい場合は0、大きい場合は正の値.
+
+    Raises:
+        ValueError: エポックが数値でない場合.
+
+    Examples:
+        >>> compare_versions("1.0~rc1", "1.0") < 0
+        True
+        >>> compare_versions("1:0.9", "2.0") > 0
+        True
+
+    """
+
+    def split(version: str) -> tuple[int, str, str]:
+        epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+        upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "")
+        return int(epoch or "0"), upstream, revision
+
+    epoch_a, upstream_a, revision_a = split(a.strip())
+    epoch_b, upstream_b, revision_b = split(b.strip())
+    if epoch_a != epoch_b:
+        return epoch_a - epoch_b
+    return _compare_fragment(upstream_a, upstream_b) or _compare_fragment(revision_a, revision_b)
+
+
+def _iter_paragraphs(data: bytes | mmap.mmap, fields: tuple[bytes, ...]) -> Iterator[dict[bytes, bytes]]:
+    """control形式のデータから、段落ごとに指定したフィールドを取り出す.
+
+    段落全体は解析せず、各フィールドの行を検索して値のみを取り出します。
+    複数行にわたるフィールドの継続行は取り出しません。
+
+    Args:
+        data: control形式のデータ.
+        fields: 取り出すフィールド名.
+
+    Yields:
+        フィールド名をキーとする値の辞書. 指定したフィールドを1つも含まない段落は除く.
+
+    """
+    size = len(data)
+    pos = 0
+    while pos < size:
+        # 段落の前の空行を読み飛ばす
+        while pos < size and data[pos : pos + 1] == b"\n":
+            pos += 1
+        if pos >= size:
+            break
+
+        end = data.find(b"\n\n", pos)
+        if end == -1:
+            end = size
+
+        record: dict[bytes, bytes] = {}
+        for field in fields:
+            if data[pos : pos + len(field) + 1] == field + b":":
+                start = pos + len(field) + 1
+            else:
+                found = data.find(b"\n" + field + b":", pos, end)
+                if found == -1:
+                    continue
+                start = found + len(field) + 2
+            line_end = data.find(b"\n", start, end)
+            record[field] = data[start : end if line_end == -1 else line_end].strip()
+        if record:
+            yield record
+
+        pos = end + 2
+
+
+def _read(path: Path) -> bytes | mmap.mmap:
+    """ファイルを読み込む.
+
+    非圧縮のファイルはメモリマップし、圧縮されたファイルは展開して返します。
+
+    Args:
+        path: ファイルのパス.
+
+    Returns:
+        ファイルの内容.
+
+    Raises:
+        OSError: ファイルを読み込めない場合.
+
+    """
+    decompress = _DECOMPRESSORS.get(path.suffix)
+    if decompress is not None:
+        return decompress(path.read_bytes())
+
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_status(status_path: Path = DPKG_STATUS) -> list[InstalledPackage]:
+    """dpkgステータスファイルからパッケージを読み込む.
+
+    Args:
+        status_path: ステータスファイルのパス.
+
+    Returns:
+        ステータスファイルに記録された順のパッケージのリスト.
+
+    Raises:
+        OSError: ステータスファイルを読み込めない場合.
+
+    """
+    data = _read(status_path)
+    packages: list[InstalledPackage] = []
+    try:
+        for record in _iter_paragraphs(data, (b"Package", b"Status", b"Version", b"Architecture")):
+            if b"Package" not in record:
+                continue
+            want, _, state = record.get(b"Status", b"").decode().partition(" ")
+            packages.append(
+                InstalledPackage(
+                    name=record[b"Package"].decode(),
+                    version=record.get(b"Version", b"").decode(),
+                    architecture=record.get(b"Architecture", b"").decode(),
+                    want=want,
+                    status=state.rpartition(" ")[2],
+                )
+            )
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return packages
+
+
+def selected_packages(status_path: Path = DPKG_STATUS) -> list[str]:
+    """インストール対象として選択されているパッケージ名を返す.
+
+    `dpkg --get-selections` で `install` と表示されるパッケージに相当します。
+    複数のアーキテクチャでインストールされているパッケージは1つの名前として返します。
+
+    Args:
+        status_path: ステータスファイルのパス.
+
+    Returns:
+        パッケージ名のリスト.
+
+    Raises:
+        OSError: ステータスファイルを読み込めない場合.
+
+    """
+    names = [package.name for package in read_status(status_path) if package.want == "install"]
+    return list(dict.fromkeys(names))
+
+
+def _archive_priority(release: bytes) -> int:
+    """Releaseファイルの内容からリポジトリの優先度を求める.
+
+    Args:
+        release: Release(またはInRelease)ファイルの内容.
+
+    Returns:
+        優先度. NotAutomaticの場合は1(ButAutomaticUpgradesも指定されている場合は100)、それ以外は500.
+
+    """
+    if not _NOT_AUTOMATIC.search(release):
+        return DEFAULT_PRIORITY
+    if _BUT_AUTOMATIC_UPGRADES.search(release):
+        return INSTALLED_PRIORITY
+    return 1
+
+
+def _packages_files(lists_dir: Path) -> list[tuple[Path, int]]:
+    """パッケージリストのファイルと、そのリポジトリの優先度を返す.
+
+    Args:
+        lists_dir: APTのパッケージリストのディレクトリ.
+
+    Returns:
+        Packagesファイルのパスと優先度の組のリスト.
+
+    Raises:
+        OSError: ディレクトリを読み込めない場合.
+        ValueError: 対応していない圧縮形式のパッケージリストがある場合.
+
+    """
+    files = sorted(path for path in lists_dir.iterdir() if path.is_file())
+
+    releases: dict[str, int] = {}
+    for path in files:
+        for suffix in ("InRelease", "Release"):
+            if path.name.endswith(f"_{suffix}"):
+                releases[path.name.removesuffix(suffix)] = _archive_priority(path.read_bytes())
+
+    packages_files: list[tuple[Path, int]] = []
+    for path in files:
+        stem, dot, suffix = path.name.partition("_Packages")
+        if not dot:
+            continue
+        if suffix and suffix not in _DECOMPRESSORS:
+            raise ValueError(f"対応していない圧縮形式のパッケージリストです: {path.name}")
+
+        # Releaseファイル名の接頭辞のうち、最も長く一致するもの
+        prefixes = [prefix for prefix in releases if f"{stem}_Packages".startswith(prefix)]
+        priority = releases[max(prefixes, key=len)] if prefixes else DEFAULT_PRIORITY
+        packages_files.append((path, priority))
+    return packages_files
+
+
+def upgradable_packages(status_path: Path = DPKG_STATUS, lists_dir: Path = APT_LISTS_DIR) -> list[UpgradablePackage]:
+    """更新可能なパッケージを求める.
+
+    インストール済みの各パッケージについて、パッケージリストから同じ名前・アーキテクチャの
+    バージョンを集め、優先度が最も高く(同じ優先度ではバージョンが最も新しい)バージョンを
+    更新候補とします。更新候補がインストール済みのバージョンより新しいパッケージを返します。
+
+    Args:
+        status_path: dpkgのステータスファイルのパス.
+        lists_dir: APTのパッケージリストのディレクトリ.
+
+    Returns:
+        更新可能なパッケージのリスト.
+
+    Raises:
+        OSError: ステータスファイルまたはパッケージリストを読み込めない場合.
+        ValueError: 対応していない圧縮形式のパッケージリストがある場合.
+
+    """
+    installed = {
+        (package.name, package.architecture): package for package in read_status(status_path) if package.installed
+    }
+
+    # (パッケージ名, アーキテクチャ) -> {バージョン: 優先度}
+    available: dict[tuple[str, str], dict[str, int]] = {}
+    # (パッケージ名, アーキテクチャ, バージョン) -> パッケージファイルのサイズ
+    sizes: dict[tuple[str, str, str], int] = {}
+    for path, priority in _packages_files(lists_dir):
+        data = _read(path)
+        try:
+            for record in _iter_paragraphs(data, (b"Package", b"Version", b"Architecture", b"Size")):
+                key = (record.get(b"Package", b"").decode(), record.get(b"Architecture", b"").decode())
+                if key not in installed or b"Version" not in record:
+                    continue
+                versions = available.setdefault(key, {})
+                version = record[b"Version"].decode()
+                versions[version] = max(versions.get(version, 0), priority)
+                if record.get(b"Size", b"").isdigit():
+                    sizes[(*key, version)] = int(record[b"Size"])
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    upgradable: list[UpgradablePackage] = []
+    for key, versions in available.items():
+        package = installed[key]
+        versions[package.version] = max(versions.get(package.version, 0), INSTALLED_PRIORITY)
+
+        candidate = package.version
+        for version, priority in versions.items():
+            best = versions[candidate]
+            if priority > best or (priority == best and compare_versions(version, candidate) > 0):
+                candidate = version
+
+        if compare_versions(candidate, package.version) > 0:
+            upgradable.append(
+                UpgradablePackage(
+                    package.name,
+                    package.architecture,
+                    package.version,
+                    candidate,
+                    sizes.get((*key, candidate)),
+                )
+            )
+    return upgradable
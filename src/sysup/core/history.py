@@ -0,0 +1,410 @@
+"""実行履歴の保存と集計.
+
+このモジュールは、`sysup update` の実行ごとの結果(実行全体・updater・ステップ)を
+キャッシュディレクトリのSQLiteデータベースに追記し、updaterごとの所要時間の分布や
+失敗率を集計する機能を提供します。
+
+ステップは処理時間の計測で記録したスパン(システムチェック、フェーズ、コマンド)を平坦にしたものです。
+保持する実行数を超えた古い実行は、関連するupdater・ステップの記録とともに削除されます。
+"""
+
+import math
+import sqlite3
+from collections.abc import Iterable, Sequence
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+# キャッシュディレクトリ内の履歴データベースのファイル名
+HISTORY_FILE = "history.sqlite3"
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    success_count INTEGER NOT NULL,
+    failure_count INTEGER NOT NULL,
+    skip_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS updaters (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    duration REAL,
+    packages INTEGER
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    updater TEXT,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    exit_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS updaters_name ON updaters(name, run_id);
+CREATE INDEX IF NOT EXISTS steps_kind_name ON steps(kind, name, started_at);
+"""
+
+
+@dataclass(frozen=True)
+class UpdaterRecord:
+    """1回の実行における、updaterの結果.
+
+    Attributes:
+        name: updater名.
+        status: 結果("success", "failure", "skip").
+        reason: 失敗・スキップの理由. 成功時はNone.
+        duration: 処理時間(秒). 実行していない場合None.
+        packages: 更新したパッケージ数. 不明な場合None.
+
+    """
+
+    name: str
+    status: str
+    reason: str | None = None
+    duration: float | None = None
+    packages: int | None = None
+
+
+@dataclass(frozen=True)
+class StepRecord:
+    """1回の実行における、ステップ(システムチェック・フェーズ・コマンド)の結果.
+
+    Attributes:
+        updater: ステップが属するupdater名. システムチェックなどの場合None.
+        kind: ステップの種類("check", "phase", "command").
+        name: ステップ名(フェーズ名、実行したコマンドなど).
+        started_at: 開始時刻(Unix時刻).
+        duration: 処理時間(秒).
+        exit_code: コマンドの終了コード. コマンド以外、またはタイムアウトした場合はNone.
+
+    """
+
+    updater: str | None
+    kind: str
+    name: str
+    started_at: float
+    duration: float
+    exit_code: int | None = None
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """1回の実行の結果.
+
+    Attributes:
+        started_at: 開始時刻(Unix時刻).
+        duration: 処理時間(秒).
+        success_count: 成功したupdaterの数.
+        failure_count: 失敗したupdaterの数.
+        skip_count: スキップしたupdaterの数.
+
+    """
+
+    started_at: float
+    duration: float
+    success_count: int
+    failure_count: int
+    skip_count: int
+
+
+@dataclass(frozen=True)
+class UpdaterSummary:
+    """updaterごとの直近の実行の集計.
+
+    Attributes:
+        name: updater名.
+        runs: 集計対象の実行回数(スキップを除く).
+        failures: 失敗した回数.
+        p50: 処理時間の中央値(秒). 記録がない場合None.
+        p95: 処理時間の95パーセンタイル(秒). 記録がない場合None.
+        trend: 直近の半分の実行の中央値の、それ以前の半分の中央値に対する変化率.
+            例えば0.2は20%遅くなったことを表す. 記録が4件未満の場合None.
+
+    """
+
+    name: str
+    runs: int
+    failures: int
+    p50: float | None
+    p95: float | None
+    trend: float | None
+
+    @property
+    def failure_rate(self) -> float:
+        """失敗率(0〜1)."""
+        return self.failures / self.runs if self.runs else 0.0
+
+
+def percentile(values: Sequence[float], q: float) -> float | None:
+    """パーセンタイルを線形補間で求める.
+
+    Args:
+        values: 値のリスト.
+        q: パーセンタイル(0〜100).
+
+    Returns:
+        パーセンタイル値. valuesが空の場合None.
+
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class HistoryStore:
+    """SQLiteによる実行履歴ストア.
+
+    Attributes:
+        db_file: データベースファイルのパス.
+        keep_runs: 保持する実行数.
+
+    Examples:
+        >>> store = HistoryStore(cache_dir / "history.sqlite3")
+        >>> store.record_run(run, updaters, steps)
+        >>> store.updater_summaries(limit=20)
+
+    """
+
+    def __init__(self, db_file: Path, keep_runs: int = 1000):
+        """HistoryStoreを初期化する.
+
+        Args:
+            db_file: データベースファイルのパス. 存在しない場合は最初の書き込み時に作成する.
+            keep_runs: 保持する実行数. デフォルトは1000.
+
+        """
+        self.db_file: Path = db_file
+        self.keep_runs: int = keep_runs
+
+    def _connect(self) -> sqlite3.Connection:
+        """データベースに接続し、スキーマを作成する.
+
+        Returns:
+            接続.
+
+        Raises:
+            sqlite3.Error: データベースを開けない、または壊れている場合.
+            OSError: ディレクトリを作成できない場合.
+
+        """
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_file)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def record_run(self, run: RunRecord, updaters: Iterable[UpdaterRecord], steps: Iterable[StepRecord]) -> None:
+        """実行の結果を追記し、保持数を超えた古い実行を削除する.
+
+        Args:
+            run: 実行全体の結果.
+            updaters: updaterごとの結果.
+            steps: ステップごとの結果.
+
+        Raises:
+            sqlite3.Error: 書き込みに失敗した場合.
+            OSError: ディレクトリを作成できない場合.
+
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO runs (started_at, duration, success_count, failure_count, skip_count)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (run.started_at, run.duration, run.success_count, run.failure_count, run.skip_count),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO updaters (run_id, name, status, reason, duration, packages) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, u.name, u.status, u.reason, u.duration, u.packages) for u in updaters],
+            )
+            conn.executemany(
+                """
+                INSERT INTO steps (run_id, updater, kind, name, started_at, duration, exit_code)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(run_id, s.updater, s.kind, s.name, s.started_at, s.duration, s.exit_code) for s in steps],
+            )
+            conn.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY started_at DESC, id DESC LIMIT ?)",
+                (self.keep_runs,),
+            )
+
+    def recent_runs(self, limit: int) -> list[RunRecord]:
+        """直近の実行を返す.
+
+        Args:
+            limit: 返す実行の最大数.
+
+        Returns:
+            実行の結果のリスト. 新しい順. データベースがない場合は空のリスト.
+
+        Raises:
+            sqlite3.Error: 読み込みに失敗した場合.
+
+        """
+        if not self.db_file.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT started_at, duration, success_count, failure_count, skip_count
+                FROM runs ORDER BY started_at DESC, id DESC LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [RunRecord(*row) for row in rows]
+
+    def updater_summaries(self, limit: int) -> list[UpdaterSummary]:
+        """直近の実行における、updaterごとの処理時間・失敗率・傾向を集計する.
+
+        スキップした実行は集計に含めません。
+
+        Args:
+            limit: 集計対象とする直近の実行数.
+
+        Returns:
+            updaterごとの集計のリスト. updater名の順. データベースがない場合は空のリスト.
+
+        Raises:
+            sqlite3.Error: 読み込みに失敗した場合.
+
+        """
+        if not self.db_file.exists():
+            return []
+        with closing(self._connect()) as conn:
+            rows: list[tuple[str, str, float | None]] = conn.execute(
+                """
+                SELECT u.name, u.status, u.duration FROM updaters u
+                JOIN (SELECT id, started_at FROM runs ORDER BY started_at DESC, id DESC LIMIT ?) r
+                ON u.run_id = r.id
+                WHERE u.status != 'skip'
+                ORDER BY u.name, r.started_at, r.id
+                """,
+                (limit,),
+            ).fetchall()
+
+        grouped: dict[str, list[tuple[str, float | None]]] = {}
+        for name, status, duration in rows:
+            grouped.setdefault(name, []).append((status, duration))
+
+        summaries: list[UpdaterSummary] = []
+        for name, results in grouped.items():
+            durations = [duration for _status, duration in results if duration is not None]
+            summaries.append(
+                UpdaterSummary(
+                    name=name,
+                    runs=len(results),
+                    failures=sum(1 for status, _duration in results if status == "failure"),
+                    p50=percentile(durations, 50),
+                    p95=percentile(durations, 95),
+                    trend=_trend(durations),
+                )
+            )
+        return summaries
+
+    def phase_durations(self, phase: str, limit: int) -> dict[str, list[float]]:
+        """直近の実行における、updaterごとのフェーズの処理時間を返す.
+
+        Args:
+            phase: フェーズ名("refresh", "apply"など).
+            limit: 対象とする直近の実行数.
+
+        Returns:
+            updater名をキーとした処理時間(秒)のリスト. 古い順. データベースがない場合は空の辞書.
+
+        Raises:
+            sqlite3.Error: 読み込みに失敗した場合.
+
+        """
+        if not self.db_file.exists():
+            return {}
+        with closing(self._connect()) as conn:
+            rows: list[tuple[str, float]] = conn.execute(
+                """
+                SELECT s.updater, s.duration FROM steps s
+                JOIN (SELECT id FROM runs ORDER BY started_at DESC, id DESC LIMIT ?) r
+                ON s.run_id = r.id
+                WHERE s.kind = 'phase' AND s.name = ? AND s.updater IS NOT NULL
+                ORDER BY s.started_at
+                """,
+                (limit, phase),
+            ).fetchall()
+
+        durations: dict[str, list[float]] = {}
+        for updater, duration in rows:
+            durations.setdefault(updater, []).append(duration)
+        return durations
+
+    def command_durations(self, limit: int) -> dict[str, list[float]]:
+        """直近の実行における、コマンドごとの処理時間を返す.
+
+        タイムアウトなどで終了コードのない(完了しなかった)コマンドは、打ち切りまでの時間を
+        実際の処理時間の下限として含めます。
+
+        Args:
+            limit: 対象とする直近の実行数.
+
+        Returns:
+            コマンドをキーとした処理時間(秒)のリスト. 古い順. データベースがない場合は空の辞書.
+
+        Raises:
+            sqlite3.Error: 読み込みに失敗した場合.
+
+        """
+        if not self.db_file.exists():
+            return {}
+        with closing(self._connect()) as conn:
+            rows: list[tuple[str, float]] = conn.execute(
+                """
+                SELECT s.name, s.duration FROM steps s
+                JOIN (SELECT id FROM runs ORDER BY started_at DESC, id DESC LIMIT ?) r
+                ON s.run_id = r.id
+                WHERE s.kind = 'command'
+                ORDER BY s.started_at
+                """,
+                (limit,),
+            ).fetchall()
+
+        durations: dict[str, list[float]] = {}
+        for command, duration in rows:
+            durations.setdefault(command, []).append(duration)
+        return durations
+
+
+def _trend(durations: Sequence[float]) -> float | None:
+    """処理時間の変化率を求める.
+
+    Args:
+        durations: 処理時間のリスト. 古い順.
+
+    Returns:
+        後半の中央値の、前半の中央値に対する変化率. 4件未満または前半の中央値が0の場合None.
+
+    """
+    if len(durations) < 4:
+        return None
+    half = len(durations) // 2
+    older = percentile(durations[:half], 50)
+    newer = percentile(durations[-half:], 50)
+    if older is None or newer is None or older <= 0:
+        return None
+    return newer / older - 1
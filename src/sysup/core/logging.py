@@ -11,6 +11,10 @@ from pathlib import Path
 
 from rich.console import Console
 from rich.logging import RichHandler
+from rich.markup import escape
+
+# コマンド出力を記録するロガー名. ログレベル設定に関わらずログファイルへ記録する
+OUTPUT_LOGGER_NAME = "sysup.output"
 
 
 class SysupLogger:
@@ -24,6 +28,7 @@ class SysupLogger:
         retention_days: ログファイルの保持日数.
         console: Richのコンソールインスタンス.
         logger: Pythonの標準ロガーインスタンス.
+        output_logger: コマンド出力を記録するロガー. ログファイルにのみ出力される.
 
     """
 
@@ -40,6 +45,8 @@ class SysupLogger:
         self.retention_days: int = retention_days
         self.console: Console = Console()
         self.logger: logging.Logger = self._setup_logger(level)
+        self.output_logger: logging.Logger = logging.getLogger(OUTPUT_LOGGER_NAME)
+        self.output_logger.setLevel(logging.DEBUG)
         self._rotate_logs()
 
     def _setup_logger(self, level: str) -> logging.Logger:
@@ -61,6 +68,8 @@ class SysupLogger:
         # コンソールハンドラー（Rich使用）
         console_handler = RichHandler(console=self.console, show_time=True, show_path=False, markup=True)
         console_handler.setLevel(getattr(logging, level.upper()))  # type: ignore
+        # コマンド出力はcommand_output()でコンソールに表示するため、二重に表示しない
+        console_handler.addFilter(lambda record: record.name != OUTPUT_LOGGER_NAME)
         logger.addHandler(console_handler)
 
         # ファイルハンドラー
@@ -131,6 +140,31 @@ class SysupLogger:
         self.console.print(f"[dim]🔍 {message}[/dim]")
         self.logger.debug(message)
 
+    def command_output(self, source: str, line: str) -> None:
+        """実行中コマンドの出力を1行出力する.
+
+        コンソールには出力元を前置した1行として表示し、ログファイルにはログレベル設定に関わらず記録します。
+
+        Args:
+            source: 出力元の名前(例: "APT").
+            line: 出力された行.
+
+        """
+        self.console.print(f"[dim]{escape(source)} │ {escape(line)}[/dim]", no_wrap=True, overflow="ellipsis")
+        self.log_command_output(source, line)
+
+    def log_command_output(self, source: str, line: str) -> None:
+        """実行中コマンドの出力を1行、ログファイルにのみ記録する.
+
+        解析のために出力を取得するコマンドなど、コンソールに表示しない出力に使用します。
+
+        Args:
+            source: 出力元の名前(例: "APT").
+            line: 出力された行.
+
+        """
+        self.output_logger.debug(f"[{source}] {line}")
+
     def warning(self, message: str) -> None:
         """警告メッセージを出力する.
 
@@ -0,0 +1,194 @@
+"""Prometheusのテキストファイル形式によるメトリクスの出力.
+
+このモジュールは、`sysup update` の実行結果を、node_exporterのtextfileコレクタが読み込む
+`.prom` ファイルに書き出す機能を提供します。
+
+システムチェックで中断するなど、更新を行わずに終了した実行も記録するため、
+前回の実行結果が最新のものとして残ることはありません。
+ファイルは同じディレクトリの一時ファイルに書き込んでから置き換えるため、
+コレクタが書き込み途中のファイルを読み込むことはありません。
+最終成功時刻は、前回書き出したファイルから引き継ぎます。
+"""
+
+import contextlib
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .history import UpdaterRecord
+
+# updaterの結果の種類
+UPDATER_STATUSES = ("success", "failure", "skip")
+
+_LAST_SUCCESS_METRIC = "sysup_last_success_timestamp_seconds"
+
+
+@dataclass(frozen=True)
+class RunMetrics:
+    """1回の実行のメトリクス.
+
+    Attributes:
+        finished_at: 終了時刻(Unix時刻).
+        duration: 処理時間(秒).
+        updaters: updaterごとの結果.
+        backup_duration: バックアップの所要時間(秒). バックアップしていない場合None.
+        reboot_required: 再起動が必要かどうか. 確認していない場合None.
+        completed: 更新まで実行したかどうか. システムチェックでの中断など、更新を行わずに終了した場合False.
+
+    """
+
+    finished_at: float
+    duration: float
+    updaters: Sequence[UpdaterRecord] = ()
+    backup_duration: float | None = None
+    reboot_required: bool | None = False
+    completed: bool = True
+
+    @property
+    def succeeded(self) -> bool:
+        """更新まで実行し、失敗したupdaterがない場合True."""
+        return self.completed and all(updater.status != "failure" for updater in self.updaters)
+
+
+def render_metrics(run: RunMetrics, last_success: float | None = None) -> str:
+    """実行のメトリクスをPrometheusのテキスト形式に変換する.
+
+    Args:
+        run: 実行のメトリクス.
+        last_success: 前回までの最終成功時刻(Unix時刻). この実行が成功した場合は終了時刻で置き換える.
+
+    Returns:
+        テキスト形式のメトリクス.
+
+    """
+    if run.succeeded:
+        last_success = run.finished_at
+
+    lines: list[str] = []
+
+    def gauge(name: str, help_text: str, samples: Sequence[tuple[dict[str, str], float]]) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+
+    gauge("sysup_last_run_timestamp_seconds", "Time the last sysup run finished.", [({}, run.finished_at)])
+    gauge("sysup_last_run_duration_seconds", "Duration of the last sysup run.", [({}, run.duration)])
+    gauge("sysup_last_run_completed", "Whether the last sysup run reached the update phase.", [({}, run.completed)])
+    gauge("sysup_last_run_success", "Whether the last sysup run finished without failures.", [({}, run.succeeded)])
+    if last_success is not None:
+        gauge(_LAST_SUCCESS_METRIC, "Time the last sysup run without failures finished.", [({}, last_success)])
+    if run.backup_duration is not None:
+        gauge("sysup_backup_duration_seconds", "Duration of the package list backup.", [({}, run.backup_duration)])
+    if run.reboot_required is not None:
+        gauge("sysup_reboot_required", "Whether a reboot is required after the last run.", [({}, run.reboot_required)])
+    gauge(
+        "sysup_updaters",
+        "Number of updaters by result in the last run.",
+        [({"status": status}, sum(1 for u in run.updaters if u.status == status)) for status in UPDATER_STATUSES],
+    )
+    gauge(
+        "sysup_updater_status",
+        "Result of each updater in the last run (1 for the current status).",
+        [
+            ({"updater": u.name, "status": status}, u.status == status)
+            for u in run.updaters
+            for status in UPDATER_STATUSES
+        ],
+    )
+    gauge(
+        "sysup_updater_duration_seconds",
+        "Duration of each updater in the last run.",
+        [({"updater": u.name}, u.duration) for u in run.updaters if u.duration is not None],
+    )
+    gauge(
+        "sysup_updater_packages_upgraded",
+        "Number of packages upgraded by each updater in the last run.",
+        [({"updater": u.name}, u.packages) for u in run.updaters if u.packages is not None],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def read_last_success(textfile: Path) -> float | None:
+    """前回書き出したファイルから最終成功時刻を読み込む.
+
+    Args:
+        textfile: メトリクスファイルのパス.
+
+    Returns:
+        最終成功時刻(Unix時刻). ファイルが存在しない・記録がない場合None.
+
+    """
+    try:
+        content = textfile.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in content.splitlines():
+        name, _, value = line.partition(" ")
+        if name == _LAST_SUCCESS_METRIC:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def write_metrics(textfile: Path, run: RunMetrics) -> None:
+    """実行のメトリクスをファイルに書き出す.
+
+    同じディレクトリの一時ファイルに書き込んでから置き換えます。
+
+    Args:
+        textfile: メトリクスファイルのパス.
+        run: 実行のメトリクス.
+
+    Raises:
+        OSError: 書き込みに失敗した場合.
+
+    """
+    content = render_metrics(run, read_last_success(textfile))
+    # textfileコレクタは拡張子が.promのファイルのみを読み込むため、一時ファイルは読み込まれない
+    tmp_file = textfile.with_name(f"{textfile.name}.{os.getpid()}.tmp")
+    try:
+        textfile.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(content, encoding="utf-8")
+        os.replace(tmp_file, textfile)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp_file.unlink()
+        raise
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    """ラベルをテキスト形式に変換する.
+
+    Args:
+        labels: ラベル名をキーとしたラベル値.
+
+    Returns:
+        `{name="value",...}` の形式の文字列. ラベルがない場合は空文字列.
+
+    """
+    if not labels:
+        return ""
+    pairs: list[str] = []
+    for name, value in labels.items():
+        escaped = value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """値をテキスト形式に変換する.
+
+    Args:
+        value: 値. boolは0または1になる.
+
+    Returns:
+        整数の場合は小数点のない形式、それ以外はPythonの浮動小数点数の表現.
+
+    """
+    number = float(value)
+    return str(int(number)) if number.is_integer() else repr(number)
@@ -0,0 +1,28 @@
+"""既定のパス定義.
+
+このモジュールは設定ファイルの検索パスやキャッシュディレクトリなど、
+sysupが使用する既定のパスを定義します。
+起動直後の軽量なエントリーポイントからも参照するため、標準ライブラリ以外をimportしません。
+"""
+
+from pathlib import Path
+
+# キャッシュディレクトリの既定値
+DEFAULT_CACHE_DIR = "~/.cache/sysup"
+
+# 最後に更新を実行した日付を記録するファイル名(キャッシュディレクトリ内)
+DAILY_RUN_FILE = "daily_run"
+
+
+def default_config_paths() -> list[Path]:
+    """設定ファイルの検索パスを優先順に返す.
+
+    Returns:
+        設定ファイルのパスのリスト.
+
+    """
+    return [
+        Path.home() / ".config" / "sysup" / "sysup.toml",
+        Path.home() / ".sysup.toml",
+        Path("/etc/sysup/sysup.toml"),
+    ]
@@ -0,0 +1,176 @@
+"""更新計画のキャッシュ.
+
+このモジュールは、各updaterの更新可能なパッケージ数・ダウンロードサイズ・予想所要時間を
+更新計画としてキャッシュディレクトリに保存し、有効期間内の `sysup update` で再利用する機能を提供します。
+
+キャッシュは `sysup plan` と `sysup update` のplanフェーズで記録され、
+更新を適用したupdaterのエントリは破棄されます。
+キャッシュした時点以降にメタデータを更新したupdaterのエントリは再利用しません。
+"""
+
+import contextlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+CACHE_VERSION = 1
+
+# キャッシュディレクトリ内のキャッシュファイル名
+PLAN_CACHE_FILE = "plan_cache.json"
+
+
+@dataclass(frozen=True)
+class PlanEntry:
+    """updaterごとの更新計画.
+
+    Attributes:
+        pending: 更新可能なパッケージ数. 不明な場合None.
+        download_bytes: 更新で取得するパッケージの合計サイズ(バイト). 不明な場合None.
+        estimated_seconds: 更新の予想所要時間(秒). 不明な場合None.
+
+    """
+
+    pending: int | None
+    download_bytes: int | None = None
+    estimated_seconds: float | None = None
+
+
+class PlanCache:
+    """更新計画のキャッシュ.
+
+    複数のupdaterからスレッドをまたいで呼び出しても安全です。
+
+    Attributes:
+        cache_file: キャッシュファイルのパス. Noneの場合はメモリ上のみで保持する.
+        ttl: エントリの有効期間.
+
+    Examples:
+        >>> cache = PlanCache.load(cache_dir / "plan_cache.json", ttl_minutes=30)
+        >>> cache.put("apt", PlanEntry(pending=0))
+        >>> cache.get("apt")
+        PlanEntry(pending=0, download_bytes=None, estimated_seconds=None)
+        >>> cache.save()
+
+    """
+
+    def __init__(self, cache_file: Path | None = None, ttl_minutes: float = 30):
+        """PlanCacheを初期化する.
+
+        Args:
+            cache_file: キャッシュファイルのパス. Noneの場合はメモリ上のみで保持する.
+            ttl_minutes: エントリの有効期間(分). 0の場合はキャッシュを再利用しない.
+
+        """
+        self.cache_file: Path | None = cache_file
+        self.ttl: timedelta = timedelta(minutes=ttl_minutes)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def load(cls, cache_file: Path, ttl_minutes: float = 30) -> "PlanCache":
+        """キャッシュファイルから読み込む.
+
+        ファイルが存在しない・壊れている場合は空のキャッシュを返します。
+
+        Args:
+            cache_file: キャッシュファイルのパス.
+            ttl_minutes: エントリの有効期間(分).
+
+        Returns:
+            PlanCacheインスタンス.
+
+        """
+        cache = cls(cache_file, ttl_minutes)
+        try:
+            data: dict[str, Any] = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cache
+
+        if (
+            isinstance(data, dict)  # pyright: ignore[reportUnnecessaryIsInstance]
+            and data.get("version") == CACHE_VERSION
+            and isinstance(data.get("entries"), dict)
+        ):
+            cache._entries = data["entries"]
+        return cache
+
+    def save(self) -> None:
+        """キャッシュファイルに書き出す.
+
+        変更がない場合やcache_fileがNoneの場合は何もしません。
+        書き込みに失敗してもキャッシュは必須ではないため例外は送出しません。
+        """
+        if self.cache_file is None or not self._dirty:
+            return
+
+        with self._lock:
+            data = {"version": CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            with contextlib.suppress(OSError):
+                tmp_file.unlink()
+
+    def get(self, name: str, not_before: float | None = None) -> PlanEntry | None:
+        """有効期間内の更新計画を返す.
+
+        Args:
+            name: updater名.
+            not_before: この時刻(Unix時刻)より前に記録された更新計画は返さない.
+                パッケージメタデータの最終更新時刻を指定する. Noneの場合は有効期間のみで判定する.
+
+        Returns:
+            更新計画. エントリがない・有効期間を過ぎている・not_beforeより前に記録された・壊れている場合None.
+
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            return None
+
+        try:
+            checked_at = datetime.fromisoformat(entry["checked_at"])
+            age = datetime.now(UTC) - checked_at
+            if not timedelta(0) <= age < self.ttl:
+                return None
+            if not_before is not None and checked_at.timestamp() < not_before:
+                return None
+            return PlanEntry(entry["pending"], entry.get("download_bytes"), entry.get("estimated_seconds"))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def put(self, name: str, plan: PlanEntry) -> None:
+        """更新計画を記録する.
+
+        Args:
+            name: updater名.
+            plan: 更新計画.
+
+        """
+        entry = {**asdict(plan), "checked_at": datetime.now(UTC).isoformat()}
+        with self._lock:
+            self._entries[name] = entry
+            self._dirty = True
+
+    def discard(self, name: str) -> None:
+        """更新計画を破棄する.
+
+        更新を適用してパッケージの状態が変わった場合に呼び出します。
+
+        Args:
+            name: updater名.
+
+        """
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._dirty = True
@@ -0,0 +1,97 @@
+"""プロセス優先度の調整.
+
+このモジュールは、`sysup prefetch` のようなバックグラウンド処理のために、
+現在のプロセスのCPU・I/O優先度を下げる機能を提供します。
+優先度は子プロセスに引き継がれるため、パッケージマネージャのコマンドも低い優先度で実行されます。
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+from .platform import get_platform
+
+# POSIXのnice値の最大値(最も低い優先度)
+LOWEST_NICE = 19
+
+# WindowsのIDLE_PRIORITY_CLASS
+_IDLE_PRIORITY_CLASS = 0x00000040
+
+
+def lower_process_priority() -> bool:
+    """現在のプロセスのCPU・I/O優先度を下げる.
+
+    - Linux: nice値を19にし、ioniceでI/Oスケジューリングクラスをidleにする
+    - macOS: nice値を19にし、taskpolicyでバックグラウンド(I/Oも抑制される)にする
+    - Windows: 優先度クラスをIDLEにする
+
+    スレッドを起動する前に呼び出してください。
+
+    Returns:
+        すべての調整に成功した場合True. 一部でも失敗した場合はFalse.
+
+    """
+    system = get_platform()
+    if system == "Windows":
+        return _set_idle_priority_class()
+
+    cpu = _lower_cpu_priority()
+    if system == "Linux":
+        io = _run_priority_command(["ionice", "-c", "3", "-p", str(os.getpid())])
+    elif system == "Darwin":
+        io = _run_priority_command(["taskpolicy", "-b", "-p", str(os.getpid())])
+    else:
+        io = False
+    return cpu and io
+
+
+def _lower_cpu_priority() -> bool:
+    """nice値を最大にする.
+
+    Returns:
+        成功した場合True.
+
+    """
+    try:
+        current = os.nice(0)
+        if current < LOWEST_NICE:
+            os.nice(LOWEST_NICE - current)
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def _run_priority_command(command: list[str]) -> bool:
+    """優先度を変更するコマンドを実行する.
+
+    Args:
+        command: 実行するコマンド.
+
+    Returns:
+        コマンドが存在し、正常終了した場合True.
+
+    """
+    if shutil.which(command[0]) is None:
+        return False
+    try:
+        result = subprocess.run(command, capture_output=True, check=False, timeout=10)
+        return result.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def _set_idle_priority_class() -> bool:
+    """Windowsのプロセス優先度クラスをIDLEにする.
+
+    Returns:
+        成功した場合True.
+
+    """
+    if sys.platform != "win32":
+        return False
+
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    return bool(kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), _IDLE_PRIORITY_CLASS))
@@ -0,0 +1,221 @@
+"""コマンド利用可否のプローブキャッシュ.
+
+このモジュールは、updaterの `is_available()` で行うコマンド探索の結果を
+キャッシュディレクトリに保存し、実行をまたいで再利用する機能を提供します。
+コマンドの探索は `shutil.which` でプロセス内で行い、`which`/`where` をforkしません。
+
+キャッシュは以下の場合に無効化されます:
+
+- PATH(WindowsではPATHEXTも)の内容が変わった場合
+- PATH上のいずれかのディレクトリの更新時刻が変わった場合(実行ファイルの追加・削除)
+- 解決済みの実行ファイルの更新時刻が変わった場合、または削除された場合
+- 任意のプローブで監視対象として指定したファイルの更新時刻が変わった場合
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+CACHE_VERSION = 1
+
+# キャッシュディレクトリ内のキャッシュファイル名
+PROBE_CACHE_FILE = "probe_cache.json"
+
+
+def _mtime(path: str | Path) -> float | None:
+    """ファイルの更新時刻を返す.
+
+    Args:
+        path: 対象パス.
+
+    Returns:
+        更新時刻(Unix時刻). 存在しない場合None.
+
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def path_fingerprint() -> str:
+    """現在のPATHの状態を表すフィンガープリントを返す.
+
+    PATH(WindowsではPATHEXTも)の内容と、PATH上の各ディレクトリの更新時刻から計算します。
+
+    Returns:
+        フィンガープリント文字列.
+
+    """
+    path = os.environ.get("PATH", "")
+    parts = [path, os.environ.get("PATHEXT", "")]
+    parts.extend(str(_mtime(directory)) for directory in path.split(os.pathsep) if directory)
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class ProbeCache:
+    """コマンド利用可否のプローブキャッシュ.
+
+    1回の実行中は結果をメモリ上で共有し、save()でキャッシュファイルに書き出します。
+    複数のupdaterからスレッドをまたいで呼び出しても安全です。
+
+    Attributes:
+        cache_file: キャッシュファイルのパス. Noneの場合はメモリ上のみで保持する.
+
+    Examples:
+        >>> cache = ProbeCache.load(cache_dir / "probe_cache.json")
+        >>> cache.which("apt")
+        '/usr/bin/apt'
+        >>> cache.save()
+
+    """
+
+    def __init__(self, cache_file: Path | None = None):
+        """ProbeCacheを初期化する.
+
+        Args:
+            cache_file: キャッシュファイルのパス. Noneの場合はメモリ上のみで保持する.
+
+        """
+        self.cache_file: Path | None = cache_file
+        self._fingerprint: str = path_fingerprint()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._verified: set[str] = set()
+        self._dirty: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def load(cls, cache_file: Path) -> "ProbeCache":
+        """キャッシュファイルから読み込む.
+
+        ファイルが存在しない・壊れている・PATHが変わっている場合は空のキャッシュを返します。
+
+        Args:
+            cache_file: キャッシュファイルのパス.
+
+        Returns:
+            ProbeCacheインスタンス.
+
+        """
+        cache = cls(cache_file)
+        try:
+            data: dict[str, Any] = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cache
+
+        if (
+            isinstance(data, dict)  # pyright: ignore[reportUnnecessaryIsInstance]
+            and data.get("version") == CACHE_VERSION
+            and data.get("path_fingerprint") == cache._fingerprint
+            and isinstance(data.get("entries"), dict)
+        ):
+            cache._entries = data["entries"]
+        return cache
+
+    def save(self) -> None:
+        """キャッシュファイルに書き出す.
+
+        変更がない場合やcache_fileがNoneの場合は何もしません。
+        書き込みに失敗してもキャッシュは必須ではないため例外は送出しません。
+        """
+        if self.cache_file is None or not self._dirty:
+            return
+
+        with self._lock:
+            data = {"version": CACHE_VERSION, "path_fingerprint": self._fingerprint, "entries": self._entries}
+            self._dirty = False
+
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            with contextlib.suppress(OSError):
+                tmp_file.unlink()
+
+    def which(self, command: str) -> str | None:
+        """コマンドの実行ファイルのパスを返す.
+
+        Args:
+            command: コマンド名.
+
+        Returns:
+            実行ファイルのパス. 見つからない場合None.
+
+        """
+        key = f"which:{command}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (key in self._verified or self._is_valid(entry)):
+                self._verified.add(key)
+                return entry["value"]
+
+        path = shutil.which(command)
+        self._store(key, path, [path] if path else [])
+        return path
+
+    def probe(self, name: str, func: Callable[[], bool], watch: Iterable[Path] = ()) -> bool:
+        """任意のプローブ結果をキャッシュする.
+
+        シェル関数として提供されるnvmのように、`which` で探索できないツールの確認に使用します。
+
+        Args:
+            name: プローブ名. キャッシュ内で一意である必要がある.
+            func: 利用可否を判定する関数.
+            watch: 更新時刻を監視するファイル. いずれかが変わった場合に再判定する.
+
+        Returns:
+            funcの戻り値(またはキャッシュされた値).
+
+        """
+        key = f"probe:{name}"
+        watch_paths = [str(path) for path in watch]
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and sorted(entry.get("mtimes", {})) == sorted(watch_paths)
+                and (key in self._verified or self._is_valid(entry))
+            ):
+                self._verified.add(key)
+                return bool(entry["value"])
+
+        value = func()
+        self._store(key, value, watch_paths)
+        return value
+
+    @staticmethod
+    def _is_valid(entry: dict[str, Any]) -> bool:
+        """エントリが監視対象ファイルの更新時刻と一致するか判定する.
+
+        Args:
+            entry: キャッシュエントリ.
+
+        Returns:
+            すべての監視対象ファイルの更新時刻が記録時と一致する場合True.
+
+        """
+        mtimes: dict[str, float | None] = entry.get("mtimes", {})
+        return all(_mtime(path) == mtime for path, mtime in mtimes.items())
+
+    def _store(self, key: str, value: Any, watch: list[str]) -> None:
+        """エントリを記録する.
+
+        Args:
+            key: エントリのキー.
+            value: 記録する値.
+            watch: 更新時刻を監視するファイルのパス.
+
+        """
+        entry = {"value": value, "mtimes": {path: _mtime(path) for path in watch}}
+        with self._lock:
+            self._entries[key] = entry
+            self._verified.add(key)
+            self._dirty = True
@@ -0,0 +1,315 @@
+"""依存関係を考慮したタスクスケジューラ.
+
+このモジュールは、各タスクが宣言する依存関係に従って実行順序を決定する
+DAG(有向非巡回グラフ)スケジューラを提供します。
+前提となるタスクがすべて完了した時点で、各タスクを即座に開始します。
+また、タスクが使用するリソースクラスごとに同時実行数を制限できます。
+"""
+
+import contextvars
+import time
+from collections import Counter
+from collections.abc import Callable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class ResourceClass(StrEnum):
+    """タスクが消費するリソースの分類.
+
+    同じリソースクラスを使用するタスクの同時実行数は、
+    スケジューラに設定された上限までに制限されます。
+
+    Attributes:
+        SYSTEM_LOCK: システムパッケージのロック(dpkgフロントエンドロック等)やsudoを伴う更新.
+        NETWORK: 大量のダウンロードを伴う処理.
+        CPU: コンパイル等でCPUを占有する処理.
+        DISK: 大量のファイル展開・書き込みを伴う処理.
+
+    """
+
+    SYSTEM_LOCK = "system_lock"
+    NETWORK = "network"
+    CPU = "cpu"
+    DISK = "disk"
+
+
+@dataclass
+class Task(Generic[T]):
+    """スケジューラで実行するタスク.
+
+    Attributes:
+        name: タスク名. スケジューラ内で一意である必要がある.
+        func: 実行する関数.
+        dependencies: 先に完了している必要があるタスク名.
+            スケジューラに登録されていない名前は無視される.
+        resources: タスクが使用するリソースクラス.
+        cost: 予想所要時間(秒). 実行可能なタスクの開始順の決定に使用する.
+
+    """
+
+    name: str
+    func: Callable[[], T]
+    dependencies: tuple[str, ...] = ()
+    resources: tuple[str, ...] = ()
+    cost: float = 0.0
+
+
+@dataclass
+class TaskResult(Generic[T]):
+    """タスクの実行結果.
+
+    Attributes:
+        name: タスク名.
+        value: タスクの戻り値. 例外が発生した場合None.
+        error: タスク実行中に発生した例外. 正常終了時はNone.
+        start_time: 開始時刻(Unix時刻).
+        end_time: 終了時刻(Unix時刻).
+
+    """
+
+    name: str
+    value: T | None = None
+    error: Exception | None = None
+    start_time: float = field(default_factory=time.time)
+    end_time: float = field(default_factory=time.time)
+
+    @property
+    def duration(self) -> float:
+        """実行時間を秒単位で返す.
+
+        Returns:
+            開始から終了までの秒数.
+
+        """
+        return self.end_time - self.start_time
+
+
+class TaskScheduler(Generic[T]):
+    """依存関係を考慮したDAGスケジューラ.
+
+    登録されたタスクを依存関係に従って実行します。
+    前提タスクが完了し、かつ使用するリソースクラスに空きがあるタスクから順に、
+    空いているワーカーへ割り当てます。
+    実行可能なタスクが複数ある場合は、クリティカルパス長(自身と、自身に依存するタスクの連鎖の
+    予想所要時間の合計の最大値)が長いものから開始します。所要時間の長いタスクを後回しにして
+    全体の完了が遅れることを防ぐためです(LPT: Longest Processing Time first)。
+    クリティカルパス長が等しい場合(costを指定しない場合を含む)は登録順に開始します。
+
+    Attributes:
+        max_workers: 同時に実行するタスクの最大数.
+        resource_limits: リソースクラスごとの同時実行数の上限.
+            上限が設定されていないリソースクラスは無制限として扱う.
+
+    Examples:
+        >>> scheduler = TaskScheduler(max_workers=2)
+        >>> scheduler.add_task(Task("rustup", update_rustup))
+        >>> scheduler.add_task(Task("cargo", update_cargo, dependencies=("rustup",)))
+        >>> results = scheduler.run()
+
+    """
+
+    def __init__(self, max_workers: int = 4, resource_limits: Mapping[str, int] | None = None):
+        """TaskSchedulerを初期化する.
+
+        Args:
+            max_workers: 同時に実行するタスクの最大数. デフォルトは4.
+            resource_limits: リソースクラスごとの同時実行数の上限. デフォルトは無制限.
+
+        Raises:
+            ValueError: max_workersまたはリソース上限が1未満の場合.
+
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workersは1以上である必要があります: {max_workers}")
+
+        limits = dict(resource_limits or {})
+        for resource, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"リソース上限は1以上である必要があります: {resource}={limit}")
+
+        self.max_workers: int = max_workers
+        self.resource_limits: dict[str, int] = limits
+        self._tasks: dict[str, Task[T]] = {}
+
+    def add_task(self, task: Task[T]) -> None:
+        """タスクを登録する.
+
+        Args:
+            task: 登録するタスク.
+
+        Raises:
+            ValueError: 同名のタスクが既に登録されている場合.
+
+        """
+        if task.name in self._tasks:
+            raise ValueError(f"タスクが重複しています: {task.name}")
+        self._tasks[task.name] = task
+
+    def _dependencies_of(self, task: Task[T]) -> list[str]:
+        """登録済みタスクに限定した依存関係を返す.
+
+        Args:
+            task: 対象タスク.
+
+        Returns:
+            スケジューラに登録されている依存タスク名のリスト.
+
+        """
+        return [dep for dep in task.dependencies if dep in self._tasks and dep != task.name]
+
+    def _validate(self) -> None:
+        """依存関係が循環していないか検証する.
+
+        Raises:
+            ValueError: 依存関係が循環している場合.
+
+        """
+        remaining = {name: set(self._dependencies_of(task)) for name, task in self._tasks.items()}
+
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                cycle = ", ".join(sorted(remaining))
+                raise ValueError(f"依存関係が循環しています: {cycle}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _critical_paths(self) -> dict[str, float]:
+        """各タスクのクリティカルパス長を求める.
+
+        Returns:
+            タスク名をキーとした、自身から依存の連鎖の末端までの予想所要時間の合計の最大値.
+
+        """
+        dependents: dict[str, list[str]] = {name: [] for name in self._tasks}
+        for name, task in self._tasks.items():
+            for dep in self._dependencies_of(task):
+                dependents[dep].append(name)
+
+        lengths: dict[str, float] = {}
+
+        def length(name: str) -> float:
+            if name not in lengths:
+                downstream = max((length(dependent) for dependent in dependents[name]), default=0.0)
+                lengths[name] = self._tasks[name].cost + downstream
+            return lengths[name]
+
+        for name in self._tasks:
+            length(name)
+        return lengths
+
+    def _has_capacity(self, task: Task[T], in_use: Counter[str]) -> bool:
+        """タスクが使用するリソースクラスに空きがあるか判定する.
+
+        Args:
+            task: 対象タスク.
+            in_use: リソースクラスごとの使用中タスク数.
+
+        Returns:
+            すべてのリソースクラスに空きがある場合True.
+
+        """
+        return all(
+            in_use[resource] < self.resource_limits[resource]
+            for resource in set(task.resources)
+            if resource in self.resource_limits
+        )
+
+    @staticmethod
+    def _execute(task: Task[T]) -> TaskResult[T]:
+        """タスクを実行し、結果を返す.
+
+        Args:
+            task: 実行するタスク.
+
+        Returns:
+            タスクの実行結果. 例外は結果に格納され、再送出されない.
+
+        """
+        result: TaskResult[T] = TaskResult(task.name)
+        try:
+            result.value = task.func()
+        except Exception as e:
+            result.error = e
+        result.end_time = time.time()
+        return result
+
+    def run(
+        self,
+        on_start: Callable[[Task[T]], None] | None = None,
+        on_complete: Callable[[TaskResult[T]], None] | None = None,
+        on_interrupt: Callable[[], None] | None = None,
+    ) -> dict[str, TaskResult[T]]:
+        """登録されたタスクをすべて実行する.
+
+        コールバックはスケジューラのスレッドから呼ばれるため、
+        コールバック内で共有状態を更新してもロックは不要です。
+        Ctrl+C(KeyboardInterrupt)で中断された場合は、未開始のタスクを取り消し、
+        on_interruptで実行中のタスクを終了させてから、その完了を待って例外を再送出します。
+
+        Args:
+            on_start: タスク開始時に呼ばれるコールバック.
+            on_complete: タスク完了時に呼ばれるコールバック.
+            on_interrupt: 中断時に呼ばれるコールバック. 実行中のタスクを早く終了させるために使用する.
+
+        Returns:
+            タスク名をキーとした実行結果の辞書.
+
+        Raises:
+            ValueError: 依存関係が循環している場合.
+
+        """
+        self._validate()
+
+        # 登録順を保ったままクリティカルパス長の降順に並べる(sortedは安定ソート)
+        critical_paths = self._critical_paths()
+        pending = sorted(self._tasks.values(), key=lambda task: -critical_paths[task.name])
+        completed: set[str] = set()
+        results: dict[str, TaskResult[T]] = {}
+        running: dict[Future[TaskResult[T]], Task[T]] = {}
+        in_use: Counter[str] = Counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or running:
+                    for task in list(pending):
+                        if len(running) >= self.max_workers:
+                            break
+                        if not all(dep in completed for dep in self._dependencies_of(task)):
+                            continue
+                        if not self._has_capacity(task, in_use):
+                            continue
+
+                        pending.remove(task)
+                        in_use.update(set(task.resources))
+                        if on_start:
+                            on_start(task)
+                        # ワーカースレッドにはContextVar(計測中のスパンなど)が引き継がれないため、
+                        # 登録時点のコンテキストのコピーで実行する
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, self._execute, task)] = task
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        task = running.pop(future)
+                        in_use.subtract(set(task.resources))
+                        result = future.result()
+                        results[task.name] = result
+                        completed.add(task.name)
+                        if on_complete:
+                            on_complete(result)
+            except KeyboardInterrupt:
+                # executorを抜ける際に実行中のタスクの完了を待つため、先に未開始のタスクを取り消して終了させる
+                executor.shutdown(wait=False, cancel_futures=True)
+                if on_interrupt:
+                    on_interrupt()
+                raise
+
+        return results
@@ -1,29 +1,119 @@
 """sysup自身の更新機能.
 
 このモジュールはsysup自身のバージョンチェックと自動更新機能を提供します。
+
+更新チェックはネットワークアクセスを伴うため、最終チェック時刻をキャッシュディレクトリに記録し、
+設定した間隔が経過するまでは行いません。チェックが必要な場合はバックグラウンドで実行し、
+呼び出し側が安全な時点(updaterの実行前)で完了を待って、更新されていれば再実行します。
 """
 
+import contextlib
 import os
 import subprocess
 import sys
+import threading
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 from .logging import SysupLogger
 
+# キャッシュディレクトリ内の最終チェック時刻ファイル名
+SELF_UPDATE_CHECK_FILE = "self_update_check"
+
+# 更新後の再実行時に付与するオプション(日次チェックと再度のセルフアップデートを行わない)
+RESTART_OPTIONS = ("--force", "--no-self-update")
+
 
 class SelfUpdater:
     """sysup自身の更新を管理するクラス."""
 
-    def __init__(self, logger: SysupLogger, cache_dir: Path):
+    def __init__(self, logger: SysupLogger, cache_dir: Path, interval_hours: float = 24):
         """SelfUpdaterを初期化する.
 
         Args:
             logger: ロガーインスタンス.
             cache_dir: キャッシュディレクトリのパス.
+            interval_hours: 更新チェックの間隔(時間). 0の場合は毎回チェックする.
 
         """
         self.logger: SysupLogger = logger
         self.cache_dir: Path = cache_dir
+        self.interval: timedelta = timedelta(hours=interval_hours)
+        self._thread: threading.Thread | None = None
+        self._updated: bool = False
+
+    def is_check_due(self) -> bool:
+        """更新チェックが必要か判定する.
+
+        最終チェック時刻が記録されていない場合や、記録が壊れている・未来の時刻である場合もTrueを返します。
+
+        Returns:
+            前回のチェックから間隔が経過している場合True.
+
+        """
+        try:
+            stamp = (self.cache_dir / SELF_UPDATE_CHECK_FILE).read_text().strip()
+            last_checked = datetime.fromisoformat(stamp)
+            elapsed = datetime.now(UTC) - last_checked
+        except (OSError, ValueError, TypeError):
+            return True
+        return not timedelta(0) <= elapsed < self.interval
+
+    def record_check(self) -> None:
+        """最終チェック時刻を記録する.
+
+        記録に失敗しても次回のチェックが行われるだけのため例外は送出しません。
+        """
+        with contextlib.suppress(OSError):
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / SELF_UPDATE_CHECK_FILE).write_text(datetime.now(UTC).isoformat())
+
+    def start_background_check(self) -> bool:
+        """必要な場合、バックグラウンドで更新チェックを開始する.
+
+        Returns:
+            チェックを開始した場合True. 間隔が経過していない場合False.
+
+        """
+        if not self.is_check_due():
+            self.logger.debug("sysupの更新チェックは間隔内のためスキップします")
+            return False
+
+        self._thread = threading.Thread(target=self._background_check, name="sysup-self-update", daemon=True)
+        self._thread.start()
+        return True
+
+    def _background_check(self) -> None:
+        """更新チェックを実行し、結果と最終チェック時刻を記録する."""
+        self._updated = self.update_self()
+        self.record_check()
+
+    def restart_if_updated(self, before_restart: Callable[[], None] | None = None) -> bool:
+        """バックグラウンドの更新チェックの完了を待ち、更新された場合は再実行する.
+
+        updaterモジュールの読み込みや更新の実行前など、再実行しても安全な時点で呼び出します。
+        チェックを開始していない場合は何もしません。
+
+        Args:
+            before_restart: 再実行の直前に呼び出す関数(ロックファイルの解放など).
+
+        Returns:
+            更新が実行された場合True（実際には再実行されるため戻らない）.
+
+        """
+        if self._thread is None:
+            return False
+
+        self._thread.join()
+        self._thread = None
+        if not self._updated:
+            return False
+
+        if before_restart is not None:
+            before_restart()
+        self.restart_self(RESTART_OPTIONS)  # この関数は戻らない
+        return True
 
     def update_self(self) -> bool:
         """sysup自身を更新する.
@@ -61,14 +151,19 @@ class SelfUpdater:
             self.logger.debug(f"sysup更新エラー: {e}")
             return False
 
-    def restart_self(self) -> None:
+    def restart_self(self, extra_args: Sequence[str] = ()) -> None:
         """更新後にsysupを再実行する.
 
         現在のプロセスを新しいバージョンで置き換えます。
         この関数は戻りません。
 
+        Args:
+            extra_args: 再実行時に追加するオプション. 既に指定されているものは追加しない.
+
         """
         self.logger.info("更新されたsysupで再実行中...")
+        args = sys.argv[1:]
+        args += [arg for arg in extra_args if arg not in args]
 
         # インストール済みのsysupコマンドを探す
         sysup_path = subprocess.run(
@@ -80,12 +175,12 @@ class SelfUpdater:
 
         if sysup_path:
             # インストール済みのsysupコマンドで再実行
-            os.execv(sysup_path, ["sysup", *sys.argv[1:]])
+            os.execv(sysup_path, ["sysup", *args])
         else:
             # フォールバック: Pythonモジュールとして実行
             os.execv(
                 sys.executable,
-                [sys.executable, "-m", "sysup.cli.cli", *sys.argv[1:]],
+                [sys.executable, "-m", "sysup.cli.cli", *args],
             )
 
     def check_and_update(self) -> bool:
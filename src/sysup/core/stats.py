@@ -4,12 +4,26 @@
 成功・失敗・スキップした更新の記録、実行時間の計測、統計サマリーの表示を行います。
 """
 
+import sqlite3
 import time
+from collections.abc import Generator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from rich.table import Table
+
+from .history import HistoryStore, RunRecord, StepRecord, UpdaterRecord
 from .logging import SysupLogger
+from .metrics import RunMetrics, write_metrics
+from .timing import Span, span
+
+# サマリーに表示する、時間のかかったステップの数
+SLOWEST_STEPS_LIMIT = 10
+
+# updaterの処理時間に含めるフェーズ. バックアップの完了待ちなどの待機時間は含めない
+UPDATER_WORK_PHASES = frozenset({"refresh", "plan", "apply", "post_update"})
 
 
 @dataclass
@@ -27,6 +41,7 @@ class UpdateStats:
         successful_updaters: 成功したupdaterのリスト.
         failed_updaters: 失敗したupdaterと理由の辞書.
         skipped_updaters: スキップしたupdaterと理由の辞書.
+        package_counts: updaterごとの更新したパッケージ数.
 
     """
 
@@ -38,6 +53,7 @@ class UpdateStats:
     successful_updaters: list[str] = field(default_factory=list)
     failed_updaters: dict[str, str] = field(default_factory=dict)
     skipped_updaters: dict[str, str] = field(default_factory=dict)
+    package_counts: dict[str, int] = field(default_factory=dict)
 
     def record_success(self, updater: str) -> None:
         """成功を記録する.
@@ -71,6 +87,16 @@ class UpdateStats:
         self.skipped_updaters[updater] = reason
         self.skip_count += 1
 
+    def record_packages(self, updater: str, count: int) -> None:
+        """更新したパッケージ数を記録する.
+
+        Args:
+            updater: updaterの名前.
+            count: 更新したパッケージ数.
+
+        """
+        self.package_counts[updater] = count
+
     def finish(self) -> None:
         """統計情報を完了する.
 
@@ -112,9 +138,12 @@ class StatsManager:
 
     更新処理の統計を収集・表示・保存するマネージャークラスです。
 
+    処理時間は、実行全体(run)を根とするスパンの階層(run → updater → フェーズ → コマンド)として記録します。
+
     Attributes:
         logger: ロガーインスタンス.
         stats: 統計情報を保持するUpdateStatsインスタンス.
+        run_span: 実行全体のスパン.
 
     """
 
@@ -127,6 +156,67 @@ class StatsManager:
         """
         self.logger: SysupLogger = logger
         self.stats: UpdateStats = UpdateStats()
+        self.run_span: Span = Span("run", "run")
+        self.run_span.start()
+
+    def record_packages(self, updater: str, count: int) -> None:
+        """更新したパッケージ数を記録する.
+
+        Args:
+            updater: updaterの名前.
+            count: 更新したパッケージ数.
+
+        """
+        self.stats.record_packages(updater, count)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "check") -> Generator[Span, None, None]:
+        """実行全体の直下にスパンを開始する.
+
+        システムチェックのような、updaterに属さない処理の計測に使用します。
+
+        Args:
+            name: スパン名.
+            kind: スパンの種類. デフォルトは"check".
+
+        Yields:
+            開始したスパン.
+
+        """
+        with span(name, kind, parent=self.run_span) as current:
+            yield current
+
+    def updater_span(self, updater: str) -> Span:
+        """updaterのフェーズをまとめるスパンを追加する.
+
+        Args:
+            updater: updaterの名前.
+
+        Returns:
+            updaterのスパン. フェーズのスパンは `timing.span(..., parent=...)` で子として開始する.
+
+        """
+        return self.run_span.child(updater, "updater")
+
+    def slowest_steps(self, limit: int = SLOWEST_STEPS_LIMIT) -> list[tuple[str, Span]]:
+        """処理時間の長いステップを返す.
+
+        子スパンを持たない末端のスパン(コマンド、コマンドを実行しないフェーズ、システムチェックなど)を対象とします。
+
+        Args:
+            limit: 返すステップの最大数.
+
+        Returns:
+            "apt › apply › sudo apt upgrade -y" のようなパスとスパンのタプルのリスト. 処理時間の降順.
+
+        """
+        steps = [
+            (" › ".join(path), step)
+            for path, step in self.run_span.walk()
+            if step.start_time is not None and step.is_leaf
+        ]
+        steps.sort(key=lambda item: item[1].duration, reverse=True)
+        return steps[:limit]
 
     def record_success(self, updater: str) -> None:
         """成功を記録する.
@@ -163,20 +253,23 @@ class StatsManager:
         更新処理の実行結果を整形してコンソールに表示します。
         """
         self.stats.finish()
+        self.run_span.finish()
 
         self.logger.section("更新サマリー")
 
+        durations = {name: f" ({duration:.1f}秒)" for name, duration in self._updater_durations().items()}
+
         # 成功した更新
         if self.stats.success_count > 0:
             self.logger.success(f"成功: {self.stats.success_count} 件")
             for updater in self.stats.successful_updaters:
-                self.logger.info(f"  ✓ {updater}")
+                self.logger.info(f"  ✓ {updater}{durations.get(updater, '')}")
 
         # 失敗した更新
         if self.stats.failure_count > 0:
             self.logger.error(f"失敗: {self.stats.failure_count} 件")
             for updater, reason in self.stats.failed_updaters.items():
-                self.logger.error(f"  ✗ {updater}: {reason}")
+                self.logger.error(f"  ✗ {updater}: {reason}{durations.get(updater, '')}")
 
         # スキップした更新
         if self.stats.skip_count > 0:
@@ -186,6 +279,7 @@ class StatsManager:
 
         # 実行時間
         self.logger.info(f"実行時間: {self.stats.duration_formatted}")
+        self._show_slowest_steps()
 
         # 総合結果
         total_count = self.stats.success_count + self.stats.failure_count
@@ -196,6 +290,20 @@ class StatsManager:
         else:
             self.logger.warning(f"{self.stats.failure_count} 件の更新で問題が発生しました")
 
+    def _show_slowest_steps(self) -> None:
+        """処理時間の長いステップを表形式で表示する."""
+        steps = self.slowest_steps()
+        if not steps:
+            return
+
+        table = Table(title="時間のかかったステップ")
+        table.add_column("ステップ", style="yellow", overflow="fold")
+        table.add_column("時間", justify="right")
+        table.add_column("終了コード", justify="right")
+        for path, step in steps:
+            table.add_row(path, f"{step.duration:.1f}秒", "" if step.exit_code is None else str(step.exit_code))
+        self.logger.console.print(table)
+
     def save_to_log(self, log_dir: Path) -> None:
         """統計情報をログファイルに保存する.
 
@@ -223,4 +331,116 @@ class StatsManager:
                 f.write(f"  SKIPPED: {updater} - {reason}\n")
 
             f.write(f"Duration: {int(self.stats.duration)} seconds\n")
+            steps = self.slowest_steps()
+            if steps:
+                f.write("Slowest steps:\n")
+                for path, step in steps:
+                    exit_code = "" if step.exit_code is None else f" (exit {step.exit_code})"
+                    f.write(f"  {step.duration:.1f}s {path}{exit_code}\n")
             f.write("\n")
+
+    def save_to_history(self, history: HistoryStore) -> None:
+        """実行結果を実行履歴に追記する.
+
+        updaterごとの結果・処理時間・パッケージ数と、システムチェック・フェーズ・コマンドの処理時間を記録します。
+        履歴は必須ではないため、書き込みに失敗しても警告のみで例外は送出しません。
+
+        Args:
+            history: 実行履歴ストア.
+
+        """
+        updaters = self._updater_records()
+
+        steps: list[StepRecord] = []
+        for top in list(self.run_span.children):
+            # updaterのスパンはフェーズをまとめるグループのため、その子孫のみを記録する
+            updater = top.name if top.kind == "updater" else None
+            descendants = [step for _path, step in top.walk()]
+            for step in descendants if updater is not None else [top, *descendants]:
+                start_time = step.start_time
+                if start_time is not None:
+                    steps.append(StepRecord(updater, step.kind, step.name, start_time, step.duration, step.exit_code))
+
+        run = RunRecord(
+            self.stats.start_time,
+            self.stats.duration,
+            self.stats.success_count,
+            self.stats.failure_count,
+            self.stats.skip_count,
+        )
+        try:
+            history.record_run(run, updaters, steps)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"実行履歴の保存に失敗しました: {e}")
+
+    def save_to_metrics(
+        self,
+        textfile: Path,
+        backup_duration: float | None = None,
+        reboot_required: bool | None = False,
+        completed: bool = True,
+    ) -> None:
+        """実行結果をPrometheusのテキスト形式のファイルに書き出す.
+
+        updaterごとの結果・処理時間・パッケージ数と、実行全体の処理時間、バックアップの所要時間、
+        最終成功時刻、再起動の要否を出力します。
+        メトリクスは必須ではないため、書き込みに失敗しても警告のみで例外は送出しません。
+
+        Args:
+            textfile: 出力するファイルのパス.
+            backup_duration: バックアップの所要時間(秒). バックアップしていない場合None.
+            reboot_required: 再起動が必要かどうか. 確認していない場合None.
+            completed: 更新まで実行したかどうか. Falseの場合は成功として扱わない.
+
+        """
+        run = RunMetrics(
+            finished_at=self.stats.end_time or time.time(),
+            duration=self.stats.duration,
+            updaters=self._updater_records(),
+            backup_duration=backup_duration,
+            reboot_required=reboot_required,
+            completed=completed,
+        )
+        try:
+            write_metrics(textfile, run)
+        except OSError as e:
+            self.logger.warning(f"メトリクスの書き出しに失敗しました: {e}")
+
+    def _updater_records(self) -> list[UpdaterRecord]:
+        """updaterごとの結果・処理時間・パッケージ数を返す.
+
+        Returns:
+            成功・失敗・スキップの順のupdaterの結果のリスト.
+
+        """
+        durations = self._updater_durations()
+
+        def updater_record(name: str, status: str, reason: str | None = None) -> UpdaterRecord:
+            return UpdaterRecord(name, status, reason, durations.get(name), self.stats.package_counts.get(name))
+
+        return [
+            *(updater_record(name, "success") for name in self.stats.successful_updaters),
+            *(updater_record(name, "failure", reason) for name, reason in self.stats.failed_updaters.items()),
+            *(updater_record(name, "skip", reason) for name, reason in self.stats.skipped_updaters.items()),
+        ]
+
+    def _updater_durations(self) -> dict[str, float]:
+        """updaterごとの処理時間を返す.
+
+        UPDATER_WORK_PHASESのフェーズの処理時間の合計です。
+        フェーズ間のスケジューラの待ち時間やバックアップの完了待ちは含めません。
+
+        Returns:
+            updater名をキーとした処理時間(秒). 処理時間に含めるフェーズを実行していないupdaterは含まない.
+
+        """
+        durations: dict[str, float] = {}
+        for child in self.run_span.children:
+            if child.kind != "updater":
+                continue
+            phases = [
+                phase for phase in child.children if phase.name in UPDATER_WORK_PHASES and phase.start_time is not None
+            ]
+            if phases:
+                durations[child.name] = sum(phase.duration for phase in phases)
+        return durations
@@ -0,0 +1,98 @@
+"""コマンドのタイムアウトの決定.
+
+このモジュールは、updaterが実行するコマンドのタイムアウトを、実行履歴に記録した
+コマンドごとの処理時間の分布から決定する機能を提供します。
+
+タイムアウトは処理時間の99パーセンタイルに係数を掛けた値を下限・上限の範囲に収めたものです。
+普段から時間のかかるコマンドは打ち切らないようにします。下限はデフォルトのタイムアウトと同じで、
+パッケージのインストール中にdpkgなどを打ち切らないよう、それより短くはしません。
+タイムアウトした実行は打ち切るまでの時間を処理時間の下限として扱うため、次回のタイムアウトは長くなります。
+"""
+
+from collections.abc import Mapping, Sequence
+
+from .history import percentile
+
+# 実行履歴がないコマンドのタイムアウト(秒)
+DEFAULT_COMMAND_TIMEOUT = 300.0
+
+# 処理時間の分布からタイムアウトを決定するのに必要な記録数
+MIN_SAMPLES = 5
+
+# タイムアウトの算出に使用するパーセンタイル
+TIMEOUT_PERCENTILE = 99
+
+
+class CommandTimeouts:
+    """updaterのコマンドのタイムアウト.
+
+    記録がMIN_SAMPLES件以上あるコマンドは、処理時間の99パーセンタイル × factorを
+    min_seconds〜max_secondsの範囲に収めた値をタイムアウトにします。
+    durationsにはタイムアウトした実行の打ち切りまでの時間も含めるため、タイムアウトしたコマンドの
+    次回のタイムアウトはその時間 × factor程度まで長くなります。
+    記録が少ないコマンドは、default_secondsと最長の処理時間 × factorの大きい方(上限max_seconds)を使用します。
+    fixedが指定されている場合は、実行履歴によらずすべてのコマンドにその値を使用します。
+
+    Attributes:
+        durations: コマンド(引数を空白で連結した文字列)をキーとした処理時間(秒)のリスト.
+        default_seconds: 実行履歴がないコマンドのタイムアウト(秒).
+        factor: 処理時間に掛ける係数.
+        min_seconds: タイムアウトの下限(秒).
+        max_seconds: タイムアウトの上限(秒).
+        fixed: 固定のタイムアウト(秒). Noneの場合は実行履歴から決定する.
+
+    Examples:
+        >>> timeouts = CommandTimeouts({"cargo install-update -a": [400.0, 500.0, 400.0, 500.0, 500.0]})
+        >>> timeouts.timeout_for(["cargo", "install-update", "-a"])
+        1500.0
+
+    """
+
+    def __init__(
+        self,
+        durations: Mapping[str, Sequence[float]],
+        *,
+        default_seconds: float = DEFAULT_COMMAND_TIMEOUT,
+        factor: float = 3.0,
+        min_seconds: float = DEFAULT_COMMAND_TIMEOUT,
+        max_seconds: float = 7200.0,
+        fixed: float | None = None,
+    ):
+        """CommandTimeoutsを初期化する.
+
+        Args:
+            durations: コマンドをキーとした処理時間(秒)のリスト.
+            default_seconds: 実行履歴がないコマンドのタイムアウト(秒). デフォルトは300.
+            factor: 処理時間に掛ける係数. デフォルトは3.
+            min_seconds: タイムアウトの下限(秒). デフォルトは300.
+            max_seconds: タイムアウトの上限(秒). デフォルトは7200.
+            fixed: 固定のタイムアウト(秒). デフォルトはNone(実行履歴から決定する).
+
+        """
+        self.durations: Mapping[str, Sequence[float]] = durations
+        self.default_seconds: float = default_seconds
+        self.factor: float = factor
+        self.min_seconds: float = min_seconds
+        self.max_seconds: float = max_seconds
+        self.fixed: float | None = fixed
+
+    def timeout_for(self, command: list[str]) -> float:
+        """コマンドのタイムアウトを返す.
+
+        Args:
+            command: 実行するコマンドのリスト.
+
+        Returns:
+            タイムアウト(秒).
+
+        """
+        if self.fixed is not None:
+            return self.fixed
+
+        samples = self.durations.get(" ".join(command), ())
+        if len(samples) >= MIN_SAMPLES:
+            expected = percentile(samples, TIMEOUT_PERCENTILE) or 0.0
+            return min(max(expected * self.factor, self.min_seconds), self.max_seconds)
+        # 記録が少ない間はデフォルトより短くしないが、実際にかかった時間よりは長くする
+        longest = max(samples, default=0.0)
+        return min(max(longest * self.factor, self.default_seconds), self.max_seconds)
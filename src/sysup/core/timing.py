@@ -0,0 +1,165 @@
+"""階層的な処理時間の計測.
+
+このモジュールは、sysupの実行(run)・updater・フェーズ・コマンドの処理時間を
+入れ子のスパンとして記録する機能を提供します。
+
+現在のスパンはContextVarで保持されるため、`span()` の内側で開始したスパンは自動的に子スパンになります。
+スレッドにはContextVarが引き継がれないため、TaskSchedulerはタスクの登録時のコンテキストで
+各タスクを実行します。
+"""
+
+import threading
+import time
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class Span:
+    """処理時間の計測範囲.
+
+    開始していないスパンは子スパンをまとめるグループとして扱い、
+    開始・終了時刻は子スパンの最初の開始時刻・最後の終了時刻になります。
+    refresh・applyのように別々のタスクで実行されるフェーズを、updaterごとにまとめるために使用します。
+
+    Attributes:
+        name: スパン名(updater名、フェーズ名、実行したコマンドなど).
+        kind: スパンの種類("run", "check", "updater", "phase", "command").
+        exit_code: コマンドの終了コード. コマンド以外、またはタイムアウトした場合はNone.
+        children: 子スパンのリスト.
+
+    """
+
+    def __init__(self, name: str, kind: str):
+        """Spanを初期化する.
+
+        Args:
+            name: スパン名.
+            kind: スパンの種類.
+
+        """
+        self.name: str = name
+        self.kind: str = kind
+        self.exit_code: int | None = None
+        self.children: list[Span] = []
+        self._start_time: float | None = None
+        self._end_time: float | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def child(self, name: str, kind: str) -> "Span":
+        """子スパンを追加する.
+
+        追加したスパンは開始されていないため、グループとして扱われます。
+        複数のスレッドから呼び出しても安全です。
+
+        Args:
+            name: スパン名.
+            kind: スパンの種類.
+
+        Returns:
+            追加したスパン.
+
+        """
+        span = Span(name, kind)
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    def start(self) -> None:
+        """計測を開始する."""
+        self._start_time = time.time()
+
+    def finish(self) -> None:
+        """計測を終了する."""
+        self._end_time = time.time()
+
+    @property
+    def start_time(self) -> float | None:
+        """開始時刻(Unix時刻). 開始していないグループで子スパンもない場合None."""
+        if self._start_time is not None:
+            return self._start_time
+        starts = [t for t in (child.start_time for child in self._snapshot()) if t is not None]
+        return min(starts, default=None)
+
+    @property
+    def end_time(self) -> float | None:
+        """終了時刻(Unix時刻). 実行中の場合None."""
+        if self._start_time is not None:
+            return self._end_time
+        ends = [child.end_time for child in self._snapshot() if child.start_time is not None]
+        if not ends or None in ends:
+            return None
+        return max(t for t in ends if t is not None)
+
+    @property
+    def duration(self) -> float:
+        """処理時間を秒単位で返す.
+
+        Returns:
+            開始から終了(実行中の場合は現在時刻)までの秒数. 開始していない場合は0.
+
+        """
+        start = self.start_time
+        if start is None:
+            return 0.0
+        return (self.end_time or time.time()) - start
+
+    @property
+    def is_leaf(self) -> bool:
+        """開始した子スパンがない場合True."""
+        return all(child.start_time is None for child in self._snapshot())
+
+    def walk(self) -> Iterator[tuple[tuple[str, ...], "Span"]]:
+        """子孫のスパンを深さ優先でたどる.
+
+        Yields:
+            このスパンからのパス(スパン名のタプル、自身を含まない)と子孫のスパン.
+
+        """
+        for child in self._snapshot():
+            yield (child.name,), child
+            for path, descendant in child.walk():
+                yield (child.name, *path), descendant
+
+    def _snapshot(self) -> list["Span"]:
+        """子スパンのリストのコピーを返す."""
+        with self._lock:
+            return list(self.children)
+
+
+_current_span: ContextVar[Span | None] = ContextVar("sysup_current_span", default=None)
+
+
+def current_span() -> Span | None:
+    """現在のスパンを返す.
+
+    Returns:
+        現在のコンテキストで実行中のスパン. ない場合None.
+
+    """
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str, parent: Span | None = None) -> Generator[Span, None, None]:
+    """スパンを開始し、ブロックの間は現在のスパンにする.
+
+    Args:
+        name: スパン名.
+        kind: スパンの種類.
+        parent: 親スパン. Noneの場合は現在のスパン. 現在のスパンもない場合はどこにも記録されない.
+
+    Yields:
+        開始したスパン.
+
+    """
+    if parent is None:
+        parent = _current_span.get()
+    current = parent.child(name, kind) if parent is not None else Span(name, kind)
+    current.start()
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_span.reset(token)
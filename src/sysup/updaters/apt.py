@@ -5,10 +5,15 @@ Debian/UbuntuシステムのAPT (Advanced Package Tool)パッケージマネー
 """
 
 import subprocess
+from pathlib import Path
 
 from .._typing_compat import override
+from ..core.dpkg import APT_LISTS_DIR, UpgradablePackage, upgradable_packages
 from ..core.platform import is_windows
-from .base import BaseUpdater
+from .base import BaseUpdater, latest_mtime
+
+# apt update成功時に更新されるタイムスタンプ(Debian/Ubuntuのapt設定による)
+APT_UPDATE_STAMP = Path("/var/lib/apt/periodic/update-success-stamp")
 
 
 class AptUpdater(BaseUpdater):
@@ -18,6 +23,9 @@ class AptUpdater(BaseUpdater):
     apt full-upgradeでシステムパッケージを更新します。
     """
 
+    # 更新可能なパッケージ(パッケージリストの読み込み結果). refresh()・apply()で破棄する
+    _upgradable: list[UpgradablePackage] | None = None
+
     @override
     def get_name(self) -> str:
         """updaterの名前を返す.
@@ -40,56 +48,138 @@ class AptUpdater(BaseUpdater):
             return False
         return self.command_exists("apt")
 
+    def _upgradable_packages(self) -> list[UpgradablePackage]:
+        """更新可能なパッケージを取得する.
+
+        dpkgのステータスファイルとすべてのパッケージリストを読み込むため、
+        結果はrefresh()・apply()でパッケージリストやインストール済みのパッケージが変わるまで再利用します。
+
+        Returns:
+            更新可能なパッケージのリスト.
+
+        Raises:
+            OSError: ステータスファイルまたはパッケージリストを読み込めない場合.
+            ValueError: パッケージリストの形式に対応していない場合.
+
+        """
+        if self._upgradable is None:
+            self._upgradable = upgradable_packages()
+        return self._upgradable
+
     @override
     def check_updates(self) -> int | None:
         """更新可能なパッケージ数を取得する.
 
+        `apt list --upgradable` を実行せず、dpkgのステータスファイルと
+        APTのパッケージリストをプロセス内で読み込んで求めます。
+
         Returns:
             更新可能なパッケージ数. 取得失敗時はNone.
 
         """
         try:
-            result = self.run_command(["apt", "list", "--upgradable"], check=False)
-            # ヘッダー行を除いた行数
-            lines = result.stdout.strip().split("\n")
-            return max(0, len(lines) - 1) if lines[0] else 0
-        except Exception:
+            return len(self._upgradable_packages())
+        except (OSError, ValueError):
             return None
 
     @override
-    def perform_update(self) -> bool:
-        """APT更新を実行する.
+    def download_size(self) -> int | None:
+        """更新で取得するパッケージの合計サイズを取得する.
+
+        パッケージリストに記載された、更新候補のパッケージファイルのサイズを合計します。
+
+        Returns:
+            合計サイズ(バイト). 取得失敗時、またはサイズが記載されていないパッケージがある場合はNone.
+
+        """
+        try:
+            sizes = [package.size for package in self._upgradable_packages()]
+        except (OSError, ValueError):
+            return None
+        if any(size is None for size in sizes):
+            return None
+        return sum(size for size in sizes if size is not None)
+
+    @override
+    def metadata_updated_at(self) -> float | None:
+        """パッケージリストの最終更新時刻を取得する.
+
+        パッケージリストのディレクトリと、apt update成功時のタイムスタンプの更新時刻のうち新しいものを返します。
+
+        Returns:
+            最終更新時刻(Unix時刻). 取得できない場合はNone.
+
+        """
+        return latest_mtime([APT_LISTS_DIR, APT_UPDATE_STAMP])
 
-        apt update, apt upgrade, apt autoremove, apt autocleanを実行します。
+    @override
+    def refresh(self) -> bool:
+        """APTパッケージリストを更新する.
+
+        apt updateを実行します。
 
         Returns:
             更新成功時True、失敗時False.
 
         """
         name = self.get_name()
-
-        if not self.is_available():
-            self.logger.info(f"{name} がインストールされていません - スキップ")
-            return True
+        self._upgradable = None
 
         try:
-            # パッケージリスト更新
             self.logger.info(f"{name} パッケージリストを更新中...")
             self.run_command(["sudo", "apt", "update"])
             self.logger.success(f"{name} パッケージリスト更新完了")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
 
-            # 更新可能パッケージ数確認
-            upgradable_count = self.check_updates() or 0
-            self.logger.info(f"更新可能パッケージ数: {upgradable_count}")
+    @override
+    def apply(self) -> bool:
+        """APT更新を適用する.
 
-            if upgradable_count > 0:
-                # パッケージアップグレード
-                self.logger.info(f"{name} パッケージをアップグレード中...")
-                self.run_command(["sudo", "apt", "upgrade", "-y"])
-                self.logger.success(f"{name} パッケージアップグレード完了")
-            else:
-                self.logger.info("更新可能パッケージがないため、アップグレードをスキップします")
+        apt upgradeを実行します。不要パッケージの削除とキャッシュの整理はpost_update()で行います。
+        更新可能なパッケージがない場合のスキップは、呼び出し側がplan()の結果で判断します。
+
+        Returns:
+            更新成功時True、失敗時False.
+
+        """
+        name = self.get_name()
+        self._upgradable = None
 
+        try:
+            # パッケージアップグレード
+            self.logger.info(f"{name} パッケージをアップグレード中...")
+            self.run_command(["sudo", "apt", "upgrade", "-y"])
+            self.logger.success(f"{name} パッケージアップグレード完了")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def post_update(self) -> bool:
+        """不要パッケージの削除とキャッシュの整理を行う.
+
+        apt autoremove, apt autocleanを実行します。
+        更新可能なパッケージがなくapply()を省略した場合にも実行されます。
+
+        Returns:
+            処理成功時True、失敗時False.
+
+        """
+        name = self.get_name()
+
+        try:
             # 不要パッケージ削除
             self.logger.info(f"{name} 不要なパッケージを削除中...")
             result = self.run_command(["sudo", "apt", "autoremove", "-y"], check=False)
@@ -104,9 +194,48 @@ class AptUpdater(BaseUpdater):
             self.logger.success(f"{name} 更新完了")
             return True
 
+        except Exception as e:
+            self.logger.error(f"{name} クリーンアップ中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def prefetch(self) -> bool:
+        """APT更新を事前にダウンロードする.
+
+        apt-get -d upgradeを実行し、パッケージをアーカイブキャッシュに取得します。
+
+        Returns:
+            ダウンロード成功時True、失敗時False.
+
+        """
+        name = self.get_name()
+
+        try:
+            self.logger.info(f"{name} パッケージをダウンロード中...")
+            # apt upgradeと同じく、依存関係で新たに必要になるパッケージも取得する
+            self.run_command(["sudo", "apt-get", "-d", "-y", "--with-new-pkgs", "upgrade"])
+            self.logger.success(f"{name} ダウンロード完了")
+            return True
+
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            self.logger.error(f"{name} ダウンロードで問題が発生しました: {e}")
             return False
         except Exception as e:
-            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            self.logger.error(f"{name} ダウンロード中に予期しないエラー: {e}")
             return False
+
+    @override
+    def perform_update(self) -> bool:
+        """APT更新を実行する.
+
+        パッケージリストの更新(refresh)、更新の適用(apply)、後処理(post_update)を続けて実行します。
+
+        Returns:
+            更新成功時True、失敗時False.
+
+        """
+        if not self.is_available():
+            self.logger.info(f"{self.get_name()} がインストールされていません - スキップ")
+            return True
+
+        return self.refresh() and self.apply() and self.post_update()
@@ -5,12 +5,37 @@
 必要なメソッドを実装します。
 """
 
+import os
+import shutil
 import subprocess
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from pathlib import Path
 
-from ..core.command import resolve_command
+from ..core.command import DEFAULT_OUTPUT_LIMIT, execute_command, resolve_command
 from ..core.logging import SysupLogger
-from ..core.platform import is_windows
+from ..core.probe import ProbeCache
+from ..core.timeouts import DEFAULT_COMMAND_TIMEOUT, CommandTimeouts
+from ..core.timing import span
+
+
+def latest_mtime(paths: Iterable[Path]) -> float | None:
+    """ファイルの更新時刻のうち最新のものを返す.
+
+    Args:
+        paths: 対象のパス. 存在しないパスは無視する.
+
+    Returns:
+        最新の更新時刻(Unix時刻). いずれも存在しない場合None.
+
+    """
+    mtimes: list[float] = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            continue
+    return max(mtimes, default=None)
 
 
 class BaseUpdater(ABC):
@@ -22,19 +47,24 @@ class BaseUpdater(ABC):
     Attributes:
         logger: ロガーインスタンス.
         dry_run: ドライランモードフラグ. Trueの場合、実際のコマンドは実行されない.
+        probe_cache: コマンド利用可否のプローブキャッシュ. Noneの場合はキャッシュしない.
+        command_timeouts: コマンドのタイムアウト. Noneの場合はすべてのコマンドで300秒.
 
     """
 
-    def __init__(self, logger: SysupLogger, dry_run: bool = False):
+    def __init__(self, logger: SysupLogger, dry_run: bool = False, probe_cache: ProbeCache | None = None):
         """BaseUpdaterを初期化する.
 
         Args:
             logger: ロガーインスタンス.
             dry_run: ドライランモード. デフォルトはFalse.
+            probe_cache: コマンド利用可否のプローブキャッシュ. デフォルトはNone(キャッシュしない).
 
         """
         self.logger: SysupLogger = logger
         self.dry_run: bool = dry_run
+        self.probe_cache: ProbeCache | None = probe_cache
+        self.command_timeouts: CommandTimeouts | None = None
 
     @abstractmethod
     def get_name(self) -> str:
@@ -82,6 +112,80 @@ class BaseUpdater(ABC):
         """
         return None
 
+    def metadata_updated_at(self) -> float | None:
+        """パッケージメタデータの最終更新時刻を返す.
+
+        refresh()を持つupdaterで実装すると、`general.metadata_max_age` の設定に従い、
+        メタデータが新しい場合にrefreshフェーズがスキップされます。
+
+        Returns:
+            最終更新時刻(Unix時刻). 不明な場合はNone.
+
+        """
+        return None
+
+    def download_size(self) -> int | None:
+        """更新で取得するパッケージの合計サイズを返す.
+
+        このメソッドはオプションであり、実装しなくても構いません。
+        `sysup plan` の表示に使用されます。
+
+        Returns:
+            合計サイズ(バイト). 不明な場合はNone.
+
+        """
+        return None
+
+    def refresh(self) -> bool:
+        """パッケージメタデータを更新する(refreshフェーズ).
+
+        `apt update` や `brew update` のような、アップグレード前のメタデータ更新を行います。
+        ネットワーク待ちが主であるため、すべてのupdaterのrefreshは並行して実行されます。
+        メタデータ更新を持たないupdaterはオーバーライド不要です。
+
+        Returns:
+            更新成功時True、失敗時False.
+
+        """
+        return True
+
+    def plan(self) -> int | None:
+        """適用予定の更新数を求める(planフェーズ).
+
+        デフォルトではcheck_updates()の結果を返します。
+        `sysup update` は、0を返したupdaterのapply()を実行しません。
+
+        Returns:
+            更新可能なパッケージ数. 不明な場合はNone.
+
+        """
+        return self.check_updates()
+
+    def apply(self) -> bool:
+        """更新を適用する(applyフェーズ).
+
+        refreshフェーズの完了後に呼ばれます。
+        デフォルトではperform_update()を実行します。
+        refresh()をオーバーライドするupdaterは、メタデータ更新以外の処理をここで行います。
+
+        Returns:
+            更新成功時True、失敗時False.
+
+        """
+        return self.perform_update()
+
+    def prefetch(self) -> bool:
+        """更新するパッケージを事前にダウンロードする(インストールはしない).
+
+        `sysup prefetch` から、refreshフェーズの完了後に呼ばれます。
+        ダウンロードのみを行う手段を持たないupdaterはオーバーライド不要です。
+
+        Returns:
+            ダウンロード成功時True、失敗時False.
+
+        """
+        return True
+
     def pre_update(self) -> bool:
         """更新前処理を実行する.
 
@@ -97,6 +201,8 @@ class BaseUpdater(ABC):
         """更新後処理を実行する.
 
         このメソッドはオプションであり、必要に応じてオーバーライドできます。
+        `sysup update` は、apply()の完了後と、plan()が0を返してapply()を省略した場合に呼び出します。
+        不要パッケージの削除やキャッシュの整理など、更新の有無によらず行う処理に使用します。
 
         Returns:
             後処理成功時True、失敗時False.
@@ -105,16 +211,23 @@ class BaseUpdater(ABC):
         return True
 
     def run_command(
-        self, command: list[str], check: bool = True, timeout: int = 300
+        self, command: list[str], check: bool = True, timeout: float | None = None, capture_output: bool = False
     ) -> subprocess.CompletedProcess[str]:
         """コマンドを実行するヘルパーメソッド.
 
         dry_runモードの場合、実際にはコマンドを実行せずログに出力するのみです。
+        コマンドはasyncioベースの実行エンジン(execute_command)で実行され、
+        タイムアウト時はプロセスグループごと終了します。
+        実行時間と終了コードは、現在のスパン(sysup.core.timing)の子スパンとして記録されます。
+        出力は到着した行から順にコンソールとログファイルへ出力されます。
+        capture_outputがTrueの場合、出力はログファイルにのみ記録されます。
 
         Args:
             command: 実行するコマンドのリスト.
             check: コマンド失敗時に例外を発生させるかどうか. デフォルトはTrue.
-            timeout: タイムアウト秒数. デフォルトは300秒.
+            timeout: タイムアウト秒数. Noneの場合はcommand_timeoutsから決定する(未設定の場合は300秒).
+            capture_output: 出力をすべて保持するかどうか. 出力を解析する場合にTrueを指定する.
+                Falseの場合、結果には出力の末尾(エラー報告用)のみが保持される.
 
         Returns:
             コマンド実行結果のCompletedProcessオブジェクト.
@@ -125,31 +238,56 @@ class BaseUpdater(ABC):
 
         """
         command = resolve_command(command)
+        if timeout is None:
+            timeout = (
+                self.command_timeouts.timeout_for(command)
+                if self.command_timeouts is not None
+                else DEFAULT_COMMAND_TIMEOUT
+            )
 
-        self.logger.debug(f"実行コマンド: {' '.join(command)}")
+        self.logger.debug(f"実行コマンド: {' '.join(command)} (タイムアウト {timeout:.0f}秒)")
 
         if self.dry_run:
             self.logger.info(f"[DRY RUN] {' '.join(command)}")
             return subprocess.CompletedProcess(command, 0, "", "")
 
-        try:
-            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout, check=check)
-            if result.stdout:
-                self.logger.debug(f"標準出力: {result.stdout.strip()}")
-            if result.stderr:
-                self.logger.debug(f"標準エラー: {result.stderr.strip()}")
+        name = self.get_name()
+
+        # 解析のために出力を取得するコマンド(更新数の確認など)の出力はコンソールに表示しない
+        def on_output(line: str) -> None:
+            if capture_output:
+                self.logger.log_command_output(name, line)
+            else:
+                self.logger.command_output(name, line)
+
+        # 実行時間と終了コードを、実行中のフェーズのスパンの子として記録する
+        with span(" ".join(command), "command") as command_span:
+            try:
+                result = execute_command(
+                    command,
+                    timeout=timeout,
+                    check=check,
+                    on_stdout=on_output,
+                    on_stderr=on_output,
+                    output_limit=None if capture_output else DEFAULT_OUTPUT_LIMIT,
+                )
+            except subprocess.CalledProcessError as e:
+                command_span.exit_code = e.returncode
+                self.logger.error(f"コマンド実行エラー: {' '.join(command)}")
+                self.logger.error(f"エラー出力: {e.stderr or e.output}")  # type: ignore
+                raise
+            except subprocess.TimeoutExpired:
+                self.logger.error(f"コマンドタイムアウト({timeout:.0f}秒): {' '.join(command)}")
+                raise
+            command_span.exit_code = result.returncode
             return result
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"コマンド実行エラー: {' '.join(command)}")
-            self.logger.error(f"エラー出力: {e.stderr}")  # type: ignore
-            raise
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"コマンドタイムアウト: {' '.join(command)}")
-            raise
 
     def command_exists(self, command: str) -> bool:
         """コマンドが存在するかチェックする.
 
+        `shutil.which` でプロセス内で探索します。probe_cacheが設定されている場合は
+        キャッシュされた結果を使用します。
+
         Args:
             command: チェックするコマンド名.
 
@@ -158,10 +296,26 @@ class BaseUpdater(ABC):
 
         """
         try:
-            if is_windows():
-                result = subprocess.run(["where", command], capture_output=True, timeout=5)
-            else:
-                result = subprocess.run(["which", command], capture_output=True, timeout=5)
-            return result.returncode == 0
+            if self.probe_cache is not None:
+                return self.probe_cache.which(command) is not None
+            return shutil.which(command) is not None
         except Exception:
             return False
+
+    def cached_probe(self, name: str, func: Callable[[], bool], watch: Iterable[Path] = ()) -> bool:
+        """コマンド探索以外の方法で行う利用可否の判定をキャッシュする.
+
+        probe_cacheが設定されていない場合は毎回funcを呼び出します。
+
+        Args:
+            name: プローブ名.
+            func: 利用可否を判定する関数.
+            watch: 更新時刻を監視するファイル. いずれかが変わった場合に再判定する.
+
+        Returns:
+            funcの戻り値(またはキャッシュされた値).
+
+        """
+        if self.probe_cache is None:
+            return func()
+        return self.probe_cache.probe(name, func, watch)
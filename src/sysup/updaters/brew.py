@@ -1,9 +1,12 @@
 """Homebrewパッケージマネージャupdater."""
 
+import os
+import shutil
 import subprocess
+from pathlib import Path
 
 from .._typing_compat import override
-from .base import BaseUpdater
+from .base import BaseUpdater, latest_mtime
 
 
 class BrewUpdater(BaseUpdater):
@@ -23,7 +26,7 @@ class BrewUpdater(BaseUpdater):
     def check_updates(self) -> int | None:
         """更新可能なパッケージ数を取得."""
         try:
-            result = self.run_command(["brew", "outdated", "--quiet"], check=False)
+            result = self.run_command(["brew", "outdated", "--quiet"], check=False, capture_output=True)
             if result.returncode == 0:
                 lines = [line for line in result.stdout.strip().split("\n") if line]
                 return len(lines)
@@ -31,33 +34,69 @@ class BrewUpdater(BaseUpdater):
         except Exception:
             return None
 
+    def _repository(self) -> Path | None:
+        """Homebrewのリポジトリのパスを取得."""
+        repository = os.environ.get("HOMEBREW_REPOSITORY")
+        if repository:
+            return Path(repository)
+
+        brew = self.probe_cache.which("brew") if self.probe_cache is not None else shutil.which("brew")
+        if brew is None:
+            return None
+        # brewコマンドはリポジトリ内のbin/brew(またはそのシンボリックリンク)
+        return Path(brew).resolve().parent.parent
+
     @override
-    def perform_update(self) -> bool:
-        """Homebrew更新実行."""
-        name = self.get_name()
+    def metadata_updated_at(self) -> float | None:
+        """Homebrewのメタデータの最終更新時刻を取得(リポジトリのFETCH_HEADの更新時刻)."""
+        repository = self._repository()
+        if repository is None:
+            return None
+        return latest_mtime([repository / ".git" / "FETCH_HEAD"])
 
-        if not self.is_available():
-            self.logger.info(f"{name} がインストールされていません - スキップ")
-            return True
+    @override
+    def refresh(self) -> bool:
+        """Homebrewパッケージリスト更新."""
+        name = self.get_name()
 
         try:
-            # パッケージリスト更新
             self.logger.info(f"{name} パッケージリストを更新中...")
             self.run_command(["brew", "update"])
             self.logger.success(f"{name} パッケージリスト更新完了")
+            return True
 
-            # 更新可能パッケージ数確認
-            outdated_count = self.check_updates() or 0
-            self.logger.info(f"更新可能な{name}パッケージ: {outdated_count} 個")
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
 
-            if outdated_count > 0:
-                # パッケージアップグレード
-                self.logger.info(f"{name} パッケージをアップグレード中...")
-                self.run_command(["brew", "upgrade"])
-                self.logger.success(f"{name} アップグレード完了")
-            else:
-                self.logger.info(f"すべての{name}パッケージが最新です")
+    @override
+    def apply(self) -> bool:
+        """Homebrew更新適用."""
+        name = self.get_name()
 
+        try:
+            # パッケージアップグレード
+            self.logger.info(f"{name} パッケージをアップグレード中...")
+            self.run_command(["brew", "upgrade"])
+            self.logger.success(f"{name} アップグレード完了")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def post_update(self) -> bool:
+        """古いバージョンとキャッシュを削除(更新がない場合も実行)."""
+        name = self.get_name()
+
+        try:
             # クリーンアップ
             self.logger.info(f"{name} クリーンアップ中...")
             self.run_command(["brew", "cleanup"], check=False)
@@ -65,9 +104,38 @@ class BrewUpdater(BaseUpdater):
             self.logger.success(f"{name} 更新完了")
             return True
 
+        except Exception as e:
+            self.logger.error(f"{name} クリーンアップ中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def prefetch(self) -> bool:
+        """更新可能なformulaを事前にダウンロード."""
+        name = self.get_name()
+
+        try:
+            result = self.run_command(["brew", "outdated", "--formula", "--quiet"], capture_output=True)
+            formulae = result.stdout.split()
+            if not formulae:
+                return True
+
+            self.logger.info(f"{name} パッケージをダウンロード中...")
+            self.run_command(["brew", "fetch", *formulae])
+            self.logger.success(f"{name} ダウンロード完了")
+            return True
+
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            self.logger.error(f"{name} ダウンロードで問題が発生しました: {e}")
             return False
         except Exception as e:
-            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            self.logger.error(f"{name} ダウンロード中に予期しないエラー: {e}")
             return False
+
+    @override
+    def perform_update(self) -> bool:
+        """Homebrew更新実行."""
+        if not self.is_available():
+            self.logger.info(f"{self.get_name()} がインストールされていません - スキップ")
+            return True
+
+        return self.refresh() and self.apply() and self.post_update()
@@ -20,6 +20,21 @@ class CargoUpdater(BaseUpdater):
         # cargoが存在すればOK（cargo-install-updateは後でチェック）
         return self.command_exists("cargo")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得."""
+        if not self.command_exists("cargo-install-update"):
+            return None
+
+        try:
+            result = self.run_command(["cargo", "install-update", "--list"], check=False, capture_output=True)
+            if result.returncode == 0:
+                # 表の最終列("Needs update")がYesの行を数える
+                return sum(1 for line in result.stdout.splitlines() if line.split()[-1:] == ["Yes"])
+            return None
+        except Exception:
+            return None
+
     @override
     def perform_update(self) -> bool:
         """Cargo更新実行."""
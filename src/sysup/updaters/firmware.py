@@ -1,10 +1,15 @@
 """ファームウェア更新updater."""
 
+import json
 import subprocess
+from pathlib import Path
 
 from .._typing_compat import override
 from ..core.platform import is_windows
-from .base import BaseUpdater
+from .base import BaseUpdater, latest_mtime
+
+# fwupdがリモートごとのメタデータを保存するディレクトリ
+FWUPD_REMOTES_DIR = Path("/var/lib/fwupd/remotes.d")
 
 
 class FirmwareUpdater(BaseUpdater):
@@ -23,20 +28,48 @@ class FirmwareUpdater(BaseUpdater):
         return self.command_exists("fwupdmgr")
 
     @override
-    def perform_update(self) -> bool:
-        """ファームウェア更新実行."""
-        name = self.get_name()
+    def check_updates(self) -> int | None:
+        """更新可能なデバイス数を取得."""
+        try:
+            result = self.run_command(["fwupdmgr", "get-updates", "--json"], check=False, capture_output=True)
+            # 更新がない場合、終了コードは2になる
+            if result.returncode == 2:
+                return 0
+            if result.returncode == 0:
+                devices = json.loads(result.stdout).get("Devices", [])
+                return len(devices)
+            return None
+        except Exception:
+            return None
 
-        if not self.is_available():
-            self.logger.info(f"{name} (fwupdmgr) がインストールされていません - スキップ")
-            return True
+    @override
+    def metadata_updated_at(self) -> float | None:
+        """ファームウェアメタデータの最終更新時刻を取得."""
+        try:
+            return latest_mtime(path for path in FWUPD_REMOTES_DIR.glob("*/*") if path.is_file())
+        except OSError:
+            return None
+
+    @override
+    def refresh(self) -> bool:
+        """ファームウェアメタデータ更新."""
+        name = self.get_name()
 
         try:
-            # メタデータ更新
             self.logger.info(f"{name} メタデータを更新中...")
             self.run_command(["fwupdmgr", "refresh"], check=False)
+            return True
 
-            # ファームウェア更新
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def apply(self) -> bool:
+        """ファームウェア更新適用."""
+        name = self.get_name()
+
+        try:
             self.logger.info(f"{name} を確認中...")
             result = self.run_command(["fwupdmgr", "update", "-y"], check=False)
 
@@ -53,3 +86,12 @@ class FirmwareUpdater(BaseUpdater):
         except Exception as e:
             self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
             return False
+
+    @override
+    def perform_update(self) -> bool:
+        """ファームウェア更新実行."""
+        if not self.is_available():
+            self.logger.info(f"{self.get_name()} (fwupdmgr) がインストールされていません - スキップ")
+            return True
+
+        return self.refresh() and self.apply()
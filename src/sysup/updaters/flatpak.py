@@ -22,6 +22,37 @@ class FlatpakUpdater(BaseUpdater):
             return False
         return self.command_exists("flatpak")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得."""
+        try:
+            result = self.run_command(
+                ["flatpak", "remote-ls", "--updates", "--columns=application"], check=False, capture_output=True
+            )
+            if result.returncode == 0:
+                return sum(1 for line in result.stdout.splitlines() if line.strip())
+            return None
+        except Exception:
+            return None
+
+    @override
+    def prefetch(self) -> bool:
+        """Flatpak更新を事前にダウンロード(デプロイはしない)."""
+        name = self.get_name()
+
+        try:
+            self.logger.info(f"{name} パッケージをダウンロード中...")
+            self.run_command(["flatpak", "update", "-y", "--no-deploy"])
+            self.logger.success(f"{name} ダウンロード完了")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            self.logger.warning(f"{name} ダウンロードで問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} ダウンロード中に予期しないエラー: {e}")
+            return False
+
     @override
     def perform_update(self) -> bool:
         """Flatpak更新実行."""
@@ -19,6 +19,21 @@ class GemUpdater(BaseUpdater):
         """Gemが利用可能かチェック."""
         return self.command_exists("gem")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得."""
+        try:
+            from ..core.platform import is_windows
+
+            gem_cmd = "gem.cmd" if is_windows() else "gem"
+            result = self.run_command([gem_cmd, "outdated"], check=False, capture_output=True)
+            if result.returncode == 0:
+                # 各行は "名前 (インストール済み < 最新)" の形式
+                return sum(1 for line in result.stdout.splitlines() if " < " in line)
+            return None
+        except Exception:
+            return None
+
     @override
     def perform_update(self) -> bool:
         """Gem更新実行."""
@@ -1,5 +1,6 @@
 """npmグローバルパッケージupdater."""
 
+import json
 import subprocess
 
 from .._typing_compat import override
@@ -20,6 +21,20 @@ class NpmUpdater(BaseUpdater):
         """npmが利用可能かチェック."""
         return self.command_exists("npm")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得."""
+        try:
+            npm_cmd = "npm.cmd" if is_windows() else "npm"
+            # 更新可能なパッケージがある場合、終了コードは1になる
+            result = self.run_command([npm_cmd, "outdated", "-g", "--json"], check=False, capture_output=True)
+            outdated = json.loads(result.stdout or "{}")
+            if not isinstance(outdated, dict) or "error" in outdated:
+                return None
+            return len(outdated)  # pyright: ignore[reportUnknownArgumentType]
+        except Exception:
+            return None
+
     @override
     def perform_update(self) -> bool:
         """npm更新実行."""
@@ -18,6 +18,11 @@ class NvmUpdater(BaseUpdater):
     @override
     def is_available(self) -> bool:
         """nvmが利用可能かチェック."""
+        # bashの起動は遅いため、nvm.shの更新時刻が変わるまで結果をキャッシュ
+        return self.cached_probe("nvm", self._probe_nvm, watch=(Path.home() / ".nvm" / "nvm.sh",))
+
+    def _probe_nvm(self) -> bool:
+        """bashでnvm.shを読み込み、nvmが利用可能か確認する."""
         # nvmはシェル関数なので、bashシェル経由で確認
         try:
             result = subprocess.run(
@@ -1,5 +1,6 @@
 """pnpmグローバルパッケージupdater."""
 
+import json
 import subprocess
 
 from .._typing_compat import override
@@ -20,6 +21,22 @@ class PnpmUpdater(BaseUpdater):
         """pnpmが利用可能かチェック."""
         return self.command_exists("pnpm")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得."""
+        try:
+            pnpm_cmd = "pnpm.cmd" if is_windows() else "pnpm"
+            # 更新可能なパッケージがある場合、終了コードは1になる
+            result = self.run_command(
+                [pnpm_cmd, "outdated", "-g", "--format", "json"], check=False, capture_output=True
+            )
+            outdated = json.loads(result.stdout or "{}")
+            if not isinstance(outdated, (dict, list)):
+                return None
+            return len(outdated)  # pyright: ignore[reportUnknownArgumentType]
+        except Exception:
+            return None
+
     @override
     def perform_update(self) -> bool:
         """pnpm更新実行."""
@@ -0,0 +1,281 @@
+"""Updaterレジストリ.
+
+このモジュールは各updaterのメタデータ(対応プラットフォーム、sudoの要否、
+リソースクラス、依存関係)を、updaterモジュールをimportせずに参照できる形で定義します。
+updaterクラスは実際に使用する時点で初めてimportされます。
+
+サードパーティのupdaterは、エントリーポイントグループ `sysup.updaters` に
+UpdaterSpecオブジェクトを登録することで追加できます::
+
+    # pyproject.toml
+    [project.entry-points."sysup.updaters"]
+    example = "sysup_example.spec:SPEC"
+
+    # sysup_example/spec.py (updater本体をimportしない軽量なモジュール)
+    SPEC = UpdaterSpec(
+        name="example",
+        target="sysup_example.updater:ExampleUpdater",
+        display_name="Example",
+    )
+
+プラグインのupdaterは、設定ファイルの `[updaters]` で明示的に有効化した場合のみ実行されます。
+"""
+
+import importlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import TYPE_CHECKING
+
+from ..core.platform import get_platform
+from ..core.scheduler import ResourceClass
+
+if TYPE_CHECKING:
+    from ..core.logging import SysupLogger
+    from ..core.probe import ProbeCache
+    from .base import BaseUpdater
+
+# サードパーティupdaterを登録するエントリーポイントグループ
+ENTRY_POINT_GROUP = "sysup.updaters"
+
+# Unix系(Linux/macOS)向けupdaterの対応プラットフォーム
+_UNIX = frozenset({"Linux", "Darwin"})
+
+
+@dataclass(frozen=True)
+class UpdaterSpec:
+    """Updaterのメタデータ.
+
+    Attributes:
+        name: updater名. 設定ファイルの `[updaters]` のキーとして使用される.
+        target: updaterクラスの参照("モジュール名:クラス名").
+        display_name: 表示名.
+        platforms: 対応プラットフォーム(platform.system()の値). 空の場合はすべてのプラットフォーム.
+        requires_sudo: 更新にsudo権限が必要かどうか.
+        resources: 更新時に使用するリソースクラス. 並列更新時の同時実行数の制限に使用される.
+        dependencies: 先に更新を完了している必要があるupdater名(例: ("rustup",)).
+        estimated_seconds: 更新がある場合の予想所要時間(秒). `sysup plan` の表示に使用される.
+            Noneの場合は不明.
+        system_updates: OSのパッケージ(セキュリティ更新を含む)を更新するかどうか.
+            `sysup update --budget` で優先して選択される.
+
+    """
+
+    name: str
+    target: str
+    display_name: str
+    platforms: frozenset[str] = frozenset()
+    requires_sudo: bool = False
+    resources: frozenset[ResourceClass] = frozenset()
+    dependencies: tuple[str, ...] = ()
+    estimated_seconds: float | None = None
+    system_updates: bool = False
+
+    def is_supported(self) -> bool:
+        """現在のプラットフォームに対応しているか判定する.
+
+        Returns:
+            対応している場合True.
+
+        """
+        return not self.platforms or get_platform() in self.platforms
+
+    def load(self) -> "type[BaseUpdater]":
+        """updaterクラスをimportする.
+
+        Returns:
+            updaterクラス.
+
+        Raises:
+            ImportError: モジュールのimportに失敗した場合.
+            AttributeError: クラスが見つからない場合.
+
+        """
+        module_name, _, class_name = self.target.partition(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+
+    def create(
+        self, logger: "SysupLogger", dry_run: bool = False, probe_cache: "ProbeCache | None" = None
+    ) -> "BaseUpdater":
+        """updaterのインスタンスを生成する.
+
+        Args:
+            logger: ロガーインスタンス.
+            dry_run: ドライランモード.
+            probe_cache: コマンド利用可否のプローブキャッシュ.
+
+        Returns:
+            updaterインスタンス.
+
+        """
+        return self.load()(logger, dry_run, probe_cache)
+
+
+BUILTIN_UPDATERS: tuple[UpdaterSpec, ...] = (
+    UpdaterSpec(
+        "apt",
+        "sysup.updaters.apt:AptUpdater",
+        "APT",
+        platforms=_UNIX,
+        requires_sudo=True,
+        resources=frozenset({ResourceClass.SYSTEM_LOCK, ResourceClass.NETWORK, ResourceClass.DISK}),
+        estimated_seconds=120,
+        system_updates=True,
+    ),
+    UpdaterSpec(
+        "snap",
+        "sysup.updaters.snap:SnapUpdater",
+        "Snap",
+        platforms=_UNIX,
+        requires_sudo=True,
+        resources=frozenset({ResourceClass.SYSTEM_LOCK, ResourceClass.NETWORK}),
+        estimated_seconds=60,
+        system_updates=True,
+    ),
+    UpdaterSpec(
+        "brew",
+        "sysup.updaters.brew:BrewUpdater",
+        "Homebrew",
+        resources=frozenset({ResourceClass.NETWORK, ResourceClass.DISK}),
+        estimated_seconds=180,
+        system_updates=True,
+    ),
+    UpdaterSpec(
+        "scoop",
+        "sysup.updaters.scoop:ScoopUpdater",
+        "Scoop",
+        platforms=frozenset({"Windows"}),
+        resources=frozenset({ResourceClass.NETWORK, ResourceClass.DISK}),
+        estimated_seconds=120,
+        system_updates=True,
+    ),
+    UpdaterSpec(
+        "npm",
+        "sysup.updaters.npm:NpmUpdater",
+        "npm",
+        resources=frozenset({ResourceClass.NETWORK}),
+        dependencies=("nvm",),
+        estimated_seconds=30,
+    ),
+    UpdaterSpec(
+        "pnpm",
+        "sysup.updaters.pnpm:PnpmUpdater",
+        "pnpm",
+        resources=frozenset({ResourceClass.NETWORK}),
+        dependencies=("nvm",),
+        estimated_seconds=30,
+    ),
+    UpdaterSpec(
+        "pipx",
+        "sysup.updaters.pipx:PipxUpdater",
+        "pipx",
+        resources=frozenset({ResourceClass.NETWORK}),
+        estimated_seconds=30,
+    ),
+    UpdaterSpec(
+        "uv",
+        "sysup.updaters.uv:UvUpdater",
+        "uv tool",
+        resources=frozenset({ResourceClass.NETWORK}),
+        estimated_seconds=20,
+    ),
+    UpdaterSpec(
+        "rustup",
+        "sysup.updaters.rustup:RustupUpdater",
+        "Rustup",
+        resources=frozenset({ResourceClass.NETWORK, ResourceClass.DISK}),
+        estimated_seconds=90,
+    ),
+    UpdaterSpec(
+        "cargo",
+        "sysup.updaters.cargo:CargoUpdater",
+        "Cargo",
+        resources=frozenset({ResourceClass.CPU, ResourceClass.NETWORK}),
+        dependencies=("rustup",),
+        estimated_seconds=300,
+    ),
+    UpdaterSpec(
+        "flatpak",
+        "sysup.updaters.flatpak:FlatpakUpdater",
+        "Flatpak",
+        platforms=_UNIX,
+        resources=frozenset({ResourceClass.NETWORK, ResourceClass.DISK}),
+        estimated_seconds=90,
+    ),
+    UpdaterSpec(
+        "gem",
+        "sysup.updaters.gem:GemUpdater",
+        "Gem",
+        resources=frozenset({ResourceClass.NETWORK}),
+        estimated_seconds=60,
+    ),
+    UpdaterSpec(
+        "nvm",
+        "sysup.updaters.nvm:NvmUpdater",
+        "nvm",
+        resources=frozenset({ResourceClass.NETWORK}),
+        estimated_seconds=10,
+    ),
+    UpdaterSpec(
+        "firmware",
+        "sysup.updaters.firmware:FirmwareUpdater",
+        "Firmware",
+        platforms=_UNIX,
+        requires_sudo=True,
+        resources=frozenset({ResourceClass.SYSTEM_LOCK, ResourceClass.NETWORK}),
+        estimated_seconds=120,
+        system_updates=True,
+    ),
+)
+
+
+def load_plugin_specs(on_error: Callable[[str, Exception], None] | None = None) -> list[UpdaterSpec]:
+    """エントリーポイントに登録されたサードパーティupdaterのメタデータを読み込む.
+
+    読み込みに失敗したプラグインや、UpdaterSpec以外を登録しているプラグインは無視されます。
+
+    Args:
+        on_error: プラグインの読み込みに失敗した場合に、エントリーポイント名と例外を受け取るコールバック.
+
+    Returns:
+        UpdaterSpecのリスト.
+
+    """
+    specs: list[UpdaterSpec] = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            spec = entry_point.load()
+            if not isinstance(spec, UpdaterSpec):
+                raise TypeError(f"UpdaterSpecではありません: {entry_point.value}")
+        except Exception as e:
+            if on_error:
+                on_error(entry_point.name, e)
+            continue
+        specs.append(spec)
+    return specs
+
+
+def get_updater_specs(on_error: Callable[[str, Exception], None] | None = None) -> list[UpdaterSpec]:
+    """組み込みupdaterとサードパーティupdaterのメタデータを返す.
+
+    サードパーティupdaterの名前が組み込みupdaterや他のプラグインと重複する場合、
+    先に登録されたものを優先します。
+
+    Args:
+        on_error: プラグインの読み込みに失敗した場合に、名前と例外を受け取るコールバック.
+
+    Returns:
+        組み込みupdater(定義順)、サードパーティupdaterの順に並んだUpdaterSpecのリスト.
+
+    """
+    specs = list(BUILTIN_UPDATERS)
+    names = {spec.name for spec in specs}
+    for spec in load_plugin_specs(on_error):
+        if spec.name in names:
+            if on_error:
+                on_error(spec.name, ValueError(f"updater名が重複しています: {spec.name}"))
+            continue
+        names.add(spec.name)
+        specs.append(spec)
+    return specs
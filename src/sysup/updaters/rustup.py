@@ -19,6 +19,18 @@ class RustupUpdater(BaseUpdater):
         """Rustupが利用可能かチェック."""
         return self.command_exists("rustup")
 
+    @override
+    def check_updates(self) -> int | None:
+        """更新可能なツールチェーン数を取得."""
+        try:
+            # 新しいバージョンのrustupは、更新がある場合に終了コード100を返す
+            result = self.run_command(["rustup", "check"], check=False, capture_output=True)
+            if result.returncode in (0, 100):
+                return sum(1 for line in result.stdout.splitlines() if "Update available" in line)
+            return None
+        except Exception:
+            return None
+
     @override
     def perform_update(self) -> bool:
         """Rustup更新実行."""
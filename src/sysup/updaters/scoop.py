@@ -4,11 +4,13 @@ Windows環境でのScoopパッケージマネージャを使用した
 パッケージ更新機能を提供します。
 """
 
+import os
 import subprocess
+from pathlib import Path
 
 from .._typing_compat import override
 from ..core.platform import is_windows
-from .base import BaseUpdater
+from .base import BaseUpdater, latest_mtime
 
 
 class ScoopUpdater(BaseUpdater):
@@ -38,26 +40,78 @@ class ScoopUpdater(BaseUpdater):
         return self.command_exists("scoop")
 
     @override
-    def perform_update(self) -> bool:
-        """Scoop更新を実行する.
+    def check_updates(self) -> int | None:
+        """更新可能なパッケージ数を取得する.
 
-        scoop update, scoop update *, scoop cleanup *を実行します。
+        scoop statusの表のうち、区切り行より後の行を数えます。
+
+        Returns:
+            更新可能なパッケージ数. 取得失敗時はNone.
+        """
+        try:
+            result = self.run_command(["scoop", "status"], check=False, capture_output=True)
+            if result.returncode != 0:
+                return None
+
+            count = 0
+            in_table = False
+            for line in result.stdout.splitlines():
+                if line.startswith("----"):
+                    in_table = True
+                elif in_table and line.strip():
+                    count += 1
+            return count
+        except Exception:
+            return None
+
+    @override
+    def metadata_updated_at(self) -> float | None:
+        """Scoopのメタデータの最終更新時刻を取得する.
+
+        Scoop本体のgitリポジトリのFETCH_HEADの更新時刻を返します。
+
+        Returns:
+            最終更新時刻(Unix時刻). 取得できない場合はNone.
+        """
+        root = Path(os.environ.get("SCOOP") or Path.home() / "scoop")
+        return latest_mtime([root / "apps" / "scoop" / "current" / ".git" / "FETCH_HEAD"])
+
+    @override
+    def refresh(self) -> bool:
+        """Scoop自体とバケットを更新する.
+
+        scoop updateを実行します。
 
         Returns:
             更新成功時True、失敗時False.
         """
         name = self.get_name()
 
-        if not self.is_available():
-            self.logger.info(f"{name} がインストールされていません - スキップ")
-            return True
-
         try:
-            # Scoop自体を更新
             self.logger.info(f"{name} 自体を更新中...")
             self.run_command(["scoop", "update"])
             self.logger.success(f"{name} 自体の更新完了")
+            return True
 
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{name} 更新で問題が発生しました: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
+            return False
+
+    @override
+    def apply(self) -> bool:
+        """Scoopパッケージの更新を適用する.
+
+        scoop update *, scoop cleanup *を実行します。
+
+        Returns:
+            更新成功時True、失敗時False.
+        """
+        name = self.get_name()
+
+        try:
             # インストール済みパッケージを更新
             self.logger.info(f"{name} パッケージを更新中...")
             self.run_command(["scoop", "update", "*"])
@@ -77,3 +131,18 @@ class ScoopUpdater(BaseUpdater):
         except Exception as e:
             self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
             return False
+
+    @override
+    def perform_update(self) -> bool:
+        """Scoop更新を実行する.
+
+        scoop update, scoop update *, scoop cleanup *を実行します。
+
+        Returns:
+            更新成功時True、失敗時False.
+        """
+        if not self.is_available():
+            self.logger.info(f"{self.get_name()} がインストールされていません - スキップ")
+            return True
+
+        return self.refresh() and self.apply()
@@ -26,10 +26,11 @@ class SnapUpdater(BaseUpdater):
     def check_updates(self) -> int | None:
         """更新可能なパッケージ数を取得."""
         try:
-            result = self.run_command(["snap", "list"], check=False)
+            # 更新がない場合は表ではなく "All snaps up to date." のみが出力される
+            result = self.run_command(["snap", "refresh", "--list"], check=False, capture_output=True)
             if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                return max(0, len(lines) - 1) if lines[0] else 0
+                lines = result.stdout.strip().splitlines()
+                return len(lines) - 1 if lines and lines[0].startswith("Name") else 0
             return None
         except Exception:
             return None
@@ -44,9 +45,6 @@ class SnapUpdater(BaseUpdater):
             return True
 
         try:
-            snap_count = self.check_updates() or 0
-            self.logger.info(f"{name} パッケージ数: {snap_count}")
-
             # Snap更新
             self.logger.info(f"{name} パッケージを更新中...")
             self.run_command(["sudo", "snap", "refresh"])
@@ -35,19 +35,31 @@ class UvUpdater(BaseUpdater):
             return True  # 継続可能
 
     @override
-    def perform_update(self) -> bool:
-        """Uv tool更新実行."""
-        name = self.get_name()
+    def check_updates(self) -> int | None:
+        """更新可能なツール数を取得."""
+        try:
+            result = self.run_command(["uv", "tool", "list", "--outdated"], check=False, capture_output=True)
+            if result.returncode == 0:
+                # ツールの行("名前 v1.0 [latest: 1.1]")のみを数え、実行ファイルの行("- 名前")は除く
+                return sum(1 for line in result.stdout.splitlines() if line.strip() and not line.startswith("-"))
+            return None
+        except Exception:
+            return None
 
-        if not self.is_available():
-            self.logger.info(f"{name} がインストールされていません - スキップ")
-            return True
+    @override
+    def refresh(self) -> bool:
+        """uv自体を更新.
 
-        try:
-            # まずuv自体を更新
-            self._self_update()
+        ツールの更新有無に関わらず実行するため、applyではなくrefreshフェーズで行う.
+        """
+        return self._self_update()
 
-            # 次にuvでインストールしたツールを更新
+    @override
+    def apply(self) -> bool:
+        """uvでインストールしたツールを更新."""
+        name = self.get_name()
+
+        try:
             self.logger.info(f"{name} パッケージを更新中...")
             self.run_command(["uv", "tool", "upgrade", "--all"])
             self.logger.success(f"{name} 更新完了")
@@ -59,3 +71,12 @@ class UvUpdater(BaseUpdater):
         except Exception as e:
             self.logger.error(f"{name} 更新中に予期しないエラー: {e}")
             return False
+
+    @override
+    def perform_update(self) -> bool:
+        """Uv tool更新実行."""
+        if not self.is_available():
+            self.logger.info(f"{self.get_name()} がインストールされていません - スキップ")
+            return True
+
+        return self.refresh() and self.apply()
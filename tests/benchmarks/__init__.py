@@ -0,0 +1 @@
+"""起動時間・import時間のベンチマーク."""
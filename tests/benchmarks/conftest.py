@@ -0,0 +1,102 @@
+"""ベンチマーク用 conftest.
+
+ベンチマークは環境変数 SYSUP_BENCHMARK=1 を設定した場合のみ収集されます。
+"""
+
+import os
+import statistics
+import sys
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BENCHMARK_ENABLED = os.environ.get("SYSUP_BENCHMARK") == "1"
+
+if not BENCHMARK_ENABLED:
+    collect_ignore_glob = ["test_*.py"]
+
+DEFAULT_BUDGETS = Path(__file__).parent / "budgets.toml"
+
+
+@dataclass
+class Measurement:
+    """ベンチマークの計測結果."""
+
+    name: str
+    samples: list[float]
+    budget_ms: float
+
+    @property
+    def median_ms(self) -> float:
+        """中央値（ミリ秒）."""
+        return statistics.median(self.samples)
+
+    @property
+    def passed(self) -> bool:
+        """バジェット内に収まっているか."""
+        return self.median_ms <= self.budget_ms
+
+
+_results: list[Measurement] = []
+
+
+def _load_budgets() -> dict[str, Any]:
+    path = Path(os.environ.get("SYSUP_BENCHMARK_BUDGETS", DEFAULT_BUDGETS))
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+@pytest.fixture(scope="session")
+def budgets() -> dict[str, Any]:
+    """バジェット設定を読み込むフィクスチャ."""
+    return _load_budgets()
+
+
+@pytest.fixture(scope="session")
+def budget_scale() -> float:
+    """バジェットの倍率（SYSUP_BENCHMARK_SCALE）."""
+    return float(os.environ.get("SYSUP_BENCHMARK_SCALE", "1.0"))
+
+
+@pytest.fixture
+def check_budget(budget_scale):
+    """計測結果を記録し、バジェット超過時に失敗させるフィクスチャ."""
+
+    def _check(name: str, samples: list[float], budget_ms: float) -> None:
+        measurement = Measurement(name, samples, budget_ms * budget_scale)
+        _results.append(measurement)
+        assert measurement.passed, (
+            f"{name}: 中央値 {measurement.median_ms:.1f}ms がバジェット {measurement.budget_ms:.1f}ms を超えています"
+            f" (計測値: {', '.join(f'{s:.1f}' for s in samples)})"
+        )
+
+    return _check
+
+
+@pytest.fixture
+def bench_env(tmp_path) -> dict[str, str]:
+    """ユーザー環境の影響を受けないよう、一時HOMEを設定した環境変数."""
+    env = os.environ.copy()
+    env["HOME"] = str(tmp_path)
+    if sys.platform == "win32":
+        env["USERPROFILE"] = str(tmp_path)
+    env["NO_COLOR"] = "1"
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    """計測結果の一覧を表示する."""
+    if not _results:
+        return
+
+    terminalreporter.section("sysup benchmarks")
+    width = max(len(m.name) for m in _results)
+    for m in _results:
+        status = "OK" if m.passed else "OVER"
+        terminalreporter.write_line(
+            f"{m.name:<{width}}  median {m.median_ms:8.1f}ms  budget {m.budget_ms:8.1f}ms  {status}"
+        )
@@ -0,0 +1,70 @@
+"""起動時間・import時間のベンチマーク"""
+
+import re
+import subprocess
+import sys
+import time
+from datetime import date
+
+import pytest
+
+IMPORT_MODULES = ["sysup.cli.entry", "sysup.core.config", "sysup.cli.cli", "rich", "pydantic"]
+
+SYSUP = [sys.executable, "-m", "sysup.cli"]
+
+
+def measure_import_ms(module: str, env: dict[str, str]) -> float:
+    """新しいインタプリタでモジュールをimportし、累積import時間(ミリ秒)を返す"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    pattern = re.compile(rf"^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*{re.escape(module)}$", re.MULTILINE)
+    match = pattern.search(result.stderr)
+    if match is None:
+        # 既にimport済み(例: 他モジュールの依存で先に読み込まれた)場合は0として扱う
+        return 0.0
+    return int(match.group(1)) / 1000
+
+
+def measure_command_ms(args: list[str], env: dict[str, str]) -> float:
+    """コマンドを実行し、終了までの時間(ミリ秒)を返す"""
+    start = time.perf_counter()
+    subprocess.run(SYSUP + args, capture_output=True, check=True, env=env, timeout=60)
+    return (time.perf_counter() - start) * 1000
+
+
+@pytest.mark.parametrize("module", IMPORT_MODULES)
+def test_import_time(module, budgets, bench_env, check_budget):
+    """モジュールのimport時間がバジェット内であることを確認"""
+    samples = [measure_import_ms(module, bench_env) for _ in range(budgets["repeat"])]
+
+    check_budget(f"import {module}", samples, budgets["import"][module])
+
+
+def test_startup_version(budgets, bench_env, check_budget):
+    """`sysup --version` の起動時間"""
+    samples = [measure_command_ms(["--version"], bench_env) for _ in range(budgets["repeat"])]
+
+    check_budget("sysup --version", samples, budgets["startup"]["version"])
+
+
+def test_startup_list(budgets, bench_env, check_budget):
+    """`sysup update --list` の起動時間"""
+    samples = [measure_command_ms(["update", "--list"], bench_env) for _ in range(budgets["repeat"])]
+
+    check_budget("sysup update --list", samples, budgets["startup"]["list"])
+
+
+def test_startup_auto_run_noop(budgets, bench_env, tmp_path, check_budget):
+    """今日実行済みの場合の `sysup update --auto-run` の起動時間"""
+    cache_dir = tmp_path / ".cache" / "sysup"
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "daily_run").write_text(date.today().isoformat())
+
+    samples = [measure_command_ms(["update", "--auto-run"], bench_env) for _ in range(budgets["repeat"])]
+
+    check_budget("sysup update --auto-run (no-op)", samples, budgets["startup"]["auto_run_noop"])
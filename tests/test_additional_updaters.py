@@ -8,6 +8,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from sysup.core.logging import SysupLogger
+from sysup.core.probe import ProbeCache
 from sysup.updaters.cargo import CargoUpdater
 from sysup.updaters.firmware import FirmwareUpdater
 from sysup.updaters.flatpak import FlatpakUpdater
@@ -62,6 +63,30 @@ def test_cargo_perform_update(mock_logger):
             assert result is True
 
 
+def test_cargo_check_updates(mock_logger):
+    """CargoUpdater - check_updatesがNeeds updateがYesの行を数えることを確認"""
+    updater = CargoUpdater(mock_logger)
+    output = (
+        "Package       Installed  Latest   Needs update\n"
+        "cargo-update  v13.0.0    v13.1.0  Yes\n"
+        "ripgrep       v14.0.0    v14.0.0  No\n"
+    )
+
+    with patch.object(updater, "command_exists", return_value=True):
+        with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+            assert updater.check_updates() == 1
+
+
+def test_cargo_check_updates_without_install_update(mock_logger):
+    """CargoUpdater - cargo-install-updateがない場合は更新数を不明とすることを確認"""
+    updater = CargoUpdater(mock_logger)
+
+    with patch.object(updater, "command_exists", return_value=False):
+        with patch.object(updater, "run_command") as mock_run:
+            assert updater.check_updates() is None
+            mock_run.assert_not_called()
+
+
 # ======================
 # Npm Updater Tests
 # ======================
@@ -95,6 +120,34 @@ def test_npm_perform_update(mock_logger):
             assert result is True
 
 
+def test_npm_check_updates(mock_logger):
+    """NpmUpdater - check_updatesがnpm outdatedのJSONを数えることを確認"""
+    updater = NpmUpdater(mock_logger)
+    output = '{"npm": {"current": "10.0.0", "latest": "10.2.0"}, "typescript": {"current": "5.0.0"}}'
+
+    # 更新可能なパッケージがある場合、npm outdatedは終了コード1を返す
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 1, output, "")) as mock_run:
+        assert updater.check_updates() == 2
+        assert mock_run.call_args.args[0][1:] == ["outdated", "-g", "--json"]
+
+
+def test_npm_check_updates_none(mock_logger):
+    """NpmUpdater - check_updates (更新なし)のテスト"""
+    updater = NpmUpdater(mock_logger)
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, "", "")):
+        assert updater.check_updates() == 0
+
+
+def test_npm_check_updates_error(mock_logger):
+    """NpmUpdater - check_updates (エラー)のテスト"""
+    updater = NpmUpdater(mock_logger)
+    output = '{"error": {"code": "ENOTFOUND"}}'
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 1, output, "")):
+        assert updater.check_updates() is None
+
+
 # ======================
 # Pnpm Updater Tests
 # ======================
@@ -128,6 +181,15 @@ def test_pnpm_perform_update(mock_logger):
             assert result is True
 
 
+def test_pnpm_check_updates(mock_logger):
+    """PnpmUpdater - check_updatesがpnpm outdatedのJSONを数えることを確認"""
+    updater = PnpmUpdater(mock_logger)
+    output = '{"typescript": {"current": "5.0.0", "latest": "5.3.0"}}'
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 1, output, "")):
+        assert updater.check_updates() == 1
+
+
 # ======================
 # Pipx Updater Tests
 # ======================
@@ -194,6 +256,19 @@ def test_rustup_perform_update(mock_logger):
             assert result is True
 
 
+def test_rustup_check_updates(mock_logger):
+    """RustupUpdater - check_updatesが更新可能なツールチェーンを数えることを確認"""
+    updater = RustupUpdater(mock_logger)
+    output = (
+        "stable-x86_64-unknown-linux-gnu - Update available : 1.74.0 -> 1.75.0\n"
+        "nightly-x86_64-unknown-linux-gnu - Up to date : 1.77.0-nightly\n"
+        "rustup - Up to date : 1.26.0\n"
+    )
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 100, output, "")):
+        assert updater.check_updates() == 1
+
+
 # ======================
 # Snap Updater Tests
 # ======================
@@ -229,6 +304,28 @@ def test_snap_perform_update(mock_logger):
             assert result is True
 
 
+def test_snap_check_updates(mock_logger):
+    """SnapUpdater - check_updatesがsnap refresh --listの表を数えることを確認"""
+    updater = SnapUpdater(mock_logger)
+    output = (
+        "Name     Version  Rev   Size  Publisher  Notes\n"
+        "core22   20240111 1122  77MB  canonical  base\n"
+        "firefox  122.0    3728  264MB mozilla    -\n"
+    )
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")) as mock_run:
+        assert updater.check_updates() == 2
+        mock_run.assert_called_once_with(["snap", "refresh", "--list"], check=False, capture_output=True)
+
+
+def test_snap_check_updates_none(mock_logger):
+    """SnapUpdater - check_updates (更新なし)のテスト"""
+    updater = SnapUpdater(mock_logger)
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, "", "")):
+        assert updater.check_updates() == 0
+
+
 # ======================
 # Flatpak Updater Tests
 # ======================
@@ -264,6 +361,24 @@ def test_flatpak_perform_update(mock_logger):
             assert result is True
 
 
+def test_flatpak_check_updates(mock_logger):
+    """FlatpakUpdater - check_updatesが更新可能なアプリケーションを数えることを確認"""
+    updater = FlatpakUpdater(mock_logger)
+    output = "org.mozilla.firefox\norg.gnome.Platform\n"
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+        assert updater.check_updates() == 2
+
+
+def test_flatpak_prefetch_no_deploy(mock_logger):
+    """FlatpakUpdater - prefetchがデプロイせずにダウンロードすることを確認"""
+    updater = FlatpakUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.prefetch() is True
+        mock_run.assert_called_once_with(["flatpak", "update", "-y", "--no-deploy"])
+
+
 # ======================
 # Gem Updater Tests
 # ======================
@@ -302,6 +417,15 @@ def test_gem_perform_update(mock_logger):
             mock_run.assert_called_once_with([expected_cmd, "update"])
 
 
+def test_gem_check_updates(mock_logger):
+    """GemUpdater - check_updatesがgem outdatedの行を数えることを確認"""
+    updater = GemUpdater(mock_logger)
+    output = "bundler (2.4.10 < 2.5.4)\nrake (13.0.6 < 13.1.0)\n"
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+        assert updater.check_updates() == 2
+
+
 # ======================
 # Firmware Updater Tests
 # ======================
@@ -337,6 +461,24 @@ def test_firmware_perform_update(mock_logger):
             assert result is True
 
 
+def test_firmware_check_updates(mock_logger):
+    """FirmwareUpdater - check_updatesが更新可能なデバイスを数えることを確認"""
+    updater = FirmwareUpdater(mock_logger)
+    output = '{"Devices": [{"Name": "System Firmware", "Releases": [{"Version": "1.2.3"}]}]}'
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+        assert updater.check_updates() == 1
+
+
+def test_firmware_check_updates_none(mock_logger):
+    """FirmwareUpdater - check_updates (更新なし)のテスト"""
+    updater = FirmwareUpdater(mock_logger)
+
+    # 更新がない場合、fwupdmgr get-updatesは終了コード2を返す
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 2, "", "")):
+        assert updater.check_updates() == 0
+
+
 # ======================
 # Nvm Updater Tests
 # ======================
@@ -361,6 +503,21 @@ def test_nvm_is_available(mock_logger):
         assert updater.is_available() is True
 
 
+def test_nvm_is_available_cached(mock_logger):
+    """NvmUpdater - is_availableの結果がプローブキャッシュで再利用されることを確認"""
+    updater = NvmUpdater(mock_logger, probe_cache=ProbeCache())
+
+    with patch("subprocess.run") as mock_run:
+        mock_result = Mock()
+        mock_result.returncode = 0
+        mock_result.stdout = "nvm"
+        mock_run.return_value = mock_result
+
+        assert updater.is_available() is True
+        assert updater.is_available() is True
+        mock_run.assert_called_once()
+
+
 def test_nvm_perform_update(mock_logger):
     """NvmUpdater - perform_updateのテスト"""
     updater = NvmUpdater(mock_logger)
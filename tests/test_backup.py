@@ -1,10 +1,17 @@
 """バックアップ機能のテスト"""
 
+import gzip
+import hashlib
 import json
+import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
+
 from sysup.core.backup import BackupManager
 
 
@@ -55,7 +62,7 @@ def test_create_backup():
             with open(backup_file) as f:
                 data = json.load(f)
                 assert "timestamp" in data
-                assert "packages" in data
+                assert "blobs" in data
 
 
 def test_create_backup_with_packages():
@@ -70,40 +77,277 @@ def test_create_backup_with_packages():
                 backup_file = manager.create_backup()
 
                 assert backup_file is not None
-                with open(backup_file) as f:
-                    data = json.load(f)
-                    assert "apt" in data["packages"]
-                    assert "brew" in data["packages"]
+                packages = manager.load_backup(backup_file)
+                assert packages["apt"] == ["vim", "git"]
+                assert packages["brew"] == ["wget", "curl"]
+
+
+def test_create_backup_runs_collectors_concurrently():
+    """バックアップ作成 - パッケージリストが並行して取得されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+
+        def slow_collector() -> list[str]:
+            time.sleep(0.3)
+            return ["pkg"]
+
+        collectors = dict.fromkeys(["apt", "brew", "npm", "cargo"], slow_collector)
+        with patch.object(manager, "_collectors", return_value=collectors):
+            start = time.monotonic()
+            backup_file = manager.create_backup()
+            elapsed = time.monotonic() - start
+
+        assert backup_file is not None
+        assert elapsed < 1.0
+        assert manager.load_backup(backup_file) == {name: ["pkg"] for name in collectors}
+
+
+def test_create_backup_records_collector_metadata():
+    """バックアップ作成 - 取得結果と所要時間が記録され、制限時間を超えた取得は打ち切られることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True, collect_timeout=0.2)
+
+        def hung_collector() -> list[str]:
+            time.sleep(1)
+            return ["late"]
+
+        collectors = {
+            "apt": lambda: ["vim"],
+            "snap": lambda: None,
+            "brew": hung_collector,
+        }
+        with patch.object(manager, "_collectors", return_value=collectors):
+            start = time.monotonic()
+            backup_file = manager.create_backup()
+            elapsed = time.monotonic() - start
+
+        assert backup_file is not None
+        assert elapsed < 0.8
+        data = json.loads(backup_file.read_text())
+        assert manager.load_backup(backup_file) == {"apt": ["vim"]}
+        assert data["collectors"]["apt"]["status"] == "ok"
+        assert data["collectors"]["snap"]["status"] == "unavailable"
+        assert data["collectors"]["brew"] == {"status": "timeout", "seconds": 0.2}
+        assert isinstance(data["collectors"]["apt"]["seconds"], float)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIXのプロセスグループを前提とするテスト")
+def test_create_backup_kills_collectors_after_timeout():
+    """バックアップ作成 - 制限時間を超えた取得処理のコマンドが終了させられることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True, collect_timeout=0.3)
+        finished = threading.Event()
+
+        def hung_collector() -> list[str] | None:
+            try:
+                manager._run([sys.executable, "-c", "import time; time.sleep(60)"])
+            finally:
+                finished.set()
+            return None
+
+        with patch.object(manager, "_collectors", return_value={"apt": lambda: ["vim"], "brew": hung_collector}):
+            backup_file = manager.create_backup()
+
+        assert backup_file is not None
+        assert json.loads(backup_file.read_text())["collectors"]["brew"]["status"] == "timeout"
+        # コマンドのタイムアウト(30秒)を待たずに取得処理のスレッドが終了する
+        assert finished.wait(5)
+        assert not manager._processes
+
+
+def test_start_backup_waits_per_collector():
+    """バックグラウンドのバックアップ - パッケージマネージャごとに取得完了を待てることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True, collect_timeout=5)
+
+        def slow_collector() -> list[str]:
+            time.sleep(0.5)
+            return ["slow"]
+
+        collectors = {"apt": lambda: ["vim"], "brew": slow_collector}
+        with patch.object(manager, "_collectors", return_value=collectors):
+            job = manager.start_backup()
+
+        assert job is not None
+        assert job.names == frozenset({"apt", "brew"})
+
+        start = time.monotonic()
+        packages, status, _seconds = job.wait("apt")
+        assert time.monotonic() - start < 0.4
+        assert packages == ["vim"]
+        assert status == "ok"
+        assert job.wait("unknown") == (None, "unavailable", 0.0)
+
+        backup_file = job.result()
+        assert backup_file is not None
+        assert manager.load_backup(backup_file) == {"apt": ["vim"], "brew": ["slow"]}
+        # 所要時間は最も遅い取得処理とファイルの書き出しを含む
+        assert job.duration is not None
+        assert job.duration >= 0.5
+
+
+def test_start_backup_disabled():
+    """バックグラウンドのバックアップ - バックアップ無効時はNoneを返すことを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir) / "backups", enabled=False)
+
+        assert manager.start_backup() is None
+
+
+def test_create_backup_deduplicates_inventories():
+    """バックアップ作成 - 同じパッケージリストは1つのblobとして共有されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        inventories = {"apt": ["vim", "git"], "brew": ["wget"]}
+
+        with patch.object(
+            manager, "_collectors", return_value={name: lambda p=p: p for name, p in inventories.items()}
+        ):
+            with patch("sysup.core.backup.datetime") as mock_datetime:
+                mock_datetime.now.return_value.strftime.return_value = "20250101_120000"
+                first = manager.create_backup()
+                mock_datetime.now.return_value.strftime.return_value = "20250102_120000"
+                second = manager.create_backup()
+
+        assert first is not None
+        assert second is not None
+        assert first != second
+        assert len(manager.blob_store.digests()) == 2
+        assert json.loads(first.read_text())["blobs"] == json.loads(second.read_text())["blobs"]
+        assert manager.load_backup(second) == inventories
+
+
+def test_load_backup_legacy_format():
+    """バックアップ読み込み - パッケージリストを直接含む旧形式に対応することを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        backup_file = Path(tmpdir) / "packages_20250101_120000.json"
+        backup_file.write_text(json.dumps({"timestamp": "20250101_120000", "packages": {"apt": ["vim"]}}))
+
+        assert manager.load_backup(backup_file) == {"apt": ["vim"]}
+
+
+def test_cleanup_old_backups_removes_unreferenced_blobs():
+    """古いバックアップ削除 - 参照されなくなったblobのみ削除されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        shared = manager.blob_store.put(b'["vim"]')
+        old_only = manager.blob_store.put(b'["emacs"]')
+        (Path(tmpdir) / "packages_20250101_120000.json").write_text(
+            json.dumps({"blobs": {"apt": shared, "brew": old_only}})
+        )
+        (Path(tmpdir) / "packages_20250102_120000.json").write_text(json.dumps({"blobs": {"apt": shared}}))
+
+        deleted = manager.cleanup_old_backups(keep_count=1)
+
+        assert deleted == 1
+        assert manager.blob_store.digests() == {shared}
+
+
+def test_collect_garbage_keeps_blobs_when_manifest_unreadable():
+    """blobのGC - 読み込めないバックアップファイルがある場合は何も削除しないことを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        digest = manager.blob_store.put(b'["vim"]')
+        (Path(tmpdir) / "packages_20250101_120000.json").write_text("{broken")
+
+        assert manager.collect_garbage() == 0
+        assert manager.blob_store.digests() == {digest}
+
+
+def test_blob_store_compresses_blobs():
+    """blobストア - blobがgzip圧縮され、圧縮前の内容のハッシュで保存されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        data = b'["vim","git"]'
+
+        digest = manager.blob_store.put_stream([b'["vim",', b'"git"]'])
+
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert gzip.decompress(manager.blob_store.path(digest).read_bytes()) == data
+        assert manager.blob_store.get(digest) == data
+        assert manager.blob_store.put(data) == digest
+        assert manager.blob_store.digests() == {digest}
+
+
+def test_blob_store_reads_uncompressed_blob():
+    """blobストア - 圧縮されていないblobも読み込めることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+        data = b'["vim"]'
+        digest = hashlib.sha256(data).hexdigest()
+        manager.blob_store.path(digest).parent.mkdir(parents=True)
+        manager.blob_store.path(digest).write_bytes(data)
+
+        assert manager.blob_store.get(digest) == data
+
+
+def test_create_backup_updates_index():
+    """バックアップ作成 - インデックスにタイムスタンプとパッケージ数が記録されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+
+        with patch.object(manager, "_collectors", return_value={"apt": lambda: ["vim", "git"], "snap": lambda: None}):
+            backup_file = manager.create_backup()
+
+        assert backup_file is not None
+        latest = manager.latest_backup()
+        assert latest is not None
+        assert latest.path == backup_file
+        assert latest.package_counts == {"apt": 2}
+        assert latest.timestamp == backup_file.stem.removeprefix("packages_")
+
+        index = json.loads(manager.index_file.read_text())
+        assert [entry["file"] for entry in index["snapshots"]] == [backup_file.name]
+
+
+def test_list_backups_uses_index():
+    """バックアップリスト取得 - インデックスがある場合はディレクトリを走査しないことを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backup_dir = Path(tmpdir)
+        manager = BackupManager(backup_dir, enabled=True)
+        (backup_dir / "packages_20250101_120000.json").write_text("{}")
+        assert len(manager.list_backups()) == 1
+
+        # インデックス作成後に追加されたファイルはインデックスに含まれない
+        (backup_dir / "packages_20250102_120000.json").write_text("{}")
+        assert manager.list_backups() == [backup_dir / "packages_20250101_120000.json"]
+
+        # インデックスが壊れている場合は再構築する
+        manager.index_file.write_text("{broken")
+        assert len(manager.list_backups()) == 2
+
+
+def test_latest_backup_empty():
+    """最新バックアップ取得 - バックアップがない場合はNoneを返すことを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir), enabled=True)
+
+        assert manager.latest_backup() is None
 
 
 def test_get_apt_packages_success():
-    """APTパッケージ取得 - 成功のテスト"""
+    """APTパッケージ取得 - dpkgのステータスファイルから取得するテスト"""
     with tempfile.TemporaryDirectory() as tmpdir:
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
-            mock_result = Mock()
-            mock_result.returncode = 0
-            # dpkg --get-selectionsの出力形式: "package_name  install"
-            mock_result.stdout = "vim\tinstall\ngit\tinstall\ncurl\tinstall\n"
-            mock_run.return_value = mock_result
+        with patch("sysup.core.backup.selected_packages", return_value=["vim", "git"]) as mock_selected:
+            with patch.object(manager, "_run") as mock_run:
+                packages = manager._get_apt_packages()
 
-            packages = manager._get_apt_packages()
-            assert packages is not None
-            assert "vim" in packages
-            assert "git" in packages
+        assert packages == ["vim", "git"]
+        mock_selected.assert_called_once_with()
+        mock_run.assert_not_called()
 
 
 def test_get_apt_packages_failure():
-    """APTパッケージ取得 - 失敗のテスト"""
+    """APTパッケージ取得 - ステータスファイルを読み込めない場合のテスト"""
     with tempfile.TemporaryDirectory() as tmpdir:
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.side_effect = Exception("Command failed")
-
+        with patch("sysup.core.backup.selected_packages", side_effect=FileNotFoundError("status")):
             packages = manager._get_apt_packages()
             assert packages is None
 
@@ -114,7 +358,7 @@ def test_get_brew_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "wget\ncurl\njq\n"
@@ -131,7 +375,7 @@ def test_get_snap_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "Name\nsnap1\nsnap2\n"
@@ -149,7 +393,7 @@ def test_get_npm_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "typescript\nlodash\nreact\n"
@@ -167,7 +411,7 @@ def test_get_pnpm_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = '[{"dependencies":{"typescript":{},"lodash":{},"react":{}}}]'
@@ -185,7 +429,7 @@ def test_get_pipx_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "black\npylint\nbasedpyright\n"
@@ -202,7 +446,7 @@ def test_get_cargo_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "ripgrep v0.1.0\nfd-find v0.2.0\n"
@@ -219,7 +463,7 @@ def test_get_flatpak_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "app1\tversion1\tinfo1\napp2\tversion2\tinfo2\n"
@@ -236,7 +480,7 @@ def test_get_gem_packages():
         backup_dir = Path(tmpdir)
         manager = BackupManager(backup_dir, enabled=True)
 
-        with patch("subprocess.run") as mock_run:
+        with patch.object(manager, "_run") as mock_run:
             mock_result = Mock()
             mock_result.returncode = 0
             mock_result.stdout = "rails (7.0.0)\nbundler (2.3.0)\n"
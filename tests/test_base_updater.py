@@ -1,14 +1,20 @@
 """Updater基底クラスのテスト"""
 
+import os
 import subprocess
+import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 
+from sysup.core.command import DEFAULT_OUTPUT_LIMIT
 from sysup.core.logging import SysupLogger
-from sysup.updaters.base import BaseUpdater
+from sysup.core.probe import ProbeCache
+from sysup.core.timeouts import DEFAULT_COMMAND_TIMEOUT, CommandTimeouts
+from sysup.core.timing import span
+from sysup.updaters.base import BaseUpdater, latest_mtime
 
 
 # テスト用の具体的なUpdaterクラス
@@ -79,6 +85,26 @@ def test_check_updates_default(mock_logger):
     assert result is None
 
 
+def test_metadata_updated_at_default(mock_logger):
+    """metadata_updated_atメソッドのデフォルト実装テスト"""
+    updater = DummyUpdater(mock_logger)
+
+    assert updater.metadata_updated_at() is None
+
+
+def test_latest_mtime(tmp_path):
+    """latest_mtime - 存在するファイルのうち最新の更新時刻を返すことを確認"""
+    old = tmp_path / "old"
+    new = tmp_path / "new"
+    old.write_text("")
+    new.write_text("")
+    os.utime(old, (1000, 1000))
+    os.utime(new, (2000, 2000))
+
+    assert latest_mtime([old, new, tmp_path / "missing"]) == 2000
+    assert latest_mtime([tmp_path / "missing"]) is None
+
+
 def test_pre_update_default(mock_logger):
     """pre_updateメソッドのデフォルト実装テスト"""
     updater = DummyUpdater(mock_logger)
@@ -101,7 +127,7 @@ def test_run_command_success(mock_logger):
     """run_commandメソッド - 成功のテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
+    with patch("sysup.updaters.base.execute_command") as mock_run:
         mock_result = Mock()
         mock_result.returncode = 0
         mock_result.stdout = "Success"
@@ -120,7 +146,7 @@ def test_run_command_windows_resolves_cmd(mock_logger):
 
     with patch("sysup.core.command.is_windows", return_value=True):
         with patch("sysup.core.command.shutil.which", return_value=r"C:\Scoop\shims\scoop.cmd"):
-            with patch("subprocess.run") as mock_run:
+            with patch("sysup.updaters.base.execute_command") as mock_run:
                 mock_result = Mock()
                 mock_result.returncode = 0
                 mock_result.stdout = ""
@@ -139,7 +165,7 @@ def test_run_command_windows_resolves_ps1(mock_logger):
 
     with patch("sysup.core.command.is_windows", return_value=True):
         with patch("sysup.core.command.shutil.which", return_value=r"C:\Scoop\shims\scoop.ps1"):
-            with patch("subprocess.run") as mock_run:
+            with patch("sysup.updaters.base.execute_command") as mock_run:
                 mock_result = Mock()
                 mock_result.returncode = 0
                 mock_result.stdout = ""
@@ -175,7 +201,7 @@ def test_run_command_with_check_false(mock_logger):
     """run_commandメソッド - check=Falseのテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
+    with patch("sysup.updaters.base.execute_command") as mock_run:
         mock_result = Mock()
         mock_result.returncode = 1
         mock_result.stdout = ""
@@ -191,7 +217,7 @@ def test_run_command_error(mock_logger):
     """run_commandメソッド - エラーのテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
+    with patch("sysup.updaters.base.execute_command") as mock_run:
         mock_run.side_effect = subprocess.CalledProcessError(1, ["false"], stderr="Error occurred")
 
         with pytest.raises(subprocess.CalledProcessError):
@@ -202,18 +228,39 @@ def test_run_command_timeout(mock_logger):
     """run_commandメソッド - タイムアウトのテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
+    with patch("sysup.updaters.base.execute_command") as mock_run:
         mock_run.side_effect = subprocess.TimeoutExpired(["sleep", "10"], 5)
 
         with pytest.raises(subprocess.TimeoutExpired):
             updater.run_command(["sleep", "10"], timeout=5)
 
 
+def test_run_command_records_span(mock_logger):
+    """run_commandメソッド - 実行時間と終了コードを現在のスパンの子として記録することを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with patch("sysup.updaters.base.execute_command") as mock_run:
+        mock_run.side_effect = [
+            subprocess.CompletedProcess(["true"], 0, "", ""),
+            subprocess.CalledProcessError(100, ["false"]),
+        ]
+        with span("apply", "phase") as phase:
+            updater.run_command(["true"])
+            with pytest.raises(subprocess.CalledProcessError):
+                updater.run_command(["false"])
+
+    assert [(child.name, child.kind, child.exit_code) for child in phase.children] == [
+        ("true", "command", 0),
+        ("false", "command", 100),
+    ]
+    assert all(child.end_time is not None for child in phase.children)
+
+
 def test_run_command_custom_timeout(mock_logger):
     """run_commandメソッド - カスタムタイムアウトのテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
+    with patch("sysup.updaters.base.execute_command") as mock_run:
         mock_result = Mock()
         mock_result.returncode = 0
         mock_run.return_value = mock_result
@@ -225,44 +272,121 @@ def test_run_command_custom_timeout(mock_logger):
         assert call_kwargs["timeout"] == 60
 
 
+def test_run_command_adaptive_timeout(mock_logger):
+    """run_commandメソッド - タイムアウト未指定時はcommand_timeoutsから決定することを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with patch("sysup.updaters.base.execute_command") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess(["echo"], 0, "", "")
+
+        updater.run_command(["echo", "test"])
+        assert mock_run.call_args[1]["timeout"] == DEFAULT_COMMAND_TIMEOUT
+
+        updater.command_timeouts = CommandTimeouts({"echo test": [200.0] * 5})
+        updater.run_command(["echo", "test"])
+        assert mock_run.call_args[1]["timeout"] == 600.0
+
+        updater.run_command(["echo", "test"], timeout=60)
+        assert mock_run.call_args[1]["timeout"] == 60
+
+
+def test_run_command_streams_output(mock_logger):
+    """run_commandメソッド - 出力が行単位でロガーに渡されることを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with patch.object(mock_logger, "command_output") as mock_output:
+        result = updater.run_command([sys.executable, "-c", "print('first'); print('second')"])
+
+    mock_output.assert_any_call("DummyUpdater", "first")
+    mock_output.assert_any_call("DummyUpdater", "second")
+    assert result.stdout == "first\nsecond\n"
+
+
+def test_run_command_captured_output_not_shown(mock_logger):
+    """run_commandメソッド - capture_output時の出力はコンソールに表示せずログファイルにのみ記録することを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with (
+        patch.object(mock_logger, "command_output") as mock_output,
+        patch.object(mock_logger, "log_command_output") as mock_log,
+    ):
+        result = updater.run_command([sys.executable, "-c", "print('[]')"], capture_output=True)
+
+    mock_output.assert_not_called()
+    mock_log.assert_called_once_with("DummyUpdater", "[]")
+    assert result.stdout == "[]\n"
+
+
+def test_run_command_output_limit(mock_logger):
+    """run_commandメソッド - capture_outputに応じて保持する出力量が切り替わることを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with patch("sysup.updaters.base.execute_command") as mock_run:
+        updater.run_command(["apt", "upgrade"])
+        assert mock_run.call_args[1]["output_limit"] == DEFAULT_OUTPUT_LIMIT
+
+        updater.run_command(["apt", "list"], capture_output=True)
+        assert mock_run.call_args[1]["output_limit"] is None
+
+
 def test_command_exists_true(mock_logger):
     """command_existsメソッド - コマンドが存在する場合のテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
-
+    with patch("sysup.updaters.base.shutil.which", return_value="/usr/bin/apt"):
         result = updater.command_exists("apt")
 
-        assert result is True
+    assert result is True
 
 
 def test_command_exists_false(mock_logger):
     """command_existsメソッド - コマンドが存在しない場合のテスト"""
     updater = DummyUpdater(mock_logger)
 
-    with patch("subprocess.run") as mock_run:
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_run.return_value = mock_result
-
+    with patch("sysup.updaters.base.shutil.which", return_value=None):
         result = updater.command_exists("nonexistent_command")
 
-        assert result is False
+    assert result is False
 
 
 def test_command_exists_exception(mock_logger):
     """command_existsメソッド - 例外発生時のテスト"""
     updater = DummyUpdater(mock_logger)
 
+    with patch("sysup.updaters.base.shutil.which", side_effect=Exception("Command error")):
+        result = updater.command_exists("apt")
+
+    assert result is False
+
+
+def test_command_exists_does_not_fork(mock_logger):
+    """command_existsメソッド - which/whereのプロセスを起動しないことを確認"""
+    updater = DummyUpdater(mock_logger)
+
     with patch("subprocess.run") as mock_run:
-        mock_run.side_effect = Exception("Command error")
+        updater.command_exists("apt")
+
+    mock_run.assert_not_called()
+
+
+def test_command_exists_uses_probe_cache(mock_logger):
+    """command_existsメソッド - プローブキャッシュを使用することを確認"""
+    probe_cache = Mock(spec=ProbeCache)
+    probe_cache.which.return_value = "/usr/bin/apt"
+    updater = DummyUpdater(mock_logger, probe_cache=probe_cache)
+
+    assert updater.command_exists("apt") is True
+    probe_cache.which.assert_called_once_with("apt")
 
-        result = updater.command_exists("apt")
 
-        assert result is False
+def test_cached_probe_without_cache(mock_logger):
+    """cached_probeメソッド - キャッシュ未設定時は毎回判定することを確認"""
+    updater = DummyUpdater(mock_logger)
+    func = Mock(return_value=True)
+
+    assert updater.cached_probe("dummy", func) is True
+    assert updater.cached_probe("dummy", func) is True
+    assert func.call_count == 2
 
 
 def test_abstract_methods_must_be_implemented(mock_logger):
@@ -354,3 +478,26 @@ def test_custom_pre_post_update(mock_logger):
 
     updater.post_update()
     assert updater.post_called is True
+
+
+def test_refresh_default(mock_logger):
+    """refreshメソッドのデフォルト実装テスト"""
+    updater = DummyUpdater(mock_logger)
+
+    assert updater.refresh() is True
+
+
+def test_plan_default_uses_check_updates(mock_logger):
+    """planメソッドがcheck_updatesの結果を返すことを確認"""
+    updater = CustomUpdater(mock_logger)
+
+    assert updater.plan() == 5
+
+
+def test_apply_default_calls_perform_update(mock_logger):
+    """applyメソッドのデフォルト実装がperform_updateを呼ぶことを確認"""
+    updater = DummyUpdater(mock_logger)
+
+    with patch.object(updater, "perform_update", return_value=True) as mock_perform:
+        assert updater.apply() is True
+        mock_perform.assert_called_once()
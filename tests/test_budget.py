@@ -0,0 +1,103 @@
+"""時間予算による更新の選択のテスト"""
+
+import pytest
+
+from sysup.core.budget import (
+    BudgetCandidate,
+    load_deferred,
+    parse_duration,
+    save_deferred,
+    select_within_budget,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("10m", 600.0),
+        ("90s", 90.0),
+        ("1h", 3600.0),
+        ("1h30m", 5400.0),
+        ("2.5m", 150.0),
+        ("15", 900.0),
+        (" 5M ", 300.0),
+    ],
+)
+def test_parse_duration(text, expected):
+    """時間の指定 - 単位付きの時間を秒数に変換し、単位のない数値は分として扱うことを確認"""
+    assert parse_duration(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "abc", "10x", "m", "0", "0m", "-5"])
+def test_parse_duration_invalid(text):
+    """時間の指定 - 不正な形式や0以下の場合はValueErrorを送出することを確認"""
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+def test_select_within_budget_priority():
+    """時間予算 - 優先度の高い更新から予算の残りに収まるものを選択することを確認"""
+    candidates = [
+        BudgetCandidate("npm", 30.0, priority=1),
+        BudgetCandidate("cargo", 300.0, priority=2),
+        BudgetCandidate("apt", 120.0, priority=0),
+        BudgetCandidate("pipx", 60.0, priority=1),
+    ]
+
+    plan = select_within_budget(candidates, 200.0)
+
+    assert plan.selected == ["npm", "apt"]
+    assert plan.deferred == ["cargo", "pipx"]
+    assert plan.expected_seconds == 150.0
+
+
+def test_select_within_budget_preferred():
+    """時間予算 - 前回延期した更新を優先して選択することを確認"""
+    candidates = [
+        BudgetCandidate("apt", 120.0, priority=0),
+        BudgetCandidate("pipx", 60.0, priority=1),
+    ]
+
+    plan = select_within_budget(candidates, 150.0, preferred=["pipx"])
+
+    assert plan.selected == ["pipx"]
+    assert plan.deferred == ["apt"]
+
+
+def test_select_within_budget_dependencies():
+    """時間予算 - 依存先を延期した更新も延期することを確認"""
+    candidates = [
+        BudgetCandidate("npm", 30.0, priority=1, dependencies=("nvm",)),
+        BudgetCandidate("pnpm", 30.0, priority=1, dependencies=("nvm",)),
+        BudgetCandidate("nvm", 100.0, priority=1),
+        BudgetCandidate("cargo", 30.0, priority=2, dependencies=("rustup",)),
+    ]
+
+    plan = select_within_budget(candidates, 90.0)
+
+    # rustupは候補にないため、cargoの依存関係は無視する
+    assert plan.selected == ["cargo"]
+    assert plan.deferred == ["npm", "pnpm", "nvm"]
+    assert plan.expected_seconds == 30.0
+
+
+def test_deferred_roundtrip(tmp_path):
+    """延期の記録 - 保存・読み込みと、延期がない場合の削除を確認"""
+    deferred_file = tmp_path / "deferred_updaters.json"
+
+    assert load_deferred(deferred_file) == []
+    save_deferred(deferred_file, ["cargo", "gem"])
+    assert load_deferred(deferred_file) == ["cargo", "gem"]
+
+    save_deferred(deferred_file, [])
+    assert not deferred_file.exists()
+
+
+def test_load_deferred_corrupted(tmp_path):
+    """延期の記録 - 壊れたファイルは空のリストとして扱うことを確認"""
+    deferred_file = tmp_path / "deferred_updaters.json"
+
+    deferred_file.write_text("not json", encoding="utf-8")
+    assert load_deferred(deferred_file) == []
+    deferred_file.write_text('{"cargo": true}', encoding="utf-8")
+    assert load_deferred(deferred_file) == []
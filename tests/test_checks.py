@@ -163,6 +163,17 @@ def test_check_daily_run_corrupted_file(system_checker):
     assert result is True
 
 
+def test_clear_daily_run(system_checker):
+    """日次実行チェック - 実行記録を削除すると同日でも再実行できることを確認"""
+    assert system_checker.check_daily_run() is True
+    assert system_checker.check_daily_run() is False
+
+    system_checker.clear_daily_run()
+    system_checker.clear_daily_run()
+
+    assert system_checker.check_daily_run() is True
+
+
 def test_check_reboot_required_true():
     """再起動が必要な場合のテスト"""
     with tempfile.TemporaryDirectory() as tmpdir:
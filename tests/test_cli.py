@@ -5,6 +5,7 @@ from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from sysup.cli.cli import main, setup_wsl_integration, show_available_updaters
@@ -25,8 +26,8 @@ def mock_sudo_updaters():
     mock_snap.get_name.return_value = "Snap"
     mock_snap.perform_update.return_value = True
 
-    with patch("sysup.cli.cli.AptUpdater", return_value=mock_apt):
-        with patch("sysup.cli.cli.SnapUpdater", return_value=mock_snap):
+    with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+        with patch("sysup.updaters.snap.SnapUpdater", return_value=mock_snap):
             yield (mock_apt, mock_snap)
 
 
@@ -38,24 +39,38 @@ def mock_all_updaters():
     mock.perform_update.return_value = True
 
     with (
-        patch("sysup.cli.cli.AptUpdater", return_value=mock),
-        patch("sysup.cli.cli.SnapUpdater", return_value=mock),
-        patch("sysup.cli.cli.BrewUpdater", return_value=mock),
-        patch("sysup.cli.cli.NpmUpdater", return_value=mock),
-        patch("sysup.cli.cli.PnpmUpdater", return_value=mock),
-        patch("sysup.cli.cli.PipxUpdater", return_value=mock),
-        patch("sysup.cli.cli.UvUpdater", return_value=mock),
-        patch("sysup.cli.cli.RustupUpdater", return_value=mock),
-        patch("sysup.cli.cli.CargoUpdater", return_value=mock),
-        patch("sysup.cli.cli.FlatpakUpdater", return_value=mock),
-        patch("sysup.cli.cli.GemUpdater", return_value=mock),
-        patch("sysup.cli.cli.NvmUpdater", return_value=mock),
-        patch("sysup.cli.cli.FirmwareUpdater", return_value=mock),
-        patch("sysup.cli.cli.ScoopUpdater", return_value=mock),
+        patch("sysup.updaters.apt.AptUpdater", return_value=mock),
+        patch("sysup.updaters.snap.SnapUpdater", return_value=mock),
+        patch("sysup.updaters.brew.BrewUpdater", return_value=mock),
+        patch("sysup.updaters.npm.NpmUpdater", return_value=mock),
+        patch("sysup.updaters.pnpm.PnpmUpdater", return_value=mock),
+        patch("sysup.updaters.pipx.PipxUpdater", return_value=mock),
+        patch("sysup.updaters.uv.UvUpdater", return_value=mock),
+        patch("sysup.updaters.rustup.RustupUpdater", return_value=mock),
+        patch("sysup.updaters.cargo.CargoUpdater", return_value=mock),
+        patch("sysup.updaters.flatpak.FlatpakUpdater", return_value=mock),
+        patch("sysup.updaters.gem.GemUpdater", return_value=mock),
+        patch("sysup.updaters.nvm.NvmUpdater", return_value=mock),
+        patch("sysup.updaters.firmware.FirmwareUpdater", return_value=mock),
+        patch("sysup.updaters.scoop.ScoopUpdater", return_value=mock),
     ):
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """更新計画などのキャッシュがテスト間で共有されないよう、ホームディレクトリを一時ディレクトリにする."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+
+
+@pytest.fixture(autouse=True)
+def mock_self_updater():
+    """テスト中にsysup自身の更新チェック(uv tool upgrade)が実行されないようにする."""
+    with patch("sysup.cli.cli.SelfUpdater") as mock_class:
+        yield mock_class
+
+
 def test_main_version():
     """CLI - バージョン表示のテスト"""
     runner = CliRunner()
@@ -318,7 +333,7 @@ def test_run_updates_with_backup():
 
         with patch("sysup.cli.cli.BackupManager") as mock_backup:
             mock_backup_instance = MagicMock()
-            mock_backup_instance.create_backup.return_value = Path(tmpdir) / "backup.json"
+            mock_backup_instance.start_backup.return_value.result.return_value = Path(tmpdir) / "backup.json"
             mock_backup_instance.cleanup_old_backups.return_value = 5
             mock_backup.return_value = mock_backup_instance
 
@@ -327,6 +342,9 @@ def test_run_updates_with_backup():
                     run_updates(logger, config, checker, auto_run=True, force=False)
         logger.close()
 
+        mock_backup_instance.start_backup.assert_called_once()
+        mock_backup_instance.cleanup_old_backups.assert_called_once_with(keep_count=config.backup.keep_count)
+
 
 def test_run_updates_daily_check_failed():
     """run_updates - 日次チェック失敗時のテスト"""
@@ -491,7 +509,7 @@ def test_run_updates_parallel_mode_with_sudo_preauth():
 
         try:
             with mock_all_updaters():
-                with patch("sysup.cli.cli.AptUpdater", return_value=mock_apt):
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
                     with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
                         with patch("sysup.cli.cli.is_windows", return_value=False):
                             with patch("sysup.cli.cli.subprocess.run") as mock_run:
@@ -543,7 +561,1027 @@ def test_run_updates_updater_exception():
         mock_apt.get_name.return_value = "APT"
 
         with mock_all_updaters():
-            with patch("sysup.cli.cli.AptUpdater", return_value=mock_apt):
+            with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
                 with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
                     run_updates(logger, config, checker, auto_run=True, force=False)
         logger.close()
+
+
+def test_run_updates_refreshes_before_apply():
+    """run_updates - すべてのrefreshがapplyより先に実行されることを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        calls: list[str] = []
+
+        def make_updater(name: str) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = None
+            updater.get_name.return_value = name
+            updater.refresh.side_effect = lambda: calls.append(f"refresh:{name}") or True
+            updater.apply.side_effect = lambda: calls.append(f"apply:{name}") or True
+            return updater
+
+        mock_apt = make_updater("APT")
+        mock_brew = make_updater("Homebrew")
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew):
+                        with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                            run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        assert calls == ["refresh:APT", "refresh:Homebrew", "apply:APT", "apply:Homebrew"]
+
+
+def test_run_updates_refresh_failure_skips_apply():
+    """run_updates - refresh失敗時はapplyを実行せず失敗として記録することを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        mock_apt = MagicMock()
+        mock_apt.is_available.return_value = True
+        mock_apt.get_name.return_value = "APT"
+        mock_apt.refresh.return_value = False
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                        with patch("sysup.cli.cli.StatsManager") as mock_stats:
+                            run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_apt.apply.assert_not_called()
+        mock_stats.return_value.record_failure.assert_any_call("apt", "メタデータ更新失敗")
+
+
+def test_run_updates_skips_apply_without_pending_updates():
+    """run_updates - 更新数が0のupdaterはapplyを実行せずスキップとして記録することを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        def make_updater(name: str, pending: int | None) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = None
+            updater.get_name.return_value = name
+            updater.refresh.return_value = True
+            updater.plan.return_value = pending
+            updater.apply.return_value = True
+            updater.post_update.return_value = True
+            return updater
+
+        mock_apt = make_updater("APT", 0)
+        mock_brew = make_updater("Homebrew", 3)
+        mock_npm = make_updater("npm", None)
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew):
+                        with patch("sysup.updaters.npm.NpmUpdater", return_value=mock_npm):
+                            with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                                with patch("sysup.cli.cli.StatsManager") as mock_stats:
+                                    run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_apt.apply.assert_not_called()
+        mock_stats.return_value.record_skip.assert_any_call("apt", "更新なし")
+        # 不要パッケージの削除などの後処理は、更新がない場合も実行する
+        mock_apt.post_update.assert_called_once()
+        # 更新数が不明な場合はapplyを実行する
+        mock_brew.apply.assert_called_once()
+        mock_npm.apply.assert_called_once()
+        mock_brew.post_update.assert_called_once()
+
+
+def test_run_updates_dry_run_does_not_skip_by_plan():
+    """run_updates - ドライランでは更新数による判定を行わないことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.dry_run = True
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        mock_apt = MagicMock()
+        mock_apt.is_available.return_value = True
+        mock_apt.metadata_updated_at.return_value = None
+        mock_apt.get_name.return_value = "APT"
+        mock_apt.plan.return_value = 0
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                        run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_apt.plan.assert_not_called()
+        mock_apt.apply.assert_called_once()
+
+
+def test_run_updates_skips_fresh_metadata_refresh():
+    """run_updates - メタデータが最大経過時間内に更新されている場合はrefreshをスキップすることを確認"""
+    import time
+
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        def make_updater(name: str, updated_at: float | None) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.get_name.return_value = name
+            updater.metadata_updated_at.return_value = updated_at
+            updater.refresh.return_value = True
+            updater.plan.return_value = 1
+            updater.apply.return_value = True
+            return updater
+
+        now = time.time()
+        mock_apt = make_updater("APT", now - 10 * 60)
+        mock_brew = make_updater("Homebrew", now - 2 * 60 * 60)
+        mock_firmware = make_updater("Firmware", None)
+
+        try:
+            with mock_all_updaters():
+                with (
+                    patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt),
+                    patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew),
+                    patch("sysup.updaters.firmware.FirmwareUpdater", return_value=mock_firmware),
+                    patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+                ):
+                    run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        # 10分前に更新されたAPTはスキップし、2時間前のHomebrew・時刻不明のファームウェアは更新する
+        mock_apt.refresh.assert_not_called()
+        mock_apt.apply.assert_called_once()
+        mock_brew.refresh.assert_called_once()
+        mock_firmware.refresh.assert_called_once()
+
+
+def test_metadata_is_fresh():
+    """_metadata_is_fresh - 最大経過時間と最終更新時刻から鮮度を判定することを確認"""
+    import time
+
+    from sysup.cli.cli import _metadata_is_fresh
+
+    updater = MagicMock()
+    updater.metadata_updated_at.return_value = time.time() - 60
+
+    assert _metadata_is_fresh(updater, 5) is True
+    assert _metadata_is_fresh(updater, 0.5) is False
+    # 0の場合は常に更新する
+    assert _metadata_is_fresh(updater, 0) is False
+
+    updater.metadata_updated_at.return_value = time.time() + 600
+    assert _metadata_is_fresh(updater, 60) is False
+
+    updater.metadata_updated_at.return_value = None
+    assert _metadata_is_fresh(updater, 60) is False
+
+
+def test_run_updates_creates_only_enabled_updaters():
+    """run_updates - 無効なupdaterは生成されないことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.updaters.brew = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.brew.BrewUpdater") as mock_brew_class:
+                    with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                        run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_brew_class.assert_not_called()
+
+
+def test_main_starts_self_update_in_background(mock_self_updater):
+    """CLI - セルフアップデートをバックグラウンドで開始し、run_updatesに渡すことを確認"""
+    runner = CliRunner()
+
+    with patch("sysup.cli.cli.SystemChecker") as mock_checker:
+        with patch("sysup.cli.cli.run_updates") as mock_run_updates:
+            mock_checker.return_value.check_process_lock.return_value = True
+
+            result = runner.invoke(main, ["update"])
+
+    assert result.exit_code == 0
+    mock_self_updater.return_value.start_background_check.assert_called_once()
+    assert mock_run_updates.call_args[0][5] is mock_self_updater.return_value
+
+
+def test_main_no_self_update(mock_self_updater):
+    """CLI - --no-self-updateではセルフアップデートを行わないことを確認"""
+    runner = CliRunner()
+
+    with patch("sysup.cli.cli.SystemChecker") as mock_checker:
+        with patch("sysup.cli.cli.run_updates") as mock_run_updates:
+            mock_checker.return_value.check_process_lock.return_value = True
+
+            result = runner.invoke(main, ["update", "--no-self-update"])
+
+    assert result.exit_code == 0
+    mock_self_updater.assert_not_called()
+    assert mock_run_updates.call_args[0][5] is None
+
+
+def test_run_updates_waits_for_self_update_before_updaters():
+    """run_updates - updaterの生成前にセルフアップデートの完了を待つことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        calls: list[str] = []
+        self_updater = MagicMock()
+        self_updater.restart_if_updated.side_effect = lambda **_kwargs: calls.append("self_update")
+
+        def create_apt(*_args: object) -> MagicMock:
+            calls.append("apt")
+            return MagicMock(**{"is_available.return_value": False})
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", side_effect=create_apt):
+                    with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                        run_updates(logger, config, checker, auto_run=True, force=False, self_updater=self_updater)
+        finally:
+            logger.close()
+
+        assert calls[0] == "self_update"
+        self_updater.restart_if_updated.assert_called_once_with(before_restart=checker.cleanup_lock)
+
+
+def test_run_updates_backup_precedes_only_apply():
+    """run_updates - バックアップはrefreshと並行し、同じupdaterのapplyより前に完了することを確認"""
+    import time
+
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.dir = tmpdir
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        calls: list[str] = []
+
+        def collect_apt() -> list[str]:
+            time.sleep(0.3)
+            calls.append("apt:backup")
+            return ["vim"]
+
+        apt = MagicMock()
+        apt.is_available.return_value = True
+        apt.metadata_updated_at.return_value = None
+        apt.get_name.return_value = "APT"
+        apt.refresh.side_effect = lambda: calls.append("apt:refresh") or True
+        apt.apply.side_effect = lambda: calls.append("apt:apply") or True
+
+        try:
+            with (
+                patch("sysup.cli.cli.BackupManager._collectors", return_value={"apt": collect_apt}),
+                mock_all_updaters(),
+                patch("sysup.updaters.apt.AptUpdater", return_value=apt),
+                patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+            ):
+                run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        assert calls == ["apt:refresh", "apt:backup", "apt:apply"]
+        assert len(list(Path(tmpdir).glob("packages_*.json"))) == 1
+
+
+def test_run_updates_backup_wait_does_not_hold_worker():
+    """run_updates - バックアップの完了待ちがワーカーを占有せず、待機中も他のupdaterの更新が進むことを確認"""
+    import threading
+
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = True
+        config.general.cache_dir = tmpdir
+        config.general.parallel_updates = False
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        calls: list[str] = []
+        apt_applied = threading.Event()
+
+        def create_updater(name: str, applied: threading.Event | None = None) -> MagicMock:
+            def apply() -> bool:
+                calls.append(f"{name}:apply")
+                if applied is not None:
+                    applied.set()
+                return True
+
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = None
+            updater.get_name.return_value = name
+            updater.plan.return_value = 1
+            updater.refresh.return_value = True
+            updater.apply.side_effect = apply
+            return updater
+
+        def wait(name: str) -> tuple[list[str], str, float]:
+            # brewのバックアップはaptの更新後に完了する. 待機がワーカーを占有するとaptの更新が始まらない
+            if name == "brew" and not apt_applied.wait(timeout=5):
+                calls.append("brew:timeout")
+            calls.append(f"{name}:backup")
+            return ([], "ok", 0.0)
+
+        backup_job = MagicMock()
+        backup_job.names = frozenset({"apt", "brew"})
+        backup_job.wait.side_effect = wait
+        backup_job.result.return_value = None
+
+        try:
+            with (
+                patch("sysup.cli.cli.BackupManager") as mock_backup,
+                mock_all_updaters(),
+                patch("sysup.updaters.apt.AptUpdater", return_value=create_updater("apt", apt_applied)),
+                patch("sysup.updaters.brew.BrewUpdater", return_value=create_updater("brew")),
+                patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+            ):
+                mock_backup.return_value.start_backup.return_value = backup_job
+                run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        assert calls == ["apt:backup", "apt:apply", "brew:backup", "brew:apply"]
+
+
+def test_run_updates_starts_backup_after_checks_and_self_update():
+    """run_updates - バックアップはセルフアップデートの後に開始し、チェックで中断した場合は開始しないことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = True
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = False
+        checker.check_reboot_required.return_value = False
+
+        calls: list[str] = []
+        self_updater = MagicMock()
+        self_updater.restart_if_updated.side_effect = lambda **_kwargs: calls.append("self_update")
+
+        try:
+            with (
+                patch("sysup.cli.cli.BackupManager") as mock_backup,
+                mock_all_updaters(),
+                patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+            ):
+                mock_backup.return_value.start_backup.side_effect = lambda: calls.append("backup")
+                # 自動実行モードではsudo権限がないと中断する
+                run_updates(logger, config, checker, auto_run=True, force=False, self_updater=self_updater)
+                assert calls == []
+
+                checker.check_sudo_available.return_value = True
+                run_updates(logger, config, checker, auto_run=True, force=False, self_updater=self_updater)
+        finally:
+            logger.close()
+
+        assert calls == ["self_update", "backup"]
+
+
+def test_plan_command_shows_pending_updates(tmp_path):
+    """CLI - planコマンドが更新計画を表示してキャッシュに保存することを確認"""
+    from sysup.core.plan import PlanCache, PlanEntry
+
+    config_file = tmp_path / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{tmp_path.as_posix()}"\n', encoding="utf-8")
+
+    mock_apt = MagicMock()
+    mock_apt.is_available.return_value = True
+    mock_apt.plan.return_value = 3
+    mock_apt.download_size.return_value = 5 * 1024 * 1024
+
+    mock_brew = MagicMock()
+    mock_brew.is_available.return_value = True
+    mock_brew.plan.return_value = 0
+
+    runner = CliRunner()
+    with mock_all_updaters():
+        with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt) as mock_apt_class:
+            with patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew):
+                result = runner.invoke(main, ["plan", "--config", str(config_file)])
+
+    assert result.exit_code == 0, result.output
+    assert "APT" in result.output
+    assert "5.0 MB" in result.output
+    assert "2分0秒" in result.output
+    mock_brew.download_size.assert_not_called()
+    mock_apt.apply.assert_not_called()
+    mock_apt.refresh.assert_not_called()
+    # 確認コマンドは読み取りのみのため、ドライランではないupdaterを生成する
+    assert mock_apt_class.call_args.args[1] is False
+
+    cache = PlanCache.load(tmp_path / "plan_cache.json")
+    assert cache.get("apt") == PlanEntry(pending=3, download_bytes=5 * 1024 * 1024, estimated_seconds=120)
+    assert cache.get("brew") == PlanEntry(pending=0, download_bytes=0, estimated_seconds=0.0)
+
+
+def test_run_updates_reuses_cached_plan():
+    """run_updates - 有効期間内の更新計画を再利用し、適用後に破棄することを確認"""
+    import time
+
+    from sysup.cli.cli import run_updates
+    from sysup.core.plan import PlanCache, PlanEntry
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        cache = PlanCache(Path(tmpdir) / "plan_cache.json")
+        cache.put("apt", PlanEntry(pending=0))
+        cache.put("brew", PlanEntry(pending=2))
+        cache.save()
+
+        def make_updater(name: str) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            # メタデータは更新計画の記録より前に更新され、最大経過時間内のためrefreshしない
+            updater.metadata_updated_at.return_value = time.time() - 60
+            updater.get_name.return_value = name
+            updater.refresh.return_value = True
+            updater.apply.return_value = True
+            return updater
+
+        mock_apt = make_updater("APT")
+        mock_brew = make_updater("Homebrew")
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew):
+                        with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                            run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_apt.refresh.assert_not_called()
+        mock_apt.plan.assert_not_called()
+        mock_apt.apply.assert_not_called()
+        mock_brew.plan.assert_not_called()
+        mock_brew.apply.assert_called_once()
+
+        cache = PlanCache.load(Path(tmpdir) / "plan_cache.json")
+        assert cache.get("apt") == PlanEntry(pending=0)
+        assert cache.get("brew") is None
+
+
+def test_run_updates_ignores_cached_plan_after_refresh():
+    """run_updates - メタデータを更新した場合は、キャッシュした更新計画(更新なし)を使わず再確認することを確認"""
+    import json
+    import time
+    from datetime import UTC, datetime, timedelta
+
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        # sysup planはメタデータを更新せずに確認するため、古いメタデータでは更新なしと記録される
+        checked_at = (datetime.now(UTC) - timedelta(minutes=10)).isoformat()
+        entry = {"pending": 0, "checked_at": checked_at}
+        (Path(tmpdir) / "plan_cache.json").write_text(
+            json.dumps({"version": 1, "entries": {"apt": entry, "brew": entry}}), encoding="utf-8"
+        )
+
+        def make_updater(name: str, metadata_updated_at: float | None) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = metadata_updated_at
+            updater.get_name.return_value = name
+            updater.refresh.return_value = True
+            updater.plan.return_value = 3
+            updater.apply.return_value = True
+            return updater
+
+        # APTはメタデータが古いためこの実行でrefreshする
+        mock_apt = make_updater("APT", None)
+        # Homebrewは更新計画の記録後に他のツールがメタデータを更新したため、refreshはスキップする
+        mock_brew = make_updater("Homebrew", time.time() - 60)
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew):
+                        with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                            with patch("sysup.cli.cli.StatsManager") as mock_stats:
+                                run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_apt.refresh.assert_called_once()
+        mock_apt.plan.assert_called_once()
+        mock_apt.apply.assert_called_once()
+        mock_brew.refresh.assert_not_called()
+        mock_brew.plan.assert_called_once()
+        mock_brew.apply.assert_called_once()
+        mock_stats.return_value.record_packages.assert_any_call("apt", 3)
+        mock_stats.return_value.record_packages.assert_any_call("brew", 3)
+
+
+def test_prefetch_command_downloads_without_applying(tmp_path):
+    """CLI - prefetchコマンドが優先度を下げ、メタデータ更新とダウンロードのみを行うことを確認"""
+    from sysup.core.plan import PlanCache, PlanEntry
+
+    config_file = tmp_path / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{tmp_path.as_posix()}"\n', encoding="utf-8")
+
+    def make_updater(pending: int) -> MagicMock:
+        updater = MagicMock()
+        updater.is_available.return_value = True
+        updater.metadata_updated_at.return_value = None
+        updater.refresh.return_value = True
+        updater.plan.return_value = pending
+        updater.prefetch.return_value = True
+        return updater
+
+    mock_apt = make_updater(3)
+    mock_brew = make_updater(0)
+
+    runner = CliRunner()
+    with mock_all_updaters():
+        with (
+            patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt),
+            patch("sysup.updaters.brew.BrewUpdater", return_value=mock_brew),
+            patch("sysup.cli.cli.lower_process_priority", return_value=True) as mock_lower,
+        ):
+            result = runner.invoke(main, ["prefetch", "--config", str(config_file)])
+
+    assert result.exit_code == 0, result.output
+    mock_lower.assert_called_once()
+    mock_apt.refresh.assert_called_once()
+    mock_apt.prefetch.assert_called_once()
+    mock_apt.apply.assert_not_called()
+    # 更新がないupdaterはダウンロードしない
+    mock_brew.refresh.assert_called_once()
+    mock_brew.prefetch.assert_not_called()
+    mock_brew.apply.assert_not_called()
+
+    cache = PlanCache.load(tmp_path / "plan_cache.json")
+    assert cache.get("apt") == PlanEntry(pending=3, estimated_seconds=120)
+
+
+def test_prefetch_command_failure_exit_code(tmp_path):
+    """CLI - prefetchコマンドでダウンロードに失敗した場合は終了コード1を返すことを確認"""
+    config_file = tmp_path / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{tmp_path.as_posix()}"\n', encoding="utf-8")
+
+    mock_apt = MagicMock()
+    mock_apt.is_available.return_value = True
+    mock_apt.metadata_updated_at.return_value = None
+    mock_apt.refresh.return_value = True
+    mock_apt.plan.return_value = 1
+    mock_apt.prefetch.return_value = False
+
+    runner = CliRunner()
+    with mock_all_updaters():
+        with (
+            patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt),
+            patch("sysup.cli.cli.lower_process_priority", return_value=False),
+        ):
+            result = runner.invoke(main, ["prefetch", "--config", str(config_file)])
+
+    assert result.exit_code == 1
+    mock_apt.apply.assert_not_called()
+
+
+def test_run_updates_records_history():
+    """run_updates - 実行結果と更新したパッケージ数を実行履歴に記録することを確認"""
+    from sysup.cli.cli import run_updates
+    from sysup.core.history import HistoryStore
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        mock_apt = MagicMock()
+        mock_apt.is_available.return_value = True
+        mock_apt.metadata_updated_at.return_value = None
+        mock_apt.get_name.return_value = "APT"
+        mock_apt.refresh.return_value = True
+        mock_apt.plan.return_value = 2
+        mock_apt.apply.return_value = True
+
+        try:
+            with mock_all_updaters():
+                with patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt):
+                    with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                        run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        store = HistoryStore(Path(tmpdir) / "history.sqlite3")
+        assert len(store.recent_runs(10)) == 1
+        summaries = {summary.name: summary for summary in store.updater_summaries(10)}
+        assert summaries["apt"].runs == 1
+        assert summaries["apt"].failures == 0
+        assert summaries["apt"].p50 is not None
+
+
+def test_set_command_timeouts(tmp_path):
+    """_set_command_timeouts - 実行履歴と設定からupdaterごとのコマンドのタイムアウトを設定することを確認"""
+    from sysup.cli.cli import _set_command_timeouts
+    from sysup.core.history import HistoryStore, RunRecord, StepRecord, UpdaterRecord
+    from sysup.updaters.registry import get_updater_specs
+
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    for i in range(5):
+        store.record_run(
+            RunRecord(1000.0 + i, 150.0, 1, 0, 0),
+            [UpdaterRecord("snap", "success", duration=150.0)],
+            [StepRecord("snap", "command", "sudo snap refresh", 1000.0 + i, 150.0, 0)],
+        )
+
+    config = SysupConfig()
+    config.general.cache_dir = str(tmp_path)
+    config.timeouts.updaters = {"cargo": 3600.0}
+    specs = {spec.name: spec for spec in get_updater_specs()}
+    mock_snap = MagicMock()
+    mock_cargo = MagicMock()
+
+    _set_command_timeouts(config, [(specs["snap"], mock_snap), (specs["cargo"], mock_cargo)])
+
+    assert mock_snap.command_timeouts.timeout_for(["sudo", "snap", "refresh"]) == 450.0
+    assert mock_snap.command_timeouts.timeout_for(["snap", "list"]) == 300.0
+    assert mock_cargo.command_timeouts.timeout_for(["cargo", "install-update", "-a"]) == 3600.0
+
+    # 実行履歴を使用しない場合は常にデフォルト値
+    config.timeouts.adaptive = False
+    _set_command_timeouts(config, [(specs["snap"], mock_snap)])
+    assert mock_snap.command_timeouts.timeout_for(["sudo", "snap", "refresh"]) == 300.0
+
+
+def test_run_updates_budget_defers_updates():
+    """run_updates - 時間予算に収まらない更新を延期し、次回の実行のために記録することを確認"""
+    from sysup.cli.cli import run_updates
+    from sysup.core.budget import load_deferred
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        def make_updater(name: str) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = None
+            updater.get_name.return_value = name
+            updater.refresh.return_value = True
+            updater.plan.return_value = 1
+            updater.apply.return_value = True
+            return updater
+
+        # 実行履歴がないため、静的な見積もり(APT 120秒、npm 30秒、Cargo 300秒)を使用する
+        mock_apt = make_updater("APT")
+        mock_npm = make_updater("npm")
+        mock_cargo = make_updater("Cargo")
+
+        try:
+            with mock_all_updaters():
+                with (
+                    patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt),
+                    patch("sysup.updaters.npm.NpmUpdater", return_value=mock_npm),
+                    patch("sysup.updaters.cargo.CargoUpdater", return_value=mock_cargo),
+                    patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+                ):
+                    run_updates(logger, config, checker, auto_run=True, force=False, budget_seconds=400)
+        finally:
+            logger.close()
+
+        mock_apt.apply.assert_called_once()
+        mock_npm.apply.assert_called_once()
+        mock_cargo.refresh.assert_not_called()
+        mock_cargo.apply.assert_not_called()
+        assert load_deferred(Path(tmpdir) / "deferred_updaters.json") == ["cargo"]
+        # Cargoは次の予算に収まるため、同じ日の次回の自動実行を許可する
+        checker.clear_daily_run.assert_called_once()
+
+
+def test_update_invalid_budget():
+    """CLI - 不正な時間予算を指定した場合はエラーになることを確認"""
+    result = CliRunner().invoke(main, ["update", "--budget", "abc"])
+
+    assert result.exit_code == 2
+    assert "時間の形式が不正です" in result.output
+
+
+def test_run_updates_writes_metrics():
+    """run_updates - メトリクスが有効な場合は実行結果をテキストファイルに書き出すことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        config.metrics.enabled = True
+        config.metrics.textfile = str(Path(tmpdir) / "metrics" / "sysup.prom")
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = True
+
+        mock_apt = MagicMock()
+        mock_apt.is_available.return_value = True
+        mock_apt.metadata_updated_at.return_value = None
+        mock_apt.get_name.return_value = "APT"
+        mock_apt.refresh.return_value = True
+        mock_apt.plan.return_value = 2
+        mock_apt.apply.return_value = True
+
+        try:
+            with mock_all_updaters():
+                with (
+                    patch("sysup.updaters.apt.AptUpdater", return_value=mock_apt),
+                    patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+                ):
+                    run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        content = (Path(tmpdir) / "metrics" / "sysup.prom").read_text(encoding="utf-8")
+        assert 'sysup_updater_status{updater="apt",status="success"} 1' in content
+        assert 'sysup_updater_packages_upgraded{updater="apt"} 2' in content
+        assert "sysup_reboot_required 1" in content
+
+
+def test_run_updates_writes_metrics_when_aborted():
+    """run_updates - システムチェックで中断した場合も、前回の結果を残さずメトリクスを書き出すことを確認"""
+    from sysup.cli.cli import run_updates
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        config.metrics.enabled = True
+        textfile = Path(tmpdir) / "sysup.prom"
+        config.metrics.textfile = str(textfile)
+        textfile.write_text(
+            "sysup_last_run_timestamp_seconds 1000\nsysup_last_run_success 1\n"
+            "sysup_last_success_timestamp_seconds 1000\n",
+            encoding="utf-8",
+        )
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        # 自動実行モードではsudo権限がないと中断する
+        checker.check_sudo_available.return_value = False
+
+        try:
+            with mock_all_updaters() as mock_updater:
+                with patch("sysup.cli.cli.Notifier.is_available", return_value=False):
+                    run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        mock_updater.apply.assert_not_called()
+        content = textfile.read_text(encoding="utf-8")
+        assert "sysup_last_run_timestamp_seconds 1000\n" not in content
+        assert "sysup_last_run_completed 0" in content
+        assert "sysup_last_run_success 0" in content
+        assert "sysup_last_success_timestamp_seconds 1000" in content
+
+
+def test_history_command(tmp_path):
+    """CLI - historyコマンドがupdaterごとの処理時間・失敗率を表示することを確認"""
+    from sysup.core.history import HistoryStore, RunRecord, UpdaterRecord
+
+    config_file = tmp_path / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{tmp_path.as_posix()}"\n', encoding="utf-8")
+
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    for i in range(4):
+        status = "failure" if i == 0 else "success"
+        store.record_run(
+            RunRecord(1000.0 + i, 150.0, 1, 0, 0), [UpdaterRecord("cargo", status, duration=120.0 + i * 10)], []
+        )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["history", "--config", str(config_file), "-n", "10"])
+
+    assert result.exit_code == 0, result.output
+    assert "直近4回の実行" in result.output
+    assert "cargo" in result.output
+    assert "25%" in result.output
+    assert "2分15秒" in result.output
+
+
+def test_history_command_empty(tmp_path):
+    """CLI - 実行履歴がない場合はその旨を表示することを確認"""
+    config_file = tmp_path / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{tmp_path.as_posix()}"\n', encoding="utf-8")
+
+    result = CliRunner().invoke(main, ["history", "--config", str(config_file)])
+
+    assert result.exit_code == 0
+    assert "実行履歴がありません" in result.output
+
+
+def test_run_updates_parallel_starts_longest_expected_first():
+    """run_updates - 並列更新では実行履歴の処理時間が長いupdaterから開始することを確認"""
+    from sysup.cli.cli import run_updates
+    from sysup.core.history import HistoryStore, RunRecord, StepRecord, UpdaterRecord
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        config = SysupConfig()
+        config.backup.enabled = False
+        config.general.cache_dir = tmpdir
+        config.general.parallel_updates = True
+        config.general.max_workers = 1
+        checker = MagicMock()
+
+        checker.check_daily_run.return_value = True
+        checker.check_disk_space.return_value = True
+        checker.check_network.return_value = True
+        checker.check_sudo_available.return_value = True
+        checker.check_reboot_required.return_value = False
+
+        HistoryStore(Path(tmpdir) / "history.sqlite3").record_run(
+            RunRecord(1000.0, 700.0, 2, 0, 0),
+            [UpdaterRecord("apt", "success", duration=10.0), UpdaterRecord("cargo", "success", duration=600.0)],
+            [StepRecord("apt", "phase", "apply", 1000.0, 10.0), StepRecord("cargo", "phase", "apply", 1000.0, 600.0)],
+        )
+
+        applied: list[str] = []
+
+        def make_updater(name: str) -> MagicMock:
+            updater = MagicMock()
+            updater.is_available.return_value = True
+            updater.metadata_updated_at.return_value = None
+            updater.get_name.return_value = name
+            updater.refresh.return_value = True
+            updater.plan.return_value = 1
+            updater.apply.side_effect = lambda: applied.append(name) or True
+            return updater
+
+        try:
+            with mock_all_updaters():
+                with (
+                    patch("sysup.updaters.apt.AptUpdater", return_value=make_updater("apt")),
+                    patch("sysup.updaters.cargo.CargoUpdater", return_value=make_updater("cargo")),
+                    patch("sysup.updaters.npm.NpmUpdater", return_value=make_updater("npm")),
+                    patch("sysup.cli.cli.subprocess.run"),
+                    patch("sysup.cli.cli.Notifier.is_available", return_value=False),
+                ):
+                    run_updates(logger, config, checker, auto_run=True, force=False)
+        finally:
+            logger.close()
+
+        # 実行履歴のあるcargo(600秒)、静的な見積もりのnpm(30秒)、実行履歴のあるapt(10秒)の順
+        assert applied == ["cargo", "npm", "apt"]
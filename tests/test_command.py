@@ -0,0 +1,196 @@
+"""コマンド実行エンジンのテスト"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from sysup.core.command import OutputBuffer, execute_command, execute_command_async, terminate_running_commands
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="POSIXのプロセスグループを前提とするテスト")
+
+
+def python_command(code: str) -> list[str]:
+    """Pythonコードを実行するコマンドを返す"""
+    return [sys.executable, "-c", code]
+
+
+def test_execute_command_captures_output():
+    """標準出力・標準エラーが取得できることを確認"""
+    result = execute_command(python_command("import sys; print('out'); print('err', file=sys.stderr)"))
+
+    assert result.returncode == 0
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+
+
+def test_execute_command_streams_lines():
+    """出力が行単位でコールバックに渡されることを確認"""
+    lines: list[str] = []
+    errors: list[str] = []
+
+    execute_command(
+        python_command("import sys; print('a'); print('b'); sys.stdout.write('c'); print('x', file=sys.stderr)"),
+        on_stdout=lines.append,
+        on_stderr=errors.append,
+    )
+
+    assert lines == ["a", "b", "c"]
+    assert errors == ["x"]
+
+
+def test_execute_command_check_raises():
+    """check=Trueで非ゼロ終了時に例外が発生することを確認"""
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        execute_command(python_command("import sys; print('bad', file=sys.stderr); sys.exit(3)"), check=True)
+
+    assert exc_info.value.returncode == 3
+    assert exc_info.value.stderr == "bad\n"
+
+
+def test_execute_command_without_check_returns_status():
+    """check=Falseでは非ゼロ終了でも結果が返ることを確認"""
+    result = execute_command(python_command("raise SystemExit(2)"))
+
+    assert result.returncode == 2
+
+
+@posix_only
+def test_execute_command_timeout_kills_process_group(tmp_path):
+    """タイムアウト時に子プロセスを含むプロセスグループごと終了することを確認"""
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time; "
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid)); "
+        "print('started', flush=True); "
+        "time.sleep(60)"
+    )
+
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired) as exc_info:
+        execute_command(python_command(code), timeout=1)
+
+    assert time.monotonic() - start < 10
+    assert exc_info.value.output == "started\n"
+
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(child_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("子プロセスが終了していません")
+
+
+def test_execute_command_async_runs_concurrently():
+    """1つのイベントループで複数のコマンドが並行実行されることを確認"""
+
+    async def main() -> list[subprocess.CompletedProcess[str]]:
+        return await asyncio.gather(
+            *(execute_command_async(python_command(f"import time; time.sleep(0.5); print({i})")) for i in range(4))
+        )
+
+    start = time.monotonic()
+    results = asyncio.run(main())
+
+    assert [r.stdout for r in results] == ["0\n", "1\n", "2\n", "3\n"]
+    assert time.monotonic() - start < 1.8
+
+
+@posix_only
+def test_execute_command_async_cancel_kills_process():
+    """キャンセル時にプロセスが終了することを確認"""
+
+    async def main() -> None:
+        task = asyncio.create_task(execute_command_async(python_command("import time; time.sleep(60)")))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(main())
+
+    assert time.monotonic() - start < 10
+
+
+@posix_only
+def test_terminate_running_commands_stops_command_in_other_thread():
+    """中断時に他のスレッドで実行中のコマンドが終了することを確認"""
+    results: list[subprocess.CompletedProcess[str]] = []
+    thread = threading.Thread(
+        target=lambda: results.append(execute_command(python_command("import time; time.sleep(60)")))
+    )
+
+    start = time.monotonic()
+    thread.start()
+    time.sleep(0.5)
+    terminate_running_commands()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 10
+    assert results[0].returncode != 0
+
+
+def test_execute_command_missing_command():
+    """存在しないコマンドでFileNotFoundErrorが発生することを確認"""
+    with pytest.raises(FileNotFoundError):
+        execute_command(["sysup-nonexistent-command"])
+
+
+def test_execute_command_output_limit_keeps_tail():
+    """output_limit指定時は出力の末尾のみが保持され、コールバックには全行が渡されることを確認"""
+    lines: list[str] = []
+
+    result = execute_command(
+        python_command("for i in range(1000): print(f'line{i:04d}')"), on_stdout=lines.append, output_limit=100
+    )
+
+    assert len(lines) == 1000
+    assert len(result.stdout) <= 100
+    assert result.stdout.endswith("line0999\n")
+    assert "line0000" not in result.stdout
+
+
+def test_output_buffer_unlimited():
+    """上限なしの場合はすべての行を保持することを確認"""
+    buffer = OutputBuffer()
+    for i in range(100):
+        buffer.append(f"{i}\n")
+
+    assert buffer.getvalue() == "".join(f"{i}\n" for i in range(100))
+    assert buffer.truncated is False
+
+
+def test_output_buffer_drops_oldest_lines():
+    """上限を超えると古い行から破棄されることを確認"""
+    buffer = OutputBuffer(limit=10)
+    buffer.append("aaaa\n")
+    buffer.append("bbbb\n")
+    buffer.append("cccc\n")
+
+    assert buffer.getvalue() == "bbbb\ncccc\n"
+    assert buffer.truncated is True
+
+
+def test_output_buffer_truncates_long_line():
+    """上限より長い1行は末尾のみ保持されることを確認"""
+    buffer = OutputBuffer(limit=4)
+    buffer.append("abcdefgh")
+
+    assert buffer.getvalue() == "efgh"
+
+
+def test_output_buffer_invalid_limit():
+    """上限が1未満の場合にエラーとなることを確認"""
+    with pytest.raises(ValueError):
+        OutputBuffer(limit=0)
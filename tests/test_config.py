@@ -16,6 +16,13 @@ def test_default_config():
     assert config.auto_run.mode == "disabled"
     assert config.logging.level == "INFO"
     assert config.backup.enabled is True
+    assert config.history.enabled is True
+    assert config.history.keep_runs == 1000
+    assert config.timeouts.adaptive is True
+    assert config.timeouts.default_seconds == 300
+    assert config.timeouts.updaters == {}
+    assert config.metrics.enabled is False
+    assert config.get_metrics_file() == Path("~/.local/share/sysup/sysup.prom").expanduser()
 
 
 def test_load_config_from_file():
@@ -63,3 +70,75 @@ def test_path_expansion():
     log_dir = config.get_log_dir()
     assert log_dir.is_absolute()
     assert "~" not in str(log_dir)
+
+
+def test_resource_limits_from_file():
+    """リソースクラスごとの同時実行数設定の読み込みテスト"""
+    config_data = """
+[general]
+parallel_updates = true
+
+[general.resource_limits]
+cpu = 2
+"""
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+        f.write(config_data)
+        config_path = Path(f.name)
+
+    try:
+        config = SysupConfig.load_config(config_path)
+
+        assert config.general.resource_limits.cpu == 2
+        assert config.general.resource_limits.system_lock == 1
+    finally:
+        config_path.unlink()
+
+
+def test_metadata_max_age_from_file():
+    """メタデータの鮮度設定の読み込みテスト"""
+    config_data = """
+[general.metadata_max_age]
+apt = 0
+brew = 15
+"""
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+        f.write(config_data)
+        config_path = Path(f.name)
+
+    try:
+        config = SysupConfig.load_config(config_path)
+
+        assert config.general.metadata_max_age.apt == 0
+        assert config.general.metadata_max_age.brew == 15
+        assert config.general.metadata_max_age.firmware == 1440
+    finally:
+        config_path.unlink()
+
+
+def test_timeouts_from_file():
+    """コマンドのタイムアウト設定の読み込みテスト"""
+    config_data = """
+[timeouts]
+factor = 4
+max_seconds = 3600
+
+[timeouts.updaters]
+cargo = 5400
+snap = 120
+"""
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
+        f.write(config_data)
+        config_path = Path(f.name)
+
+    try:
+        config = SysupConfig.load_config(config_path)
+
+        assert config.timeouts.factor == 4
+        assert config.timeouts.max_seconds == 3600
+        assert config.timeouts.min_seconds == 300
+        assert config.timeouts.updaters == {"cargo": 5400, "snap": 120}
+    finally:
+        config_path.unlink()
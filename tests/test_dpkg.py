@@ -0,0 +1,143 @@
+"""dpkgステータス・APTパッケージリスト読み込みのテスト"""
+
+import gzip
+import lzma
+import shutil
+from pathlib import Path
+
+import pytest
+
+from sysup.core.dpkg import compare_versions, read_status, selected_packages, upgradable_packages
+
+FIXTURES = Path(__file__).parent / "fixtures" / "dpkg"
+STATUS = FIXTURES / "status"
+LISTS = FIXTURES / "lists"
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "expected"),
+    [
+        ("1.0", "1.0", 0),
+        ("1.0", "1.1", -1),
+        ("1.10", "1.9", 1),
+        ("1.0~rc1", "1.0", -1),
+        ("1.0~rc1", "1.0~rc2", -1),
+        ("1.0~~", "1.0~", -1),
+        ("1.0", "1.0a", -1),
+        ("1.0a", "1.0+", -1),
+        ("1:0.9", "2.0", 1),
+        ("0:1.0", "1.0", 0),
+        ("1.0-1", "1.0-2", -1),
+        ("1.0-1", "1.0", 1),
+        ("2.36-9+deb12u4", "2.36-9+deb12u7", -1),
+        ("1:2.43.0-1~bpo12+1", "1:2.39.2-1.1", 1),
+        ("1.2-3-4", "1.2-3-5", -1),
+    ],
+)
+def test_compare_versions(a, b, expected):
+    """バージョン比較 - dpkgと同じ規則で比較することを確認"""
+    result = compare_versions(a, b)
+    assert (result > 0) - (result < 0) == expected
+    reverse = compare_versions(b, a)
+    assert (reverse > 0) - (reverse < 0) == -expected
+
+
+def test_compare_versions_invalid_epoch():
+    """バージョン比較 - エポックが数値でない場合にValueErrorを送出することを確認"""
+    with pytest.raises(ValueError):
+        compare_versions("a:1.0", "1.0")
+
+
+def test_read_status():
+    """ステータス読み込み - パッケージの状態とバージョンを読み込むことを確認"""
+    packages = read_status(STATUS)
+
+    assert [package.name for package in packages] == ["vim", "git", "libc6", "libc6", "curl", "nano", "htop"]
+    vim = packages[0]
+    assert vim.version == "2:9.0.1378-2"
+    assert vim.architecture == "amd64"
+    assert vim.want == "install"
+    assert vim.installed is True
+
+    nano = packages[5]
+    assert nano.want == "deinstall"
+    assert nano.status == "config-files"
+    assert nano.installed is False
+
+
+def test_read_status_empty(tmp_path):
+    """ステータス読み込み - 空のファイルでは空のリストを返すことを確認"""
+    status = tmp_path / "status"
+    status.write_bytes(b"")
+
+    assert read_status(status) == []
+
+
+def test_read_status_missing(tmp_path):
+    """ステータス読み込み - ファイルがない場合にOSErrorを送出することを確認"""
+    with pytest.raises(OSError):
+        read_status(tmp_path / "status")
+
+
+def test_selected_packages():
+    """選択済みパッケージ - dpkg --get-selectionsのinstallに相当する名前を返すことを確認"""
+    # holdとdeinstallは除外され、複数アーキテクチャのlibc6は1つにまとめられる
+    assert selected_packages(STATUS) == ["vim", "git", "libc6", "htop"]
+
+
+def test_upgradable_packages():
+    """更新可能パッケージ - リポジトリの優先度に従って更新候補を選ぶことを確認"""
+    upgradable = {(p.name, p.architecture): p for p in upgradable_packages(STATUS, LISTS)}
+
+    # 通常のリポジトリ(gzip圧縮されたリストを含む)と、backportsからインストールしたパッケージの更新.
+    # gitはインストール済みのバージョンが通常のリポジトリ(優先度500)にあるため、
+    # backports(ButAutomaticUpgrades、優先度100)の新しいバージョンは候補にならない
+    assert set(upgradable) == {
+        ("libc6", "amd64"),
+        ("libc6", "i386"),
+        ("curl", "amd64"),
+        ("htop", "amd64"),
+    }
+    assert upgradable["htop", "amd64"].installed_version == "3.2.2-2"
+    assert upgradable["htop", "amd64"].candidate_version == "3.3.0-4~bpo12+1"
+    assert upgradable["libc6", "i386"].candidate_version == "2.36-9+deb12u7"
+    # サイズは更新候補のバージョン・アーキテクチャのものを使用する
+    assert upgradable["libc6", "amd64"].size == 2800000
+    assert upgradable["libc6", "i386"].size == 2900000
+
+
+def test_upgradable_packages_not_automatic():
+    """更新可能パッケージ - NotAutomaticのリポジトリのみにある新しいバージョンは候補にしないことを確認"""
+    upgradable = [p.name for p in upgradable_packages(STATUS, LISTS)]
+
+    # vimの新しいバージョンはexperimental(NotAutomatic)にのみ存在する
+    assert "vim" not in upgradable
+
+
+def test_upgradable_packages_no_lists(tmp_path):
+    """更新可能パッケージ - パッケージリストがない場合は空のリストを返すことを確認"""
+    assert upgradable_packages(STATUS, tmp_path) == []
+
+
+def test_upgradable_packages_unsupported_compression(tmp_path):
+    """更新可能パッケージ - 対応していない圧縮形式のリストがある場合にValueErrorを送出することを確認"""
+    lists = tmp_path / "lists"
+    shutil.copytree(LISTS, lists)
+    (lists / "deb.debian.org_debian_dists_bookworm_main_binary-arm64_Packages.lz4").write_bytes(b"\x04\x22\x4d\x18")
+
+    with pytest.raises(ValueError):
+        upgradable_packages(STATUS, lists)
+
+
+def test_upgradable_packages_xz(tmp_path):
+    """更新可能パッケージ - xz圧縮されたリストを読み込めることを確認"""
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    packages = gzip.decompress(
+        (LISTS / "deb.debian.org_debian_dists_bookworm_main_binary-i386_Packages.gz").read_bytes()
+    )
+    (lists / "example_dists_stable_main_binary-i386_Packages.xz").write_bytes(lzma.compress(packages))
+
+    upgradable = upgradable_packages(STATUS, lists)
+
+    assert [(p.name, p.architecture) for p in upgradable] == [("libc6", "i386")]
@@ -0,0 +1,143 @@
+"""軽量エントリーポイントのテスト"""
+
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from sysup.cli.entry import already_ran_today, main, normalize_args
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """一時的なHOMEディレクトリを設定するフィクスチャ"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    return tmp_path
+
+
+def write_stamp(cache_dir: Path, day: date) -> None:
+    """日次実行の記録を書き込む"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / "daily_run").write_text(day.isoformat())
+
+
+def test_normalize_args_maps_bare_auto_run():
+    """`sysup --auto-run` が `sysup update --auto-run` として扱われることを確認"""
+    assert normalize_args(["--auto-run"]) == ["update", "--auto-run"]
+    assert normalize_args(["update", "--auto-run"]) == ["update", "--auto-run"]
+    assert normalize_args(["--version"]) == ["--version"]
+    assert normalize_args([]) == []
+
+
+def test_already_ran_today(home):
+    """今日の実行記録がある場合にTrueとなることを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today())
+
+    assert already_ran_today(["update", "--auto-run"]) is True
+
+
+def test_already_ran_today_stale_stamp(home):
+    """実行記録が昨日の場合はFalseとなることを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today() - timedelta(days=1))
+
+    assert already_ran_today(["update", "--auto-run"]) is False
+
+
+def test_already_ran_today_without_stamp(home):
+    """実行記録がない場合はFalseとなることを確認"""
+    assert already_ran_today(["update", "--auto-run"]) is False
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["update"],
+        ["update", "--auto-run", "--force"],
+        ["update", "--auto-run", "--list"],
+        ["update", "--auto-run", "--setup-wsl"],
+        ["init"],
+    ],
+)
+def test_already_ran_today_requires_plain_auto_run(home, args):
+    """自動実行以外や日次チェックを回避するオプションでは高速パスを使用しないことを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today())
+
+    assert already_ran_today(args) is False
+
+
+@pytest.mark.parametrize("style", ["-c", "--config", "--config="])
+def test_already_ran_today_uses_config_cache_dir(home, style):
+    """設定ファイルのcache_dirを参照することを確認"""
+    cache_dir = home / "custom-cache"
+    write_stamp(cache_dir, date.today())
+    config_file = home / "sysup.toml"
+    config_file.write_text(f'[general]\ncache_dir = "{cache_dir.as_posix()}"\n')
+
+    if style == "--config=":
+        args = ["update", "--auto-run", f"--config={config_file}"]
+    else:
+        args = ["update", "--auto-run", style, str(config_file)]
+
+    assert already_ran_today(args) is True
+
+
+def test_already_ran_today_default_config_location(home):
+    """既定の検索パスの設定ファイルを参照することを確認"""
+    cache_dir = home / "custom-cache"
+    write_stamp(cache_dir, date.today())
+    config_dir = home / ".config" / "sysup"
+    config_dir.mkdir(parents=True)
+    (config_dir / "sysup.toml").write_text(f'[general]\ncache_dir = "{cache_dir.as_posix()}"\n')
+
+    assert already_ran_today(["update", "--auto-run"]) is True
+
+
+def test_already_ran_today_invalid_config(home):
+    """設定ファイルが不正な場合は通常の処理に任せることを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today())
+    config_file = home / "sysup.toml"
+    config_file.write_text("[general\n")
+
+    assert already_ran_today(["update", "--auto-run", "-c", str(config_file)]) is False
+
+
+def test_main_fast_path_skips_cli(home, capsys):
+    """今日実行済みの場合、CLI本体を実行せずに終了することを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today())
+
+    with patch.object(sys, "argv", ["sysup", "--auto-run"]):
+        with patch("sysup.cli.cli.main") as mock_cli:
+            main()
+
+    mock_cli.assert_not_called()
+    assert "今日は既に実行済みです" in capsys.readouterr().out
+
+
+def test_main_delegates_to_cli(home):
+    """高速パスに該当しない場合、正規化した引数でCLI本体を実行することを確認"""
+    with patch.object(sys, "argv", ["sysup", "--auto-run"]):
+        with patch("sysup.cli.cli.main") as mock_cli:
+            main()
+
+    mock_cli.assert_called_once_with(args=["update", "--auto-run"], prog_name="sysup")
+
+
+def test_fast_path_avoids_heavy_imports(home):
+    """高速パスではrich・pydantic・updaterをimportしないことを確認"""
+    write_stamp(home / ".cache" / "sysup", date.today())
+    code = (
+        "import sys\n"
+        "sys.argv = ['sysup', 'update', '--auto-run']\n"
+        "from sysup.cli.entry import main\n"
+        "main()\n"
+        "heavy = [m for m in ('rich', 'pydantic', 'click', 'sysup.cli.cli', 'sysup.updaters') if m in sys.modules]\n"
+        "print(heavy)\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,151 @@
+"""実行履歴ストアのテスト"""
+
+import sqlite3
+
+import pytest
+
+from sysup.core.history import HistoryStore, RunRecord, StepRecord, UpdaterRecord, percentile
+
+
+def record(store: HistoryStore, started_at: float, **durations: float | None) -> None:
+    """updaterごとの処理時間(Noneは失敗)を持つ実行を記録する."""
+    updaters = [
+        UpdaterRecord(name, "success" if duration is not None else "failure", duration=duration)
+        for name, duration in durations.items()
+    ]
+    run = RunRecord(started_at, sum(d or 0 for d in durations.values()), len(updaters), 0, 0)
+    store.record_run(run, updaters, [])
+
+
+@pytest.mark.parametrize(
+    ("values", "q", "expected"),
+    [
+        ([], 50, None),
+        ([3.0], 95, 3.0),
+        ([1.0, 2.0, 3.0, 4.0], 50, 2.5),
+        ([1.0, 2.0, 3.0, 4.0, 5.0], 0, 1.0),
+        ([1.0, 2.0, 3.0, 4.0, 5.0], 100, 5.0),
+        ([5.0, 1.0, 3.0], 50, 3.0),
+    ],
+)
+def test_percentile(values, q, expected):
+    """パーセンタイル - 線形補間で求めることを確認"""
+    assert percentile(values, q) == expected
+
+
+def test_history_record_run(tmp_path):
+    """実行履歴 - 実行・updater・ステップの記録を保存することを確認"""
+    db_file = tmp_path / "history.sqlite3"
+    store = HistoryStore(db_file)
+    store.record_run(
+        RunRecord(1000.0, 120.0, 1, 1, 1),
+        [
+            UpdaterRecord("apt", "success", duration=100.0, packages=3),
+            UpdaterRecord("cargo", "failure", "更新失敗", duration=10.0),
+            UpdaterRecord("snap", "skip", "利用不可"),
+        ],
+        [
+            StepRecord(None, "check", "ネットワーク確認", 1000.0, 0.5),
+            StepRecord("apt", "command", "sudo apt upgrade -y", 1001.0, 95.0, 0),
+        ],
+    )
+
+    assert store.recent_runs(10) == [RunRecord(1000.0, 120.0, 1, 1, 1)]
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT name, packages FROM updaters WHERE status = 'success'").fetchall() == [("apt", 3)]
+        assert conn.execute("SELECT updater, name, exit_code FROM steps WHERE kind = 'command'").fetchall() == [
+            ("apt", "sudo apt upgrade -y", 0)
+        ]
+
+
+def test_history_missing_database(tmp_path):
+    """実行履歴 - データベースがない場合は空の結果を返し、ファイルを作成しないことを確認"""
+    store = HistoryStore(tmp_path / "history.sqlite3")
+
+    assert store.recent_runs(10) == []
+    assert store.updater_summaries(10) == []
+    assert not (tmp_path / "history.sqlite3").exists()
+
+
+def test_history_keep_runs(tmp_path):
+    """実行履歴 - 保持数を超えた古い実行を関連する記録とともに削除することを確認"""
+    db_file = tmp_path / "history.sqlite3"
+    store = HistoryStore(db_file, keep_runs=2)
+    for i in range(4):
+        record(store, 1000.0 + i, apt=float(i))
+
+    assert [run.started_at for run in store.recent_runs(10)] == [1003.0, 1002.0]
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT duration FROM updaters ORDER BY duration").fetchall() == [(2.0,), (3.0,)]
+
+
+def test_history_updater_summaries(tmp_path):
+    """実行履歴 - updaterごとの処理時間・失敗率・傾向を直近の実行から集計することを確認"""
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    # 集計対象外の古い実行
+    record(store, 900.0, apt=1000.0)
+    for i, (apt, cargo) in enumerate([(10.0, 100.0), (12.0, None), (14.0, 100.0), (16.0, 200.0), (18.0, 200.0)]):
+        record(store, 1000.0 + i, apt=apt, cargo=cargo)
+
+    summaries = {summary.name: summary for summary in store.updater_summaries(5)}
+
+    apt = summaries["apt"]
+    assert apt.runs == 5
+    assert apt.failures == 0
+    assert apt.p50 == 14.0
+    assert apt.p95 == pytest.approx(17.6)
+    # 前半(10, 12)の中央値11に対して後半(16, 18)の中央値17
+    assert apt.trend == pytest.approx(17 / 11 - 1)
+
+    cargo = summaries["cargo"]
+    assert cargo.runs == 5
+    assert cargo.failures == 1
+    assert cargo.failure_rate == pytest.approx(0.2)
+    assert cargo.p50 == 150.0
+    assert cargo.trend == pytest.approx(1.0)
+
+
+def test_history_corrupted_database(tmp_path):
+    """実行履歴 - 壊れたデータベースではsqlite3.Errorを送出することを確認"""
+    db_file = tmp_path / "history.sqlite3"
+    db_file.write_bytes(b"not a database" * 100)
+
+    with pytest.raises(sqlite3.Error):
+        HistoryStore(db_file).recent_runs(10)
+
+
+def test_history_phase_durations(tmp_path):
+    """実行履歴 - 直近の実行におけるupdaterごとのフェーズの処理時間を返すことを確認"""
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    for i, duration in enumerate([500.0, 100.0, 120.0]):
+        store.record_run(
+            RunRecord(1000.0 + i, duration, 1, 0, 0),
+            [UpdaterRecord("cargo", "success", duration=duration)],
+            [
+                StepRecord(None, "check", "ネットワーク確認", 1000.0 + i, 0.1),
+                StepRecord("cargo", "phase", "refresh", 1000.0 + i, 1.0),
+                StepRecord("cargo", "phase", "apply", 1000.5 + i, duration),
+            ],
+        )
+
+    assert store.phase_durations("apply", 2) == {"cargo": [100.0, 120.0]}
+    assert store.phase_durations("refresh", 10) == {"cargo": [1.0, 1.0, 1.0]}
+    assert store.phase_durations("backup", 10) == {}
+
+
+def test_history_command_durations(tmp_path):
+    """実行履歴 - 直近の実行におけるコマンドごとの処理時間を、タイムアウトしたもの(処理時間の下限)を含めて返すことを確認"""
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    for i, (duration, exit_code) in enumerate([(30.0, 0), (300.0, None), (40.0, 1)]):
+        store.record_run(
+            RunRecord(1000.0 + i, duration, 1, 0, 0),
+            [UpdaterRecord("snap", "success", duration=duration)],
+            [
+                StepRecord("snap", "phase", "apply", 1000.0 + i, duration),
+                StepRecord("snap", "command", "sudo snap refresh", 1000.0 + i, duration, exit_code),
+            ],
+        )
+
+    assert store.command_durations(10) == {"sudo snap refresh": [30.0, 300.0, 40.0]}
+    assert store.command_durations(1) == {"sudo snap refresh": [40.0]}
+    assert HistoryStore(tmp_path / "missing.sqlite3").command_durations(10) == {}
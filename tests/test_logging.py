@@ -128,6 +128,33 @@ def test_error_message():
         logger.close()
 
 
+def test_command_output_written_to_log_file():
+    """コマンド出力が出力元付きでログファイルに記録されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_dir = Path(tmpdir)
+        logger = SysupLogger(log_dir, "INFO")
+
+        logger.command_output("APT", "Setting up [foo] ...")
+        logger.close()
+
+        log_file = next(log_dir.glob("sysup_*.log"))
+        assert "[APT] Setting up [foo] ..." in log_file.read_text(encoding="utf-8")
+
+
+def test_log_command_output_not_printed(capsys):
+    """ログファイルのみのコマンド出力がコンソールに表示されないことを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_dir = Path(tmpdir)
+        logger = SysupLogger(log_dir, "INFO")
+
+        logger.log_command_output("npm", '{"left-pad": {}}')
+        logger.close()
+
+        assert "left-pad" not in capsys.readouterr().out
+        log_file = next(log_dir.glob("sysup_*.log"))
+        assert '[npm] {"left-pad": {}}' in log_file.read_text(encoding="utf-8")
+
+
 def test_section_message():
     """セクションメッセージ出力のテスト"""
     with tempfile.TemporaryDirectory() as tmpdir:
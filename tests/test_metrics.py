@@ -0,0 +1,93 @@
+"""Prometheusのテキスト形式のメトリクス出力のテスト"""
+
+from sysup.core.history import UpdaterRecord
+from sysup.core.metrics import RunMetrics, read_last_success, render_metrics, write_metrics
+
+
+def test_render_metrics():
+    """メトリクス - 実行全体とupdaterごとの値をテキスト形式で出力することを確認"""
+    run = RunMetrics(
+        finished_at=1760000000.5,
+        duration=93.25,
+        updaters=[
+            UpdaterRecord("apt", "success", duration=80.5, packages=3),
+            UpdaterRecord("snap", "skip", "利用不可"),
+        ],
+        backup_duration=4.0,
+        reboot_required=True,
+    )
+
+    lines = render_metrics(run).splitlines()
+
+    assert "# TYPE sysup_last_run_duration_seconds gauge" in lines
+    assert "sysup_last_run_timestamp_seconds 1760000000.5" in lines
+    assert "sysup_last_run_duration_seconds 93.25" in lines
+    assert "sysup_last_run_completed 1" in lines
+    assert "sysup_last_run_success 1" in lines
+    assert "sysup_last_success_timestamp_seconds 1760000000.5" in lines
+    assert "sysup_backup_duration_seconds 4" in lines
+    assert "sysup_reboot_required 1" in lines
+    assert 'sysup_updaters{status="skip"} 1' in lines
+    assert 'sysup_updater_status{updater="apt",status="success"} 1' in lines
+    assert 'sysup_updater_status{updater="apt",status="failure"} 0' in lines
+    assert 'sysup_updater_status{updater="snap",status="skip"} 1' in lines
+    assert 'sysup_updater_duration_seconds{updater="apt"} 80.5' in lines
+    assert 'sysup_updater_packages_upgraded{updater="apt"} 3' in lines
+    # 処理時間・パッケージ数が不明なupdaterは出力しない
+    assert not any(line.startswith('sysup_updater_duration_seconds{updater="snap"}') for line in lines)
+
+
+def test_render_metrics_failure_keeps_last_success():
+    """メトリクス - 失敗した実行では前回までの最終成功時刻を引き継ぐことを確認"""
+    run = RunMetrics(2000.0, 10.0, [UpdaterRecord("cargo", "failure", "更新失敗", 10.0)])
+
+    content = render_metrics(run, last_success=1000.0)
+
+    assert "sysup_last_run_success 0" in content
+    assert "sysup_last_success_timestamp_seconds 1000" in content
+    assert "sysup_backup_duration_seconds" not in content
+    assert "sysup_last_success_timestamp_seconds" not in render_metrics(run)
+
+
+def test_render_metrics_not_completed():
+    """メトリクス - 更新を行わずに終了した実行は成功として扱わず、実行時刻のみを更新することを確認"""
+    run = RunMetrics(2000.0, 3.0, reboot_required=None, completed=False)
+
+    content = render_metrics(run, last_success=1000.0)
+
+    assert "sysup_last_run_timestamp_seconds 2000" in content
+    assert "sysup_last_run_completed 0" in content
+    assert "sysup_last_run_success 0" in content
+    assert "sysup_last_success_timestamp_seconds 1000" in content
+    # 確認していない再起動の要否は出力しない
+    assert "sysup_reboot_required" not in content
+
+
+def test_render_metrics_escapes_labels():
+    """メトリクス - ラベル値のバックスラッシュ・引用符・改行をエスケープすることを確認"""
+    run = RunMetrics(1000.0, 1.0, [UpdaterRecord('my"plugin\\x\n', "success", duration=1.0)])
+
+    assert 'sysup_updater_duration_seconds{updater="my\\"plugin\\\\x\\n"} 1' in render_metrics(run)
+
+
+def test_write_metrics(tmp_path):
+    """メトリクス - ファイルを置き換えて書き出し、最終成功時刻を引き継ぐことを確認"""
+    textfile = tmp_path / "textfile_collector" / "sysup.prom"
+
+    write_metrics(textfile, RunMetrics(1000.0, 5.0, [UpdaterRecord("apt", "success", duration=5.0)]))
+    assert read_last_success(textfile) == 1000.0
+
+    write_metrics(textfile, RunMetrics(2000.0, 5.0, [UpdaterRecord("apt", "failure", "更新失敗", 5.0)]))
+    assert read_last_success(textfile) == 1000.0
+    assert "sysup_last_run_timestamp_seconds 2000" in textfile.read_text(encoding="utf-8")
+    # 一時ファイルは残らない
+    assert [path.name for path in textfile.parent.iterdir()] == ["sysup.prom"]
+
+
+def test_read_last_success_missing(tmp_path):
+    """メトリクス - ファイルがない・記録がない場合はNoneを返すことを確認"""
+    textfile = tmp_path / "sysup.prom"
+
+    assert read_last_success(textfile) is None
+    textfile.write_text("sysup_reboot_required 0\n", encoding="utf-8")
+    assert read_last_success(textfile) is None
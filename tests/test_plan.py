@@ -0,0 +1,109 @@
+"""更新計画キャッシュのテスト"""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+from sysup.core.plan import PlanCache, PlanEntry
+
+
+def test_plan_cache_roundtrip(tmp_path):
+    """更新計画 - 保存した計画を読み込めることを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    cache = PlanCache(cache_file)
+    cache.put("apt", PlanEntry(pending=3, download_bytes=1024, estimated_seconds=120))
+    cache.put("brew", PlanEntry(pending=0))
+    cache.save()
+
+    loaded = PlanCache.load(cache_file)
+
+    assert loaded.get("apt") == PlanEntry(pending=3, download_bytes=1024, estimated_seconds=120)
+    assert loaded.get("brew") == PlanEntry(pending=0)
+    assert loaded.get("npm") is None
+
+
+def test_plan_cache_expired(tmp_path):
+    """更新計画 - 有効期間を過ぎた計画を返さないことを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    checked_at = (datetime.now(UTC) - timedelta(minutes=31)).isoformat()
+    cache_file.write_text(
+        json.dumps({"version": 1, "entries": {"apt": {"pending": 0, "checked_at": checked_at}}}),
+        encoding="utf-8",
+    )
+
+    assert PlanCache.load(cache_file, ttl_minutes=30).get("apt") is None
+    assert PlanCache.load(cache_file, ttl_minutes=60).get("apt") == PlanEntry(pending=0)
+
+
+def test_plan_cache_ttl_zero(tmp_path):
+    """更新計画 - 有効期間が0の場合は再利用しないことを確認"""
+    cache = PlanCache(tmp_path / "plan_cache.json", ttl_minutes=0)
+    cache.put("apt", PlanEntry(pending=0))
+
+    assert cache.get("apt") is None
+
+
+def test_plan_cache_future_or_invalid_timestamp(tmp_path):
+    """更新計画 - 未来・タイムゾーンなし・不正な記録時刻の計画を返さないことを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    future = (datetime.now(UTC) + timedelta(minutes=5)).isoformat()
+    naive = datetime.now().isoformat()
+    cache_file.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "entries": {
+                    "apt": {"pending": 0, "checked_at": future},
+                    "brew": {"pending": 0, "checked_at": naive},
+                    "npm": {"pending": 0, "checked_at": "invalid"},
+                    "gem": {"pending": 0},
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    cache = PlanCache.load(cache_file)
+
+    assert [cache.get(name) for name in ("apt", "brew", "npm", "gem")] == [None, None, None, None]
+
+
+def test_plan_cache_not_before(tmp_path):
+    """更新計画 - 指定した時刻(メタデータの更新時刻)より前に記録された計画を返さないことを確認"""
+    cache = PlanCache(tmp_path / "plan_cache.json")
+    cache.put("apt", PlanEntry(pending=0))
+    now = datetime.now(UTC).timestamp()
+
+    assert cache.get("apt", not_before=now - 60) == PlanEntry(pending=0)
+    assert cache.get("apt", not_before=now + 60) is None
+    assert cache.get("apt", not_before=None) == PlanEntry(pending=0)
+
+
+def test_plan_cache_corrupted(tmp_path):
+    """更新計画 - 壊れたキャッシュファイルを無視することを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    cache_file.write_text("{invalid", encoding="utf-8")
+
+    assert PlanCache.load(cache_file).get("apt") is None
+
+
+def test_plan_cache_discard(tmp_path):
+    """更新計画 - 破棄した計画がキャッシュファイルからも削除されることを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    cache = PlanCache(cache_file)
+    cache.put("apt", PlanEntry(pending=3))
+    cache.save()
+
+    loaded = PlanCache.load(cache_file)
+    loaded.discard("apt")
+    loaded.save()
+
+    assert PlanCache.load(cache_file).get("apt") is None
+
+
+def test_plan_cache_save_without_changes(tmp_path):
+    """更新計画 - 変更がない場合はファイルを書き出さないことを確認"""
+    cache_file = tmp_path / "plan_cache.json"
+    cache = PlanCache.load(cache_file)
+    cache.discard("apt")
+    cache.save()
+
+    assert not cache_file.exists()
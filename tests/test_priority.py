@@ -0,0 +1,46 @@
+"""プロセス優先度調整のテスト"""
+
+import subprocess
+from unittest.mock import patch
+
+from sysup.core import priority
+from sysup.core.priority import LOWEST_NICE, lower_process_priority
+
+
+def test_lower_process_priority_linux():
+    """優先度調整 - Linuxではnice値を最大にし、I/Oをidleクラスにすることを確認"""
+    with (
+        patch("sysup.core.priority.get_platform", return_value="Linux"),
+        patch("sysup.core.priority.os.nice", return_value=0) as mock_nice,
+        patch("sysup.core.priority.os.getpid", return_value=1234),
+        patch("sysup.core.priority.shutil.which", return_value="/usr/bin/ionice"),
+        patch("sysup.core.priority.subprocess.run", return_value=subprocess.CompletedProcess([], 0)) as mock_run,
+    ):
+        assert lower_process_priority() is True
+
+    mock_nice.assert_called_with(LOWEST_NICE)
+    assert mock_run.call_args.args[0] == ["ionice", "-c", "3", "-p", "1234"]
+
+
+def test_lower_process_priority_already_lowest():
+    """優先度調整 - nice値が既に最大の場合は変更しないことを確認"""
+    with patch("sysup.core.priority.os.nice", return_value=LOWEST_NICE) as mock_nice:
+        assert priority._lower_cpu_priority() is True
+
+    mock_nice.assert_called_once_with(0)
+
+
+def test_lower_process_priority_without_ionice():
+    """優先度調整 - ioniceがない場合はFalseを返すことを確認"""
+    with (
+        patch("sysup.core.priority.get_platform", return_value="Linux"),
+        patch("sysup.core.priority.os.nice", return_value=0),
+        patch("sysup.core.priority.shutil.which", return_value=None),
+    ):
+        assert lower_process_priority() is False
+
+
+def test_lower_process_priority_nice_error():
+    """優先度調整 - nice値を変更できない場合はFalseを返すことを確認"""
+    with patch("sysup.core.priority.os.nice", side_effect=OSError):
+        assert priority._lower_cpu_priority() is False
@@ -0,0 +1,173 @@
+"""プローブキャッシュのテスト"""
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from sysup.core.probe import ProbeCache
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    """実行ファイルを置くディレクトリのみをPATHに設定するフィクスチャ"""
+    directory = tmp_path / "bin"
+    directory.mkdir()
+    monkeypatch.setenv("PATH", str(directory))
+    return directory
+
+
+def make_executable(directory: Path, name: str) -> Path:
+    """実行可能なファイルを作成する"""
+    if sys.platform == "win32":
+        path = directory / f"{name}.exe"
+    else:
+        path = directory / name
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+def test_which_resolves_in_process(bin_dir):
+    """プロセスを起動せずにコマンドを探索することを確認"""
+    tool = make_executable(bin_dir, "tool")
+    cache = ProbeCache()
+
+    with patch("subprocess.run") as mock_run:
+        assert cache.which("tool") == str(tool)
+        assert cache.which("missing") is None
+
+    mock_run.assert_not_called()
+
+
+def test_which_memoized_within_run(bin_dir):
+    """同じ実行中は探索結果を再利用することを確認"""
+    make_executable(bin_dir, "tool")
+    cache = ProbeCache()
+
+    with patch("sysup.core.probe.shutil.which", return_value="/bin/tool") as mock_which:
+        cache.which("tool")
+        cache.which("tool")
+
+    mock_which.assert_called_once()
+
+
+def test_cache_reused_across_runs(bin_dir, tmp_path):
+    """保存したキャッシュが次回の実行で再利用されることを確認"""
+    tool = make_executable(bin_dir, "tool")
+    cache_file = tmp_path / "probe_cache.json"
+
+    first = ProbeCache.load(cache_file)
+    first.which("tool")
+    first.save()
+
+    second = ProbeCache.load(cache_file)
+    with patch("sysup.core.probe.shutil.which") as mock_which:
+        assert second.which("tool") == str(tool)
+
+    mock_which.assert_not_called()
+
+
+def test_cache_invalidated_when_path_changes(bin_dir, tmp_path, monkeypatch):
+    """PATHの内容が変わった場合にキャッシュが無効化されることを確認"""
+    make_executable(bin_dir, "tool")
+    cache_file = tmp_path / "probe_cache.json"
+
+    first = ProbeCache.load(cache_file)
+    first.which("tool")
+    first.save()
+
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    monkeypatch.setenv("PATH", str(other_dir))
+
+    assert ProbeCache.load(cache_file).which("tool") is None
+
+
+def test_cache_invalidated_when_executable_added(bin_dir, tmp_path):
+    """PATH上に実行ファイルが追加された場合にキャッシュが無効化されることを確認"""
+    cache_file = tmp_path / "probe_cache.json"
+
+    first = ProbeCache.load(cache_file)
+    assert first.which("tool") is None
+    first.save()
+
+    tool = make_executable(bin_dir, "tool")
+    mtime = bin_dir.stat().st_mtime + 10
+    os.utime(bin_dir, (mtime, mtime))
+
+    assert ProbeCache.load(cache_file).which("tool") == str(tool)
+
+
+def test_cache_invalidated_when_executable_modified(bin_dir, tmp_path):
+    """実行ファイルの更新時刻が変わった場合に再探索することを確認"""
+    tool = make_executable(bin_dir, "tool")
+    cache_file = tmp_path / "probe_cache.json"
+
+    first = ProbeCache.load(cache_file)
+    first.which("tool")
+    first.save()
+
+    mtime = tool.stat().st_mtime + 10
+    os.utime(tool, (mtime, mtime))
+
+    second = ProbeCache.load(cache_file)
+    with patch("sysup.core.probe.shutil.which", return_value=str(tool)) as mock_which:
+        second.which("tool")
+
+    mock_which.assert_called_once()
+
+
+def test_probe_watches_files(tmp_path):
+    """任意のプローブが監視対象ファイルの変更で再判定されることを確認"""
+    script = tmp_path / "nvm.sh"
+    script.write_text("")
+    cache_file = tmp_path / "probe_cache.json"
+    func = Mock(return_value=True)
+
+    first = ProbeCache.load(cache_file)
+    assert first.probe("nvm", func, watch=(script,)) is True
+    first.save()
+
+    assert ProbeCache.load(cache_file).probe("nvm", func, watch=(script,)) is True
+    assert func.call_count == 1
+
+    mtime = script.stat().st_mtime + 10
+    os.utime(script, (mtime, mtime))
+
+    ProbeCache.load(cache_file).probe("nvm", func, watch=(script,))
+    assert func.call_count == 2
+
+
+def test_load_ignores_corrupted_file(tmp_path):
+    """壊れたキャッシュファイルは無視されることを確認"""
+    cache_file = tmp_path / "probe_cache.json"
+    cache_file.write_text("{broken")
+
+    cache = ProbeCache.load(cache_file)
+
+    assert cache.probe("dummy", lambda: False) is False
+
+
+def test_save_skipped_without_changes(tmp_path):
+    """変更がない場合はファイルを書き込まないことを確認"""
+    cache_file = tmp_path / "probe_cache.json"
+
+    ProbeCache.load(cache_file).save()
+
+    assert not cache_file.exists()
+
+
+def test_save_writes_json(tmp_path):
+    """キャッシュがJSONとして保存されることを確認"""
+    cache_file = tmp_path / "probe_cache.json"
+    cache = ProbeCache.load(cache_file)
+    cache.probe("dummy", lambda: True)
+    cache.save()
+
+    data = json.loads(cache_file.read_text())
+    assert data["entries"]["probe:dummy"]["value"] is True
@@ -0,0 +1,151 @@
+"""Updaterレジストリのテスト"""
+
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sysup.core.config import SysupConfig, UpdaterConfig
+from sysup.core.scheduler import ResourceClass
+from sysup.updaters.base import BaseUpdater
+from sysup.updaters.registry import (
+    BUILTIN_UPDATERS,
+    ENTRY_POINT_GROUP,
+    UpdaterSpec,
+    get_updater_specs,
+    load_plugin_specs,
+)
+
+PLUGIN_SPEC = UpdaterSpec("example", "sysup.updaters.apt:AptUpdater", "Example")
+
+
+def make_entry_point(name: str, value: str) -> EntryPoint:
+    """テスト用のエントリーポイントを作成する"""
+    return EntryPoint(name=name, value=value, group=ENTRY_POINT_GROUP)
+
+
+def test_builtin_specs_match_updater_config():
+    """組み込みupdaterが設定項目と一致することを確認"""
+    assert [spec.name for spec in BUILTIN_UPDATERS] == [
+        "apt",
+        "snap",
+        "brew",
+        "scoop",
+        "npm",
+        "pnpm",
+        "pipx",
+        "uv",
+        "rustup",
+        "cargo",
+        "flatpak",
+        "gem",
+        "nvm",
+        "firmware",
+    ]
+    assert {spec.name for spec in BUILTIN_UPDATERS} == set(UpdaterConfig.model_fields)
+
+
+@pytest.mark.parametrize("spec", BUILTIN_UPDATERS, ids=lambda spec: spec.name)
+def test_builtin_spec_loads_updater(spec, tmp_path):
+    """組み込みupdaterのクラスを読み込め、表示名が一致することを確認"""
+    updater_class = spec.load()
+    assert issubclass(updater_class, BaseUpdater)
+
+    updater = spec.create(MagicMock())
+    assert updater.get_name() == spec.display_name
+
+
+def test_builtin_dependencies_refer_to_builtin_updaters():
+    """依存関係が組み込みupdaterを参照していることを確認"""
+    names = {spec.name for spec in BUILTIN_UPDATERS}
+    for spec in BUILTIN_UPDATERS:
+        assert set(spec.dependencies) <= names
+
+
+def test_builtin_metadata():
+    """sudo・リソースクラス・依存関係のメタデータを確認"""
+    specs = {spec.name: spec for spec in BUILTIN_UPDATERS}
+
+    assert {name for name, spec in specs.items() if spec.requires_sudo} == {"apt", "snap", "firmware"}
+    assert ResourceClass.SYSTEM_LOCK in specs["apt"].resources
+    assert specs["cargo"].dependencies == ("rustup",)
+    assert specs["npm"].dependencies == ("nvm",)
+
+
+def test_is_supported():
+    """対応プラットフォームの判定を確認"""
+    spec = UpdaterSpec("scoop", "x:Y", "Scoop", platforms=frozenset({"Windows"}))
+
+    with patch("sysup.updaters.registry.get_platform", return_value="Windows"):
+        assert spec.is_supported() is True
+    with patch("sysup.updaters.registry.get_platform", return_value="Linux"):
+        assert spec.is_supported() is False
+
+    assert UpdaterSpec("any", "x:Y", "Any").is_supported() is True
+
+
+def test_registry_does_not_import_updaters():
+    """レジストリのimportとメタデータ参照ではupdaterモジュールをimportしないことを確認"""
+    code = (
+        "import sys\n"
+        "from sysup.updaters.registry import get_updater_specs\n"
+        "[spec.requires_sudo for spec in get_updater_specs()]\n"
+        "print(sorted(m for m in sys.modules if m.startswith('sysup.updaters.') and m != 'sysup.updaters.registry'))\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_load_plugin_specs():
+    """エントリーポイントからプラグインのメタデータを読み込めることを確認"""
+    entry_point = make_entry_point("example", "tests.test_registry:PLUGIN_SPEC")
+
+    with patch("sysup.updaters.registry.entry_points", return_value=[entry_point]):
+        specs = load_plugin_specs()
+
+    assert specs == [PLUGIN_SPEC]
+
+
+def test_load_plugin_specs_reports_errors():
+    """読み込みに失敗したプラグインが報告され、無視されることを確認"""
+    broken = make_entry_point("broken", "sysup_nonexistent_plugin:SPEC")
+    invalid = make_entry_point("invalid", "sysup.updaters.registry:ENTRY_POINT_GROUP")
+    on_error = MagicMock()
+
+    with patch("sysup.updaters.registry.entry_points", return_value=[broken, invalid]):
+        specs = load_plugin_specs(on_error)
+
+    assert specs == []
+    assert [call.args[0] for call in on_error.call_args_list] == ["broken", "invalid"]
+    assert isinstance(on_error.call_args_list[1].args[1], TypeError)
+
+
+def test_get_updater_specs_appends_plugins():
+    """プラグインは組み込みupdaterの後に追加されることを確認"""
+    with patch("sysup.updaters.registry.load_plugin_specs", return_value=[PLUGIN_SPEC]):
+        specs = get_updater_specs()
+
+    assert specs[: len(BUILTIN_UPDATERS)] == list(BUILTIN_UPDATERS)
+    assert specs[-1] == PLUGIN_SPEC
+
+
+def test_get_updater_specs_rejects_duplicate_name():
+    """組み込みupdaterと同名のプラグインは無視されることを確認"""
+    duplicate = UpdaterSpec("apt", "example:AptUpdater", "Fake APT")
+    on_error = MagicMock()
+
+    with patch("sysup.updaters.registry.load_plugin_specs", return_value=[duplicate]):
+        specs = get_updater_specs(on_error)
+
+    assert duplicate not in specs
+    on_error.assert_called_once()
+
+
+def test_plugin_updater_enabled_only_when_configured():
+    """プラグインのupdaterは設定で明示的に有効化した場合のみ有効となることを確認"""
+    assert SysupConfig().is_updater_enabled("example") is False
+    assert SysupConfig(updaters={"example": True}).is_updater_enabled("example") is True  # type: ignore[arg-type]
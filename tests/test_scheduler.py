@@ -0,0 +1,290 @@
+"""タスクスケジューラのテスト"""
+
+import os
+import signal
+import sys
+import threading
+import time
+
+import pytest
+
+from sysup.core.scheduler import ResourceClass, Task, TaskScheduler
+from sysup.core.timing import current_span, span
+
+
+def test_scheduler_runs_all_tasks():
+    """全タスクが実行され、結果が返ることを確認"""
+    scheduler: TaskScheduler[int] = TaskScheduler(max_workers=2)
+    scheduler.add_task(Task("a", lambda: 1))
+    scheduler.add_task(Task("b", lambda: 2))
+
+    results = scheduler.run()
+
+    assert results["a"].value == 1
+    assert results["b"].value == 2
+    assert results["a"].error is None
+
+
+def test_scheduler_respects_dependencies():
+    """依存タスクが完了してから開始されることを確認"""
+    order: list[str] = []
+    lock = threading.Lock()
+
+    def make(name: str, delay: float = 0.0):
+        def run() -> str:
+            time.sleep(delay)
+            with lock:
+                order.append(name)
+            return name
+
+        return run
+
+    scheduler: TaskScheduler[str] = TaskScheduler(max_workers=4)
+    scheduler.add_task(Task("cargo", make("cargo"), dependencies=("rustup",)))
+    scheduler.add_task(Task("rustup", make("rustup", 0.05)))
+    scheduler.add_task(Task("npm", make("npm"), dependencies=("nvm",)))
+    scheduler.add_task(Task("nvm", make("nvm", 0.05)))
+
+    scheduler.run()
+
+    assert order.index("rustup") < order.index("cargo")
+    assert order.index("nvm") < order.index("npm")
+
+
+def test_scheduler_starts_dependents_without_waiting_for_unrelated_tasks():
+    """前提タスクが完了した時点で、無関係な長時間タスクを待たずに開始されることを確認"""
+    finished: dict[str, float] = {}
+
+    def slow() -> None:
+        time.sleep(0.3)
+        finished["slow"] = time.time()
+
+    def quick() -> None:
+        finished["quick"] = time.time()
+
+    def dependent() -> None:
+        finished["dependent"] = time.time()
+
+    scheduler: TaskScheduler[None] = TaskScheduler(max_workers=2)
+    scheduler.add_task(Task("slow", slow))
+    scheduler.add_task(Task("quick", quick))
+    scheduler.add_task(Task("dependent", dependent, dependencies=("quick",)))
+
+    scheduler.run()
+
+    assert finished["dependent"] < finished["slow"]
+
+
+def test_scheduler_sequential_keeps_registration_order():
+    """ワーカー1つの場合、依存関係を満たす範囲で登録順に実行されることを確認"""
+    order: list[str] = []
+
+    scheduler: TaskScheduler[None] = TaskScheduler(max_workers=1)
+    scheduler.add_task(Task("apt", lambda: order.append("apt")))
+    scheduler.add_task(Task("cargo", lambda: order.append("cargo"), dependencies=("rustup",)))
+    scheduler.add_task(Task("npm", lambda: order.append("npm")))
+    scheduler.add_task(Task("rustup", lambda: order.append("rustup")))
+
+    scheduler.run()
+
+    assert order == ["apt", "npm", "rustup", "cargo"]
+
+
+def test_scheduler_limits_concurrency():
+    """同時実行数がmax_workersを超えないことを確認"""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work() -> None:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    scheduler: TaskScheduler[None] = TaskScheduler(max_workers=2)
+    for i in range(6):
+        scheduler.add_task(Task(f"task{i}", work))
+
+    scheduler.run()
+
+    assert peak == 2
+
+
+def test_scheduler_ignores_unknown_dependencies():
+    """未登録の依存関係は無視されることを確認（無効化されたupdater等）"""
+    scheduler: TaskScheduler[str] = TaskScheduler()
+    scheduler.add_task(Task("cargo", lambda: "ok", dependencies=("rustup",)))
+
+    results = scheduler.run()
+
+    assert results["cargo"].value == "ok"
+
+
+def test_scheduler_captures_exceptions():
+    """タスクの例外が結果に格納され、他のタスクは継続することを確認"""
+
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    scheduler: TaskScheduler[str | None] = TaskScheduler()
+    scheduler.add_task(Task("fail", fail))
+    scheduler.add_task(Task("after", lambda: "ok", dependencies=("fail",)))
+
+    results = scheduler.run()
+
+    assert isinstance(results["fail"].error, RuntimeError)
+    assert results["after"].value == "ok"
+
+
+def test_scheduler_callbacks():
+    """開始・完了コールバックが呼ばれることを確認"""
+    started: list[str] = []
+    completed: list[str] = []
+
+    scheduler: TaskScheduler[None] = TaskScheduler()
+    scheduler.add_task(Task("a", lambda: None))
+    scheduler.add_task(Task("b", lambda: None, dependencies=("a",)))
+
+    scheduler.run(on_start=lambda task: started.append(task.name), on_complete=lambda r: completed.append(r.name))
+
+    assert started == ["a", "b"]
+    assert completed == ["a", "b"]
+
+
+def test_scheduler_detects_cycle():
+    """循環依存を検出することを確認"""
+    scheduler: TaskScheduler[None] = TaskScheduler()
+    scheduler.add_task(Task("a", lambda: None, dependencies=("b",)))
+    scheduler.add_task(Task("b", lambda: None, dependencies=("a",)))
+
+    with pytest.raises(ValueError, match="循環"):
+        scheduler.run()
+
+
+def test_scheduler_rejects_duplicate_task():
+    """同名タスクの登録を拒否することを確認"""
+    scheduler: TaskScheduler[None] = TaskScheduler()
+    scheduler.add_task(Task("a", lambda: None))
+
+    with pytest.raises(ValueError):
+        scheduler.add_task(Task("a", lambda: None))
+
+
+def test_scheduler_invalid_max_workers():
+    """max_workersが1未満の場合にエラーとなることを確認"""
+    with pytest.raises(ValueError):
+        TaskScheduler(max_workers=0)
+
+
+def test_scheduler_limits_resource_class():
+    """同じリソースクラスを使うタスクが上限を超えて同時実行されないことを確認"""
+    active: dict[str, int] = {"system_lock": 0}
+    peak = 0
+    lock = threading.Lock()
+
+    def locked_work() -> None:
+        nonlocal peak
+        with lock:
+            active["system_lock"] += 1
+            peak = max(peak, active["system_lock"])
+        time.sleep(0.03)
+        with lock:
+            active["system_lock"] -= 1
+
+    scheduler: TaskScheduler[None] = TaskScheduler(max_workers=4, resource_limits={ResourceClass.SYSTEM_LOCK: 1})
+    for name in ("apt", "snap", "firmware"):
+        scheduler.add_task(Task(name, locked_work, resources=(ResourceClass.SYSTEM_LOCK,)))
+
+    scheduler.run()
+
+    assert peak == 1
+
+
+def test_scheduler_runs_other_tasks_while_resource_is_busy():
+    """リソース待ちのタスクがあっても、別リソースのタスクは先に開始されることを確認"""
+    started: list[str] = []
+
+    scheduler: TaskScheduler[None] = TaskScheduler(max_workers=2, resource_limits={ResourceClass.CPU: 1})
+    scheduler.add_task(Task("cargo", lambda: time.sleep(0.05), resources=(ResourceClass.CPU,)))
+    scheduler.add_task(Task("gem", lambda: None, resources=(ResourceClass.CPU,)))
+    scheduler.add_task(Task("npm", lambda: None, resources=(ResourceClass.NETWORK,)))
+
+    scheduler.run(on_start=lambda task: started.append(task.name))
+
+    assert started.index("npm") < started.index("gem")
+
+
+def test_scheduler_invalid_resource_limit():
+    """リソース上限が1未満の場合にエラーとなることを確認"""
+    with pytest.raises(ValueError):
+        TaskScheduler(resource_limits={ResourceClass.CPU: 0})
+
+
+def test_scheduler_propagates_context():
+    """タスクが登録時点のコンテキスト(現在のスパン)で実行されることを確認"""
+    scheduler: TaskScheduler[str | None] = TaskScheduler(max_workers=2)
+
+    def run() -> str | None:
+        current = current_span()
+        return current.name if current is not None else None
+
+    scheduler.add_task(Task("a", run))
+    scheduler.add_task(Task("b", run))
+
+    with span("run", "run"):
+        results = scheduler.run()
+
+    assert results["a"].value == "run"
+    assert results["b"].value == "run"
+
+
+def test_scheduler_starts_longest_critical_path_first():
+    """予想所要時間から求めたクリティカルパス長の長いタスクから開始することを確認"""
+    order: list[str] = []
+
+    def make(name: str):
+        def run() -> str:
+            order.append(name)
+            return name
+
+        return run
+
+    scheduler: TaskScheduler[str] = TaskScheduler(max_workers=1)
+    scheduler.add_task(Task("short", make("short"), cost=1))
+    scheduler.add_task(Task("long", make("long"), cost=10))
+    # 自身は短いが、依存するタスクが長いため最初に開始する
+    scheduler.add_task(Task("head", make("head"), cost=2))
+    scheduler.add_task(Task("tail", make("tail"), dependencies=("head",), cost=20))
+    scheduler.add_task(Task("unknown", make("unknown")))
+
+    scheduler.run()
+
+    assert order == ["head", "tail", "long", "short", "unknown"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIXのシグナルを前提とするテスト")
+def test_scheduler_interrupt_stops_running_tasks():
+    """Ctrl+Cで中断した場合に、on_interruptで実行中のタスクを終了させて例外を再送出することを確認"""
+    stop = threading.Event()
+    started: list[str] = []
+
+    def run() -> str:
+        stop.wait(60)
+        return "stopped"
+
+    scheduler: TaskScheduler[str] = TaskScheduler(max_workers=1)
+    scheduler.add_task(Task("long", run))
+    scheduler.add_task(Task("next", lambda: "next"))
+
+    # 端末のCtrl+Cと同様に、ブロック中のメインスレッドにSIGINTを送る
+    threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGINT)).start()
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.run(on_start=lambda task: started.append(task.name), on_interrupt=stop.set)
+
+    assert time.monotonic() - start < 10
+    assert started == ["long"]
@@ -1,5 +1,6 @@
 """Scoop updaterのテスト。"""
 
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -70,3 +71,24 @@ def test_perform_update_failure(updater, logger):
         with patch.object(updater, "run_command", side_effect=Exception("Test error")):
             assert updater.perform_update() is False
             logger.error.assert_called()
+
+
+def test_check_updates(updater):
+    """scoop statusの表の行数を更新数として返すことを確認。"""
+    output = (
+        "Scoop is up to date.\n"
+        "\n"
+        "Name Installed Version Latest Version Missing Dependencies Info\n"
+        "---- ----------------- -------------- -------------------- ----\n"
+        "git  2.40.0.windows.1  2.43.0.windows.1\n"
+        "7zip 23.01             24.01\n"
+    )
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+        assert updater.check_updates() == 2
+
+
+def test_check_updates_none(updater):
+    """更新がない場合に0を返すことを確認。"""
+    output = "Scoop is up to date.\nLatest versions for all apps are installed!\n"
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")):
+        assert updater.check_updates() == 0
@@ -2,13 +2,14 @@
 
 import subprocess
 import sys
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from sysup.core.logging import SysupLogger
-from sysup.core.self_update import SelfUpdater
+from sysup.core.self_update import RESTART_OPTIONS, SELF_UPDATE_CHECK_FILE, SelfUpdater
 
 
 class TestSelfUpdaterInit:
@@ -219,6 +220,126 @@ class TestRestartSelf:
         finally:
             sys.argv = original_argv
 
+    @patch("sysup.core.self_update.subprocess.run")
+    @patch("sysup.core.self_update.os.execv")
+    def test_restart_self_extra_args(
+        self, mock_execv: MagicMock, mock_run: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """restart_self - 追加オプションは未指定のもののみ付与される."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), Path("/tmp/cache"))
+        monkeypatch.setattr(sys, "argv", ["sysup", "update", "--force"])
+        mock_run.return_value = MagicMock(stdout="/usr/local/bin/sysup\n")
+        mock_execv.side_effect = OSError("execv simulation")
+
+        with pytest.raises(OSError):
+            updater.restart_self(RESTART_OPTIONS)
+
+        assert mock_execv.call_args[0][1] == ["sysup", "update", "--force", "--no-self-update"]
+
+
+class TestCheckInterval:
+    """更新チェック間隔のテスト."""
+
+    def test_check_due_without_stamp(self, tmp_path: Path) -> None:
+        """最終チェック時刻が記録されていない場合はチェックが必要."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path)
+
+        assert updater.is_check_due() is True
+
+    def test_check_not_due_after_record(self, tmp_path: Path) -> None:
+        """記録直後は間隔内のためチェック不要."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path / "cache")
+
+        updater.record_check()
+
+        assert (tmp_path / "cache" / SELF_UPDATE_CHECK_FILE).exists()
+        assert updater.is_check_due() is False
+
+    def test_check_due_after_interval(self, tmp_path: Path) -> None:
+        """間隔が経過した場合はチェックが必要."""
+        stamp = datetime.now(UTC) - timedelta(hours=25)
+        (tmp_path / SELF_UPDATE_CHECK_FILE).write_text(stamp.isoformat())
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path, interval_hours=24)
+
+        assert updater.is_check_due() is True
+
+    def test_check_due_with_zero_interval(self, tmp_path: Path) -> None:
+        """間隔が0の場合は毎回チェックする."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path, interval_hours=0)
+        updater.record_check()
+
+        assert updater.is_check_due() is True
+
+    @pytest.mark.parametrize(
+        "content",
+        ["invalid", "2025-01-01T00:00:00", (datetime.now(UTC) + timedelta(days=1)).isoformat()],
+        ids=["corrupt", "naive", "future"],
+    )
+    def test_check_due_with_invalid_stamp(self, tmp_path: Path, content: str) -> None:
+        """壊れた・タイムゾーンなし・未来の時刻の記録はチェックが必要とみなす."""
+        (tmp_path / SELF_UPDATE_CHECK_FILE).write_text(content)
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path)
+
+        assert updater.is_check_due() is True
+
+
+class TestBackgroundCheck:
+    """バックグラウンド更新チェックのテスト."""
+
+    def test_start_skipped_within_interval(self, tmp_path: Path) -> None:
+        """間隔内の場合はチェックを開始しない."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path)
+        updater.record_check()
+
+        with patch.object(updater, "update_self") as mock_update:
+            assert updater.start_background_check() is False
+            assert updater.restart_if_updated() is False
+
+        mock_update.assert_not_called()
+
+    def test_no_restart_when_not_updated(self, tmp_path: Path) -> None:
+        """更新がない場合は再実行せず、最終チェック時刻を記録する."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path)
+        before_restart = MagicMock()
+
+        with (
+            patch.object(updater, "update_self", return_value=False),
+            patch.object(updater, "restart_self") as mock_restart,
+        ):
+            assert updater.start_background_check() is True
+            assert updater.restart_if_updated(before_restart) is False
+
+        mock_restart.assert_not_called()
+        before_restart.assert_not_called()
+        assert updater.is_check_due() is False
+
+    def test_restart_when_updated(self, tmp_path: Path) -> None:
+        """更新された場合は、before_restartを呼んでから再実行オプション付きで再実行する."""
+        updater = SelfUpdater(MagicMock(spec=SysupLogger), tmp_path)
+        calls: list[str] = []
+
+        with (
+            patch.object(updater, "update_self", return_value=True),
+            patch.object(updater, "restart_self", side_effect=lambda _args: calls.append("restart")) as mock_restart,
+        ):
+            updater.start_background_check()
+            result = updater.restart_if_updated(lambda: calls.append("before_restart"))
+
+        assert result is True
+        assert calls == ["before_restart", "restart"]
+        mock_restart.assert_called_once_with(RESTART_OPTIONS)
+
+    def test_check_failure_is_recorded(self, tmp_path: Path) -> None:
+        """チェックに失敗した場合も最終チェック時刻を記録し、毎回の再試行を避ける."""
+        logger = MagicMock(spec=SysupLogger)
+        updater = SelfUpdater(logger, tmp_path)
+
+        with patch("sysup.core.self_update.subprocess.run", side_effect=OSError("uv not found")):
+            updater.start_background_check()
+            assert updater.restart_if_updated() is False
+
+        assert updater.is_check_due() is False
+
 
 class TestCheckAndUpdate:
     """SelfUpdater.check_and_update()のテスト."""
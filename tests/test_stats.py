@@ -344,3 +344,170 @@ def test_save_to_log_creates_directory():
         # ディレクトリが作成されたことを確認
         assert log_dir.exists()
         assert (log_dir / "update.log").exists()
+
+
+def test_slowest_steps():
+    """時間のかかったステップ - 末端のスパンを処理時間の降順で返すことを確認"""
+    from sysup.core.timing import span
+
+    manager = StatsManager(MagicMock(spec=SysupLogger))
+
+    with manager.span("ネットワーク確認"):
+        pass
+    apt = manager.updater_span("apt")
+    with span("apply", "phase", parent=apt):
+        with span("sudo apt upgrade -y", "command") as command:
+            time.sleep(0.02)
+            command.exit_code = 0
+    with span("refresh", "phase", parent=manager.updater_span("cargo")):
+        time.sleep(0.01)
+
+    steps = manager.slowest_steps()
+
+    # updater・コマンドを実行したフェーズは末端ではないため含まない
+    assert [path for path, _step in steps] == [
+        "apt › apply › sudo apt upgrade -y",
+        "cargo › refresh",
+        "ネットワーク確認",
+    ]
+    assert steps[0][1].exit_code == 0
+    assert len(manager.slowest_steps(limit=1)) == 1
+
+
+def test_show_summary_with_steps():
+    """サマリー表示 - updaterの処理時間と時間のかかったステップを表示することを確認"""
+    from sysup.core.timing import span
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SysupLogger(Path(tmpdir), "INFO")
+        try:
+            manager = StatsManager(logger)
+            with span("apply", "phase", parent=manager.updater_span("apt")):
+                with span("sudo apt upgrade -y", "command") as command:
+                    command.exit_code = 0
+            manager.record_success("apt")
+
+            with logger.console.capture() as capture:
+                manager.show_summary()
+            manager.save_to_log(Path(tmpdir))
+        finally:
+            logger.close()
+
+        output = capture.get()
+        assert "時間のかかったステップ" in output
+        assert "sudo apt upgrade -y" in output
+        assert "✓ apt (" in output
+        content = (Path(tmpdir) / "update.log").read_text(encoding="utf-8")
+        assert "Slowest steps:" in content
+        assert "apt › apply › sudo apt upgrade -y (exit 0)" in content
+
+
+def test_save_to_history(tmp_path):
+    """実行履歴への保存 - updaterの結果・処理時間・パッケージ数とステップを記録することを確認"""
+    import sqlite3
+
+    from sysup.core.history import HistoryStore
+    from sysup.core.timing import span
+
+    manager = StatsManager(MagicMock(spec=SysupLogger))
+    with manager.span("ネットワーク確認"):
+        pass
+    with span("apply", "phase", parent=manager.updater_span("apt")):
+        with span("sudo apt upgrade -y", "command") as command:
+            command.exit_code = 0
+    manager.record_success("apt")
+    manager.record_packages("apt", 3)
+    manager.record_skip("snap", "利用不可")
+    manager.stats.finish()
+
+    db_file = tmp_path / "history.sqlite3"
+    manager.save_to_history(HistoryStore(db_file))
+
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT name, status, packages, duration IS NOT NULL FROM updaters").fetchall() == [
+            ("apt", "success", 3, 1),
+            ("snap", "skip", None, 0),
+        ]
+        assert conn.execute("SELECT updater, kind, name, exit_code FROM steps ORDER BY started_at").fetchall() == [
+            (None, "check", "ネットワーク確認", None),
+            ("apt", "phase", "apply", None),
+            ("apt", "command", "sudo apt upgrade -y", 0),
+        ]
+
+
+def test_save_to_history_updater_duration_excludes_waits(tmp_path):
+    """実行履歴への保存 - updaterの処理時間がフェーズの合計で、待ち時間とバックアップの完了待ちを含まないことを確認"""
+    import sqlite3
+
+    from sysup.core.history import HistoryStore
+    from sysup.core.timing import span
+
+    manager = StatsManager(MagicMock(spec=SysupLogger))
+    updater_span = manager.updater_span("apt")
+    with span("refresh", "phase", parent=updater_span):
+        time.sleep(0.05)
+    # スケジューラのワーカーの空き待ち
+    time.sleep(0.1)
+    with span("backup", "phase", parent=updater_span):
+        time.sleep(0.1)
+    with span("apply", "phase", parent=updater_span):
+        time.sleep(0.05)
+    manager.record_success("apt")
+    manager.stats.finish()
+
+    db_file = tmp_path / "history.sqlite3"
+    manager.save_to_history(HistoryStore(db_file))
+
+    with sqlite3.connect(db_file) as conn:
+        ((duration,),) = conn.execute("SELECT duration FROM updaters WHERE name = 'apt'").fetchall()
+    assert 0.1 <= duration < 0.2
+
+
+def test_save_to_history_error(tmp_path):
+    """実行履歴への保存 - 書き込みに失敗した場合は警告のみで例外を送出しないことを確認"""
+    from sysup.core.history import HistoryStore
+
+    mock_logger = MagicMock(spec=SysupLogger)
+    manager = StatsManager(mock_logger)
+    db_file = tmp_path / "history.sqlite3"
+    db_file.write_bytes(b"not a database" * 100)
+
+    manager.save_to_history(HistoryStore(db_file))
+
+    mock_logger.warning.assert_called_once()
+
+
+def test_save_to_metrics(tmp_path):
+    """メトリクスの書き出し - updaterの結果・処理時間・パッケージ数と実行全体の情報を出力することを確認"""
+    from sysup.core.timing import span
+
+    manager = StatsManager(MagicMock(spec=SysupLogger))
+    with span("apply", "phase", parent=manager.updater_span("apt")):
+        pass
+    manager.record_success("apt")
+    manager.record_packages("apt", 3)
+    manager.record_failure("cargo", "更新失敗")
+    manager.stats.finish()
+
+    textfile = tmp_path / "sysup.prom"
+    manager.save_to_metrics(textfile, backup_duration=1.5, reboot_required=True)
+
+    content = textfile.read_text(encoding="utf-8")
+    assert 'sysup_updater_status{updater="apt",status="success"} 1' in content
+    assert 'sysup_updater_status{updater="cargo",status="failure"} 1' in content
+    assert 'sysup_updater_packages_upgraded{updater="apt"} 3' in content
+    assert 'sysup_updater_duration_seconds{updater="apt"}' in content
+    assert "sysup_backup_duration_seconds 1.5" in content
+    assert "sysup_reboot_required 1" in content
+    assert "sysup_last_run_success 0" in content
+
+
+def test_save_to_metrics_error(tmp_path):
+    """メトリクスの書き出し - 書き込みに失敗した場合は警告のみで例外を送出しないことを確認"""
+    mock_logger = MagicMock(spec=SysupLogger)
+    manager = StatsManager(mock_logger)
+    (tmp_path / "file").write_text("", encoding="utf-8")
+
+    manager.save_to_metrics(tmp_path / "file" / "sysup.prom")
+
+    mock_logger.warning.assert_called_once()
@@ -0,0 +1,71 @@
+"""コマンドのタイムアウトのテスト"""
+
+import pytest
+
+from sysup.core.timeouts import DEFAULT_COMMAND_TIMEOUT, CommandTimeouts
+
+
+def test_timeout_without_history():
+    """タイムアウト - 実行履歴がないコマンドはデフォルト値を使用することを確認"""
+    timeouts = CommandTimeouts({})
+
+    assert timeouts.timeout_for(["sudo", "apt", "upgrade", "-y"]) == DEFAULT_COMMAND_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    ("samples", "expected"),
+    [
+        # 短時間で終わるコマンドもデフォルト値より短くしない
+        ([10.0, 12.0, 11.0, 13.0, 12.0], DEFAULT_COMMAND_TIMEOUT),
+        # 99パーセンタイル × 係数
+        ([100.0, 120.0, 110.0, 130.0, 120.0], 130.0 * 0.96 * 3 + 120.0 * 0.04 * 3),
+        # 長時間かかるコマンドも上限までにする
+        ([3000.0, 3100.0, 2900.0, 3000.0, 3200.0], 7200.0),
+    ],
+)
+def test_timeout_from_history(samples, expected):
+    """タイムアウト - 処理時間の99パーセンタイル × 係数を下限・上限の範囲に収めることを確認"""
+    timeouts = CommandTimeouts({"cargo install-update -a": samples})
+
+    assert timeouts.timeout_for(["cargo", "install-update", "-a"]) == pytest.approx(expected)
+
+
+def test_timeout_with_few_samples():
+    """タイムアウト - 記録が少ない間はデフォルトより短くせず、実際の処理時間より長くすることを確認"""
+    timeouts = CommandTimeouts({"snap refresh": [10.0], "sudo apt upgrade -y": [250.0, 200.0]})
+
+    assert timeouts.timeout_for(["snap", "refresh"]) == DEFAULT_COMMAND_TIMEOUT
+    assert timeouts.timeout_for(["sudo", "apt", "upgrade", "-y"]) == 750.0
+
+
+def test_timeout_after_timed_out_run():
+    """タイムアウト - タイムアウトした実行の打ち切りまでの時間を下限として、次回のタイムアウトを長くすることを確認"""
+    timeouts = CommandTimeouts(
+        {"sudo apt upgrade -y": [300.0], "cargo install-update -a": [100.0, 100.0, 100.0, 100.0, 300.0]}
+    )
+
+    assert timeouts.timeout_for(["sudo", "apt", "upgrade", "-y"]) == 900.0
+    assert timeouts.timeout_for(["cargo", "install-update", "-a"]) > 300.0 * 2
+
+
+def test_timeout_fixed():
+    """タイムアウト - 固定値が指定された場合は実行履歴によらずその値を使用することを確認"""
+    timeouts = CommandTimeouts({"snap refresh": [10.0] * 10}, fixed=90.0)
+
+    assert timeouts.timeout_for(["snap", "refresh"]) == 90.0
+    assert timeouts.timeout_for(["snap", "list"]) == 90.0
+
+
+def test_timeout_custom_bounds():
+    """タイムアウト - 係数・下限・上限・デフォルト値を変更できることを確認"""
+    timeouts = CommandTimeouts(
+        {"npm update -g": [20.0] * 5, "cargo install-update -a": [1000.0] * 5},
+        default_seconds=120.0,
+        factor=2.0,
+        min_seconds=30.0,
+        max_seconds=1800.0,
+    )
+
+    assert timeouts.timeout_for(["npm", "update", "-g"]) == 40.0
+    assert timeouts.timeout_for(["cargo", "install-update", "-a"]) == 1800.0
+    assert timeouts.timeout_for(["gem", "update"]) == 120.0
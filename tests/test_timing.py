@@ -0,0 +1,77 @@
+"""処理時間の計測(スパン)のテスト"""
+
+import threading
+import time
+
+from sysup.core.timing import Span, current_span, span
+
+
+def test_span_nesting():
+    """スパン - span()の内側で開始したスパンが子スパンになることを確認"""
+    with span("run", "run") as run:
+        assert current_span() is run
+        with span("apply", "phase") as phase:
+            with span("apt upgrade", "command"):
+                pass
+        assert current_span() is run
+
+    assert current_span() is None
+    assert [child.name for child in run.children] == ["apply"]
+    assert [child.name for child in phase.children] == ["apt upgrade"]
+    assert [(path, step.kind) for path, step in run.walk()] == [
+        (("apply",), "phase"),
+        (("apply", "apt upgrade"), "command"),
+    ]
+    assert run.end_time is not None
+    assert run.duration >= phase.duration
+
+
+def test_span_explicit_parent():
+    """スパン - 親スパンを指定した場合は現在のスパンではなく指定した親の子になることを確認"""
+    root = Span("run", "run")
+    root.start()
+
+    with span("other", "run"):
+        with span("check", "check", parent=root) as check:
+            assert current_span() is check
+
+    assert [child.name for child in root.children] == ["check"]
+
+
+def test_span_group_bounds():
+    """スパン - 開始していないグループの時間が子スパンの範囲になることを確認"""
+    root = Span("run", "run")
+    group = root.child("apt", "updater")
+    assert group.start_time is None
+    assert group.duration == 0.0
+
+    with span("refresh", "phase", parent=group) as refresh:
+        time.sleep(0.01)
+    with span("apply", "phase", parent=group) as apply:
+        # 実行中の子スパンがある間は終了していない
+        assert group.end_time is None
+        time.sleep(0.01)
+
+    assert group.start_time == refresh.start_time
+    assert group.end_time == apply.end_time
+    assert group.duration >= refresh.duration + apply.duration
+    assert not group.is_leaf
+    assert refresh.is_leaf
+
+
+def test_span_child_thread_safe():
+    """スパン - 複数のスレッドから子スパンを追加できることを確認"""
+    root = Span("run", "run")
+
+    def add() -> None:
+        for i in range(100):
+            with span(str(i), "command", parent=root):
+                pass
+
+    threads = [threading.Thread(target=add) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(root.children) == 400
@@ -1,5 +1,6 @@
 """個別Updaterのテスト（apt, brew, uv）"""
 
+import os
 import subprocess
 import tempfile
 from pathlib import Path
@@ -66,39 +67,78 @@ def test_apt_check_updates(mock_logger):
     """APTUpdater - check_updatesのテスト"""
     updater = AptUpdater(mock_logger)
 
-    with patch.object(updater, "run_command") as mock_run:
-        mock_result = Mock()
-        mock_result.stdout = "Listing...\npackage1\npackage2\npackage3\n"
-        mock_run.return_value = mock_result
-
-        count = updater.check_updates()
-        assert count == 3
+    with patch("sysup.updaters.apt.upgradable_packages", return_value=[Mock(), Mock(), Mock()]):
+        with patch.object(updater, "run_command") as mock_run:
+            count = updater.check_updates()
+            assert count == 3
+            mock_run.assert_not_called()
 
 
 def test_apt_check_updates_none(mock_logger):
     """APTUpdater - check_updates (更新なし)のテスト"""
     updater = AptUpdater(mock_logger)
 
-    with patch.object(updater, "run_command") as mock_run:
-        mock_result = Mock()
-        mock_result.stdout = "Listing...\n"
-        mock_run.return_value = mock_result
-
+    with patch("sysup.updaters.apt.upgradable_packages", return_value=[]):
         count = updater.check_updates()
         assert count == 0
 
 
 def test_apt_check_updates_exception(mock_logger):
-    """APTUpdater - check_updates (例外発生)のテスト"""
+    """APTUpdater - check_updates (ステータスファイル読み込み失敗)のテスト"""
     updater = AptUpdater(mock_logger)
 
-    with patch.object(updater, "run_command") as mock_run:
-        mock_run.side_effect = Exception("Error")
-
+    with patch("sysup.updaters.apt.upgradable_packages", side_effect=OSError("Error")):
         count = updater.check_updates()
         assert count is None
 
 
+def test_apt_download_size(mock_logger):
+    """APTUpdater - download_sizeが更新候補のサイズを合計することを確認"""
+    updater = AptUpdater(mock_logger)
+    packages = [Mock(size=1000), Mock(size=2500)]
+
+    with patch("sysup.updaters.apt.upgradable_packages", return_value=packages):
+        assert updater.download_size() == 3500
+
+
+def test_apt_download_size_unknown(mock_logger):
+    """APTUpdater - サイズが不明なパッケージがある場合はNoneを返すことを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch("sysup.updaters.apt.upgradable_packages", return_value=[Mock(size=1000), Mock(size=None)]):
+        assert updater.download_size() is None
+
+
+def test_apt_reads_package_lists_once_until_refresh(mock_logger):
+    """APTUpdater - check_updatesとdownload_sizeがパッケージリストの読み込み結果を共有し、refresh後に読み直すことを確認"""
+    updater = AptUpdater(mock_logger)
+    packages = [Mock(size=1000), Mock(size=2500)]
+
+    with patch("sysup.updaters.apt.upgradable_packages", return_value=packages) as mock_upgradable:
+        assert updater.check_updates() == 2
+        assert updater.download_size() == 3500
+        assert mock_upgradable.call_count == 1
+
+        with patch.object(updater, "run_command"):
+            assert updater.refresh() is True
+        assert updater.check_updates() == 2
+        assert mock_upgradable.call_count == 2
+
+
+def test_apt_metadata_updated_at(mock_logger, tmp_path):
+    """APTUpdater - パッケージリストとapt update成功時のタイムスタンプのうち新しい時刻を返すことを確認"""
+    updater = AptUpdater(mock_logger)
+    lists_dir = tmp_path / "lists"
+    lists_dir.mkdir()
+    stamp = tmp_path / "update-success-stamp"
+    stamp.write_text("")
+    os.utime(lists_dir, (1000, 1000))
+    os.utime(stamp, (2000, 2000))
+
+    with patch("sysup.updaters.apt.APT_LISTS_DIR", lists_dir), patch("sysup.updaters.apt.APT_UPDATE_STAMP", stamp):
+        assert updater.metadata_updated_at() == 2000
+
+
 def test_apt_perform_update_success(mock_logger):
     """APTUpdater - perform_update (成功)のテスト"""
     updater = AptUpdater(mock_logger)
@@ -150,6 +190,67 @@ def test_apt_perform_update_error(mock_logger):
             assert result is False
 
 
+def test_apt_refresh_runs_apt_update_only(mock_logger):
+    """APTUpdater - refreshがapt updateのみを実行することを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.refresh() is True
+        mock_run.assert_called_once_with(["sudo", "apt", "update"])
+
+
+def test_apt_apply_does_not_refresh(mock_logger):
+    """APTUpdater - applyがapt updateを実行しないことを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "check_updates", return_value=1):
+        with patch.object(updater, "run_command") as mock_run:
+            mock_run.return_value = Mock(returncode=0)
+
+            assert updater.apply() is True
+            commands = [call.args[0] for call in mock_run.call_args_list]
+            assert ["sudo", "apt", "update"] not in commands
+            assert ["sudo", "apt", "upgrade", "-y"] in commands
+
+
+def test_apt_post_update_runs_cleanup(mock_logger):
+    """APTUpdater - 不要パッケージの削除とキャッシュの整理がapplyではなくpost_updateで行われることを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        mock_run.return_value = Mock(returncode=0)
+
+        assert updater.apply() is True
+        mock_run.assert_called_once_with(["sudo", "apt", "upgrade", "-y"])
+
+        mock_run.reset_mock()
+        assert updater.post_update() is True
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands == [["sudo", "apt", "autoremove", "-y"], ["sudo", "apt", "autoclean"]]
+
+
+def test_apt_post_update_autoremove_failure(mock_logger):
+    """APTUpdater - autoremoveの失敗は警告のみで後処理は成功とすることを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run, patch.object(mock_logger, "warning") as mock_warning:
+        mock_run.return_value = Mock(returncode=1)
+
+        assert updater.post_update() is True
+        mock_warning.assert_called_once()
+
+
+def test_apt_perform_update_skips_apply_on_refresh_failure(mock_logger):
+    """APTUpdater - refresh失敗時にapplyを実行しないことを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "is_available", return_value=True):
+        with patch.object(updater, "refresh", return_value=False):
+            with patch.object(updater, "apply") as mock_apply:
+                assert updater.perform_update() is False
+                mock_apply.assert_not_called()
+
+
 # ======================
 # Brew Updater Tests
 # ======================
@@ -280,6 +381,56 @@ def test_brew_perform_update_error(mock_logger):
             assert result is False
 
 
+def test_brew_post_update_runs_cleanup(mock_logger):
+    """BrewUpdater - brew cleanupがapplyではなくpost_updateで行われることを確認"""
+    updater = BrewUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.apply() is True
+        mock_run.assert_called_once_with(["brew", "upgrade"])
+
+        mock_run.reset_mock()
+        assert updater.post_update() is True
+        mock_run.assert_called_once_with(["brew", "cleanup"], check=False)
+
+
+def test_brew_refresh_runs_brew_update(mock_logger):
+    """BrewUpdater - refreshがbrew updateを実行することを確認"""
+    updater = BrewUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.refresh() is True
+        mock_run.assert_called_once_with(["brew", "update"])
+
+
+def test_brew_metadata_updated_at(mock_logger, tmp_path, monkeypatch):
+    """BrewUpdater - リポジトリのFETCH_HEADの更新時刻を返すことを確認"""
+    updater = BrewUpdater(mock_logger)
+    fetch_head = tmp_path / ".git" / "FETCH_HEAD"
+    fetch_head.parent.mkdir()
+    fetch_head.write_text("")
+    os.utime(fetch_head, (1000, 1000))
+    monkeypatch.setenv("HOMEBREW_REPOSITORY", str(tmp_path))
+
+    assert updater.metadata_updated_at() == 1000
+
+
+def test_brew_metadata_updated_at_from_command_path(mock_logger, tmp_path, monkeypatch):
+    """BrewUpdater - brewコマンドのパスからリポジトリを求めることを確認"""
+    updater = BrewUpdater(mock_logger)
+    (tmp_path / "bin").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "FETCH_HEAD").write_text("")
+    os.utime(tmp_path / ".git" / "FETCH_HEAD", (1000, 1000))
+    monkeypatch.delenv("HOMEBREW_REPOSITORY", raising=False)
+
+    with patch("sysup.updaters.brew.shutil.which", return_value=str(tmp_path / "bin" / "brew")):
+        assert updater.metadata_updated_at() == 1000
+
+    with patch("sysup.updaters.brew.shutil.which", return_value=None):
+        assert updater.metadata_updated_at() is None
+
+
 # ======================
 # Uv Updater Tests
 # ======================
@@ -360,6 +511,25 @@ def test_uv_perform_update_success(mock_logger):
                 assert result is True
 
 
+def test_uv_check_updates(mock_logger):
+    """UvUpdater - check_updatesが更新可能なツールのみを数えることを確認"""
+    updater = UvUpdater(mock_logger)
+    output = "ruff v0.1.0 [latest: 0.4.0]\n- ruff\nmypy v1.7.0 [latest: 1.10.0]\n- dmypy\n- mypy\n"
+
+    with patch.object(updater, "run_command", return_value=subprocess.CompletedProcess([], 0, output, "")) as mock_run:
+        assert updater.check_updates() == 2
+        mock_run.assert_called_once_with(["uv", "tool", "list", "--outdated"], check=False, capture_output=True)
+
+
+def test_uv_refresh_runs_self_update(mock_logger):
+    """UvUpdater - uv自体の更新がrefreshフェーズで行われることを確認"""
+    updater = UvUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.refresh() is True
+        mock_run.assert_called_once_with(["uv", "self", "update"])
+
+
 def test_uv_perform_update_not_available(mock_logger):
     """UvUpdater - perform_update (利用不可)のテスト"""
     updater = UvUpdater(mock_logger)
@@ -446,3 +616,40 @@ def test_firmware_is_available_on_windows(mock_is_windows, mock_logger):
     mock_is_windows.return_value = True
     updater = FirmwareUpdater(mock_logger)
     assert updater.is_available() is False
+
+
+def test_apt_prefetch_downloads_only(mock_logger):
+    """AptUpdater - prefetchがダウンロードのみを行うことを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        assert updater.prefetch() is True
+        mock_run.assert_called_once_with(["sudo", "apt-get", "-d", "-y", "--with-new-pkgs", "upgrade"])
+
+
+def test_apt_prefetch_error(mock_logger):
+    """AptUpdater - prefetchの失敗時にFalseを返すことを確認"""
+    updater = AptUpdater(mock_logger)
+
+    with patch.object(updater, "run_command", side_effect=subprocess.CalledProcessError(100, ["apt-get"])):
+        assert updater.prefetch() is False
+
+
+def test_brew_prefetch_fetches_outdated_formulae(mock_logger):
+    """BrewUpdater - prefetchが更新可能なformulaをbrew fetchすることを確認"""
+    updater = BrewUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "git\nnode\n", "")
+        assert updater.prefetch() is True
+        assert mock_run.call_args_list[-1].args[0] == ["brew", "fetch", "git", "node"]
+
+
+def test_brew_prefetch_no_outdated(mock_logger):
+    """BrewUpdater - 更新可能なformulaがない場合はbrew fetchを実行しないことを確認"""
+    updater = BrewUpdater(mock_logger)
+
+    with patch.object(updater, "run_command") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        assert updater.prefetch() is True
+        mock_run.assert_called_once_with(["brew", "outdated", "--formula", "--quiet"], capture_output=True)